@@ -0,0 +1,95 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+import argparse
+import statistics
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import plotly.graph_objs as go
+from skeleton_geometry import POSE_CONNECTIONS, HAND_CONNECTIONS, line_segments
+
+# --------------------------------------------------------------------
+"""Benchmark de la construction des figures du squelette : une trace par liaison / une trace par partie"""
+# --------------------------------------------------------------------
+# Les poses sont synthétiques (mêmes dimensions que MediaPipe) : aucun fichier n'est lu.
+
+def frames_synthetiques(n_frames: int) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        part: rng.random((n_frames, n_joints, 3), dtype=np.float32)
+        for part, n_joints in {"pose": 33, "left_hand": 21, "right_hand": 21, "face": 478}.items()
+    }
+
+# --- Plotly ---
+def plotly_par_liaison(pose, left_hand, right_hand):
+    traces = [
+        go.Scatter(x=[pose[i, 0], pose[j, 0]], y=[pose[i, 1], pose[j, 1]], mode='lines', line=dict(color='green', width=2))
+        for (i, j) in POSE_CONNECTIONS
+    ]
+    for hand, color in ((left_hand, 'red'), (right_hand, 'blue')):
+        traces += [
+            go.Scatter(x=[hand[i, 0], hand[j, 0]], y=[hand[i, 1], hand[j, 1]], mode='lines', line=dict(color=color, width=2))
+            for (i, j) in HAND_CONNECTIONS
+        ]
+    return go.Figure(data=traces)
+
+def plotly_par_partie(pose, left_hand, right_hand):
+    traces = []
+    for points, connections, color in ((pose, POSE_CONNECTIONS, 'green'), (left_hand, HAND_CONNECTIONS, 'red'), (right_hand, HAND_CONNECTIONS, 'blue')):
+        x, y = line_segments(points, connections)
+        traces.append(go.Scatter(x=x, y=y, mode='lines', line=dict(color=color, width=2)))
+    return go.Figure(data=traces)
+
+# --- Matplotlib ---
+def matplotlib_par_liaison(ax, pose, left_hand, right_hand):
+    ax.clear()
+    for (i, j) in POSE_CONNECTIONS:
+        ax.plot([pose[i, 0], pose[j, 0]], [pose[i, 1], pose[j, 1]], color='green', linewidth=2)
+    for hand, color in ((left_hand, 'red'), (right_hand, 'blue')):
+        for (i, j) in HAND_CONNECTIONS:
+            ax.plot([hand[i, 0], hand[j, 0]], [hand[i, 1], hand[j, 1]], color=color, linewidth=2)
+
+def matplotlib_par_partie(ax, pose, left_hand, right_hand):
+    ax.clear()
+    ax.plot(*line_segments(pose, POSE_CONNECTIONS), color='green', linewidth=2)
+    ax.plot(*line_segments(left_hand, HAND_CONNECTIONS), color='red', linewidth=2)
+    ax.plot(*line_segments(right_hand, HAND_CONNECTIONS), color='blue', linewidth=2)
+
+def mesurer(construire, frames: dict, n_frames: int, repeat: int) -> float:
+    """Retourne le temps médian (ms) de construction d'une frame."""
+    durees = []
+    for _ in range(repeat):
+        debut = time.perf_counter()
+        for i in range(n_frames):
+            construire(frames["pose"][i], frames["left_hand"][i], frames["right_hand"][i])
+        durees.append((time.perf_counter() - debut) * 1000 / n_frames)
+    return statistics.median(durees)
+
+def main(n_frames: int, repeat: int):
+    frames = frames_synthetiques(n_frames)
+    fig, ax = plt.subplots()
+
+    resultats = {
+        "plotly": (mesurer(plotly_par_liaison, frames, n_frames, repeat), mesurer(plotly_par_partie, frames, n_frames, repeat)),
+        "matplotlib": (
+            mesurer(lambda *parts: matplotlib_par_liaison(ax, *parts), frames, n_frames, repeat),
+            mesurer(lambda *parts: matplotlib_par_partie(ax, *parts), frames, n_frames, repeat),
+        ),
+    }
+    plt.close(fig)
+
+    print(f"\n{'rendu':<12} {'par liaison (ms)':>17} {'par partie (ms)':>16} {'gain':>8}")
+    for rendu, (avant, apres) in resultats.items():
+        print(f"{rendu:<12} {avant:>17.3f} {apres:>16.3f} {avant / apres:>7.1f}x")
+
+parser = argparse.ArgumentParser(description="Mesure le temps de construction d'une frame du squelette avant/après regroupement des liaisons.")
+parser.add_argument("--frames", type=int, default=200, help="Nombre de frames construites par mesure (défaut : 200)")
+parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures (la médiane est retenue)")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    main(args.frames, args.repeat)
@@ -0,0 +1,265 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import struct
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.exc import SQLAlchemyError
+from database.db_init import SessionCont, SessionIsol
+from database.video_probe import probe_video
+from schema.models_cont import ContVideo
+from schema.models_isol import IsolVideo
+
+# --------------------------------------------------------------------
+"""Audit et ré-encapsulation (faststart, images clés rapprochées) des vidéos du corpus"""
+# --------------------------------------------------------------------
+# La lecture d'un segment (seek) est lente quand l'atome moov est en fin de fichier (le
+# navigateur doit d'abord lire la fin) ou quand les images clés sont espacées. Pour chaque
+# vidéo de videos_cont / videos_iso :
+#   - audit : position de moov (lecture des boîtes MP4 de premier niveau) et plus long
+#     intervalle entre images clés (ffprobe, paquets seulement, sans décodage) ;
+#   - moov en fin de fichier -> ré-encapsulation sans ré-encodage (-c copy -movflags +faststart) ;
+#   - avec --reencode, intervalle > --max-gop secondes -> ré-encodage H.264 avec une image
+#     clé toutes les --max-gop secondes (audio copié).
+# Le fichier est remplacé une fois le nouveau complet. Les vidéos sont traitées en parallèle
+# (un processus par cœur). Chaque résultat est ajouté au journal (JSON Lines) avec les options
+# utilisées : une vidéo déjà traitée, inchangée depuis (taille, date) et avec des options au
+# moins aussi strictes (--reencode, --max-gop) est ignorée au lancement suivant.
+# Une vidéo remplacée est sondée à nouveau (durée, fps, résolution, codec) et sa ligne mise à
+# jour en fin d'exécution ; si la base est injoignable, les chemins à compléter avec
+# database/backfill_videos.py --force sont affichés.
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE_BINARY = os.getenv("FFPROBE_BINARY", "ffprobe")
+DEFAULT_JOURNAL = Path(__file__).resolve().parent.parent / "cache" / "remux_journal.jsonl"
+DEFAULT_MAX_GOP = 2.0   # Secondes entre deux images clés
+
+DATASETS = {
+    "cont": (SessionCont, ContVideo),
+    "isol": (SessionIsol, IsolVideo),
+}
+
+# --- Audit ---
+def moov_position(video_path) -> str:
+    """'start' si l'atome moov précède mdat, 'end' s'il le suit, None s'il manque (fichier non MP4)."""
+    seen = set()
+    with open(video_path, "rb") as file:
+        file_size = os.fstat(file.fileno()).st_size
+        offset = 0
+        while offset + 8 <= file_size:
+            file.seek(offset)
+            size, box_type = struct.unpack(">I4s", file.read(8))
+            if size == 1:
+                size = struct.unpack(">Q", file.read(8))[0]  # Taille sur 64 bits
+            elif size == 0:
+                size = file_size - offset                    # Dernière boîte, jusqu'à la fin du fichier
+            if box_type in (b"moov", b"mdat"):
+                if box_type == b"moov":
+                    return "end" if b"mdat" in seen else "start"
+                seen.add(box_type)
+            if size < 8:
+                break
+            offset += size
+    return None
+
+def keyframe_interval(packets: str):
+    """
+    Plus long intervalle (s) entre deux images clés, d'après la sortie
+    `ffprobe -show_entries packet=pts_time,flags -of csv=p=0` ; None si aucune n'est trouvée.
+    """
+    keyframes, last_time = [], None
+    for line in packets.splitlines():
+        pts_time, _, flags = line.strip().partition(",")
+        try:
+            time = float(pts_time)
+        except ValueError:
+            continue
+        last_time = time if last_time is None else max(last_time, time)
+        if "K" in flags:
+            keyframes.append(time)
+    if not keyframes:
+        return None
+    keyframes.sort()
+    # La fin de la vidéo compte : une seule image clé au début rend tout seek coûteux
+    bounds = keyframes + [last_time]
+    return round(max(b - a for a, b in zip(bounds, bounds[1:])), 3)
+
+def audit_video(video_path) -> dict:
+    packets = subprocess.run(
+        [FFPROBE_BINARY, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", str(video_path)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return {"moov": moov_position(video_path), "max_gop_s": keyframe_interval(packets)}
+
+def plan_action(audit: dict, reencode: bool, max_gop: float):
+    """'reencode', 'faststart' ou None (rien à faire)."""
+    if reencode and audit["max_gop_s"] is not None and audit["max_gop_s"] > max_gop:
+        return "reencode"  # Le ré-encodage place aussi moov en tête
+    if audit["moov"] == "end":
+        return "faststart"
+    return None
+
+# --- Ré-encapsulation ---
+def ffmpeg_command(video_path, output_path, action: str, max_gop: float, threads: int) -> list:
+    command = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", "-i", str(video_path), "-map", "0"]
+    if action == "reencode":
+        command += [
+            "-c", "copy", "-c:v", "libx264", "-preset", "medium", "-crf", "18", "-pix_fmt", "yuv420p",
+            "-force_key_frames", f"expr:gte(t,n_forced*{max_gop})", "-threads", str(threads),
+        ]
+    else:
+        command += ["-c", "copy"]
+    return command + ["-movflags", "+faststart", "-f", "mp4", str(output_path)]
+
+def file_state(video_path) -> dict:
+    stat = os.stat(video_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def process_video(video_path: str, reencode: bool, max_gop: float, dry_run: bool, threads: int) -> dict:
+    """
+    Audite une vidéo et la remplace si nécessaire ; retourne l'entrée du journal (exécuté dans un
+    processus). Une erreur sur un fichier est enregistrée dans l'entrée sans interrompre les autres.
+    """
+    entry = {"path": video_path, "reencode": reencode, "max_gop": max_gop}
+    try:
+        entry["before"] = file_state(video_path)
+        entry.update(audit_video(video_path))
+        entry["action"] = plan_action(entry, reencode, max_gop)
+        if entry["action"] and not dry_run:
+            tmp_path = f"{video_path}.remux.part"
+            try:
+                subprocess.run(ffmpeg_command(video_path, tmp_path, entry["action"], max_gop, threads),
+                               capture_output=True, text=True, check=True)
+                os.replace(tmp_path, video_path)
+            finally:
+                Path(tmp_path).unlink(missing_ok=True)
+            # Le ré-encodage change le codec et peut décaler la durée : métadonnées relues pour la base
+            entry["metadata"] = probe_video(video_path)
+        entry["status"] = "ok"
+    except FileNotFoundError as e:
+        entry.update(status="error", error=f"Fichier introuvable : {e.filename}")
+    except subprocess.CalledProcessError as e:
+        entry.update(status="error", error=(e.stderr or "").strip()[-500:] or f"code {e.returncode}")
+    except (OSError, struct.error) as e:
+        # Remplacement impossible (droits, disque plein...) ou fichier MP4 tronqué
+        entry.update(status="error", error=f"{type(e).__name__} : {e}")
+    entry["after"] = file_state(video_path) if os.path.isfile(video_path) else None
+    entry["done_at"] = datetime.now(timezone.utc).isoformat()
+    return entry
+
+# --- Journal ---
+def load_journal(journal_path) -> dict:
+    """{chemin: dernière entrée réussie} ; les lignes illisibles (arrêt brutal) sont ignorées."""
+    done = {}
+    if not os.path.isfile(journal_path):
+        return done
+    with open(journal_path, encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("status") == "ok" and not entry.get("dry_run"):
+                done[entry["path"]] = entry
+    return done
+
+def already_done(video_path: str, done: dict, reencode: bool, max_gop: float) -> bool:
+    """
+    Vrai si la vidéo a été traitée, n'a pas changé depuis, et que ce traitement était au moins
+    aussi strict que celui demandé (un passage faststart seul ne dispense pas d'un ré-encodage).
+    """
+    entry = done.get(video_path)
+    if entry is None or not os.path.isfile(video_path):
+        return False
+    if reencode and not (entry.get("reencode") and entry.get("max_gop", float("inf")) <= max_gop):
+        return False
+    return entry.get("after") == file_state(video_path)
+
+async def load_video_paths(db_keys) -> dict:
+    """{chemin: base} des vidéos à traiter."""
+    paths = {}
+    for db_key in db_keys:
+        session_factory, video_model = DATASETS[db_key]
+        async with session_factory() as session:
+            result = await session.execute(select(video_model.path).order_by(video_model.path))
+            paths.update(dict.fromkeys(result.scalars().all(), db_key))
+    return paths
+
+# --- Métadonnées ---
+async def update_video_metadata(updates: dict):
+    """Met à jour durée, fps, résolution et codec des vidéos remplacées ({base: {chemin: métadonnées}})."""
+    for db_key, metadata_by_path in updates.items():
+        if not metadata_by_path:
+            continue
+        session_factory, video_model = DATASETS[db_key]
+        table = video_model.__table__
+        async with session_factory() as session:
+            # UPDATE groupé : les colonnes modifiées sont celles des métadonnées
+            await session.execute(
+                update(table).where(table.c.path == bindparam("video_path")),
+                [{"video_path": path, **metadata} for path, metadata in metadata_by_path.items()],
+            )
+            await session.commit()
+
+def main(db_keys, reencode: bool, max_gop: float, jobs: int, journal_path, dry_run: bool):
+    video_paths = asyncio.run(load_video_paths(db_keys))
+    done = load_journal(journal_path)
+    todo = [path for path in video_paths if not already_done(path, done, reencode, max_gop)]
+    print(f"[REMUX] {len(video_paths)} vidéo(s), {len(video_paths) - len(todo)} déjà traitée(s), {len(todo)} à auditer")
+
+    # Le ré-encodage est lui-même multi-thread : les cœurs sont partagés entre les processus
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    counts = {"faststart": 0, "reencode": 0, "unchanged": 0, "error": 0}
+    updates = {db_key: {} for db_key in db_keys}
+    Path(journal_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(journal_path, "a", encoding="utf-8") as journal, ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(process_video, path, reencode, max_gop, dry_run, threads) for path in todo]
+        for index, future in enumerate(as_completed(futures), start=1):
+            entry = future.result()
+            entry["dry_run"] = dry_run
+            # Écrit au fil de l'eau : un arrêt en cours de route ne perd que les vidéos en traitement
+            journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            journal.flush()
+            key = "error" if entry["status"] == "error" else (entry["action"] or "unchanged")
+            if entry.get("metadata"):
+                updates[video_paths[entry["path"]]][entry["path"]] = entry["metadata"]
+            counts[key] += 1
+            detail = entry.get("error") or f"moov={entry['moov']} gop={entry['max_gop_s']}s -> {entry['action'] or 'inchangée'}"
+            print(f"[REMUX] ({index}/{len(todo)}) {entry['path']} : {detail}")
+
+    verb = "à traiter" if dry_run else "traitée(s)"
+    print(f"[REMUX] faststart {verb} : {counts['faststart']}, ré-encodage {verb} : {counts['reencode']}, "
+          f"inchangée(s) : {counts['unchanged']}, erreur(s) : {counts['error']}")
+
+    changed = sum(len(metadata_by_path) for metadata_by_path in updates.values())
+    if not changed:
+        return
+    try:
+        asyncio.run(update_video_metadata(updates))
+        print(f"[REMUX] Métadonnées mises à jour pour {changed} vidéo(s)")
+    except (SQLAlchemyError, OSError) as e:
+        print(f"[REMUX] Mise à jour des métadonnées impossible ({type(e).__name__} : {e}). "
+              f"Vidéos à sonder avec database/backfill_videos.py --force :")
+        for metadata_by_path in updates.values():
+            for path in metadata_by_path:
+                print(f"  {path}")
+
+parser = argparse.ArgumentParser(description="Audite les vidéos du corpus (position de moov, intervalle entre images clés) et les ré-encapsule en faststart.")
+parser.add_argument("db", choices=["cont", "isol", "all"], help="Base de données dont les vidéos sont traitées ('cont', 'isol', ou 'all')")
+parser.add_argument("--reencode", action="store_true", help="Ré-encode les vidéos dont les images clés sont trop espacées")
+parser.add_argument("--max-gop", type=float, default=DEFAULT_MAX_GOP, help=f"Intervalle maximal entre images clés en secondes (défaut : {DEFAULT_MAX_GOP})")
+parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Nombre de vidéos traitées en parallèle (défaut : nombre de cœurs)")
+parser.add_argument("--journal", default=str(DEFAULT_JOURNAL), help="Journal des vidéos traitées, relu pour reprendre (JSON Lines)")
+parser.add_argument("--dry-run", action="store_true", help="Audit seul : aucun fichier n'est modifié")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    main(["cont", "isol"] if args.db == "all" else [args.db], args.reencode, args.max_gop, max(1, args.jobs), args.journal, args.dry_run)
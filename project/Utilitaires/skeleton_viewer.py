@@ -1,184 +1,245 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+from pathlib import Path
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-import tkinter as tk
-from tkinter import filedialog
-from matplotlib.widgets import Slider, Button
+from matplotlib import style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from skeleton_geometry import POSE_CONNECTIONS, HAND_CONNECTIONS, line_segments
+
+# --------------------------------------------------------------------
+"""Visualisation et export du squelette 2D d'une instance"""
+# --------------------------------------------------------------------
+# Les artistes (points, lignes, texte) sont créés une seule fois ; chaque frame ne
+# modifie que leurs données (set_offsets / set_data) et seuls ceux-ci sont redessinés
+# (FuncAnimation(blit=True)). L'export (mp4 / gif) n'utilise ni pyplot ni affichage.
+
+BODY_PARTS = ("left_hand", "right_hand", "pose", "face")
+STYLE = 'seaborn-v0_8-darkgrid'
+BACKGROUND = '#2c2c2c'
+INITIAL_INTERVAL = 40  # en ms (~25 fps)
+
+def charger_instance(poses_dir, instance_id: str) -> dict:
+    """Ouvre (en mmap) les fichiers poses/<partie>/<instance>.npy d'une instance."""
+    poses = {}
+    for part in BODY_PARTS:
+        path = Path(poses_dir) / part / f"{instance_id}.npy"
+        if not path.is_file():
+            raise FileNotFoundError(f"Fichier de poses introuvable : {path}")
+        poses[part] = np.load(path, mmap_mode="r")
+    return poses
+
+class SkeletonRenderer:
+    """Artistes du squelette créés une fois sur `ax` ; update(frame) ne change que leurs données."""
+
+    def __init__(self, ax, poses: dict):
+        self.ax = ax
+        self.left_hand_all = poses['left_hand']
+        self.right_hand_all = poses['right_hand']
+        self.pose_all = poses['pose']
+        self.face_all = poses['face']
+        self.num_frames = min(array.shape[0] for array in poses.values())
+
+        # --- Mise en forme générale (une seule fois) ---
+        ax.set_facecolor(BACKGROUND)
+        ax.set_xlabel("X", color='white')
+        ax.set_ylabel("Y", color='white')
+        ax.tick_params(colors='white')
+        for spine in ax.spines.values():
+            spine.set_color('white')
+        ax.grid(True, color='white', alpha=0.2)
+
+        # Limites fixées une seule fois (et non plus après chaque clear()) : [-1, 1], axe Y
+        # inversé (coordonnées image) et repère orthonormé, comme ax.invert_yaxis() + ax.axis('equal')
+        ax.set_xlim(-1, 1)
+        ax.set_ylim(1, -1)
+        ax.set_aspect('equal', adjustable='datalim')
+
+        # --- Artistes ---
+        empty = np.empty((0, 2))
+        self.face = ax.scatter(empty[:, 0], empty[:, 1], c='orange', s=5, alpha=0.6, label='Visage')
+        self.pose_points = ax.scatter(empty[:, 0], empty[:, 1], c='green', s=20, label='Pose')
+        self.lh_points = ax.scatter(empty[:, 0], empty[:, 1], c='red', s=10, label='Main Gauche')  # taille réduite
+        self.rh_points = ax.scatter(empty[:, 0], empty[:, 1], c='blue', s=10, label='Main Droite')  # taille réduite
+        self.pose_lines, = ax.plot([], [], color='green', linewidth=2)  # Épaisseur augmentée pour le corps
+        self.lh_lines, = ax.plot([], [], color='red', linewidth=2)
+        self.rh_lines, = ax.plot([], [], color='blue', linewidth=2)
+        # Arêtes reliant la pose aux mains
+        self.relay_left, = ax.plot([], [], color='magenta', linewidth=2, label='Relais gauche')
+        self.relay_right, = ax.plot([], [], color='cyan', linewidth=2, label='Relais droite')
+        # Numéro de frame dans les axes : un titre hors des axes ne serait pas redessiné par le blitting
+        self.frame_text = ax.text(0.02, 0.97, "", transform=ax.transAxes, color='white', va='top')
+
+        ax.legend(facecolor='#444444', edgecolor='white', loc='lower right')
+        self.artists = [
+            self.face, self.pose_points, self.lh_points, self.rh_points,
+            self.pose_lines, self.lh_lines, self.rh_lines,
+            self.relay_left, self.relay_right, self.frame_text,
+        ]
+
+    def update(self, frame):
+        """Met à jour les données des artistes pour la frame donnée et retourne les artistes modifiés."""
+        left_hand = self.left_hand_all[frame]   # (21, 3)
+        right_hand = self.right_hand_all[frame]  # (21, 3)
+        pose = self.pose_all[frame]              # (33, 3)
+        face = self.face_all[frame]              # (478, 3)
+
+        self.face.set_offsets(face[:, :2])
+        self.pose_points.set_offsets(pose[:, :2])
+        self.lh_points.set_offsets(left_hand[:, :2])
+        self.rh_points.set_offsets(right_hand[:, :2])
+        self.pose_lines.set_data(*line_segments(pose, POSE_CONNECTIONS))
+        self.lh_lines.set_data(*line_segments(left_hand, HAND_CONNECTIONS))
+        self.rh_lines.set_data(*line_segments(right_hand, HAND_CONNECTIONS))
+
+        if pose.shape[0] > 15 and left_hand.shape[0] > 0:
+            self.relay_left.set_data([pose[15, 0], left_hand[0, 0]], [pose[15, 1], left_hand[0, 1]])
+        if pose.shape[0] > 16 and right_hand.shape[0] > 0:
+            self.relay_right.set_data([pose[16, 0], right_hand[0, 0]], [pose[16, 1], right_hand[0, 1]])
+
+        self.frame_text.set_text(f"Frame {frame}/{self.num_frames-1}")
+        return self.artists
+
+def exporter_animation(poses: dict, output_path, fps: int = 25, dpi: int = 100, figsize=(8, 6)):
+    """
+    Rend la séquence dans un fichier .mp4 (ffmpeg) ou .gif (Pillow), sans affichage :
+    la figure est créée avec l'API objet et un canvas Agg, utilisable sur un serveur.
+    """
+    output_path = Path(output_path)
+    with style.context(STYLE):
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        fig.patch.set_facecolor(BACKGROUND)
+        renderer = SkeletonRenderer(fig.add_subplot(), poses)
+        ani = animation.FuncAnimation(
+            fig, renderer.update, frames=renderer.num_frames,
+            init_func=lambda: renderer.artists, blit=True,
+        )
+        if output_path.suffix.lower() == ".gif":
+            writer = animation.PillowWriter(fps=fps)
+        else:
+            writer = animation.FFMpegWriter(fps=fps, codec="libx264", extra_args=["-pix_fmt", "yuv420p"])
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        ani.save(str(output_path), writer=writer, dpi=dpi)
+    return output_path
+
+def choisir_fichiers() -> dict:
+    """Ouvre une boîte de dialogue par partie du corps pour sélectionner les fichiers .npy."""
+    import tkinter as tk
+    from tkinter import filedialog
 
-def charger_fichier(message):
-    """Ouvre une boîte de dialogue pour sélectionner un fichier .npy et le charge."""
     root = tk.Tk()
     root.withdraw()
-    chemin = filedialog.askopenfilename(title=message, filetypes=[("Fichiers Numpy", "*.npy")])
-    if not chemin:
-        raise FileNotFoundError("Aucun fichier sélectionné pour " + message)
-    return np.load(chemin)
-
-# --- Chargement des données ---
-print("Sélection du fichier pour left_hand...")
-left_hand_all = charger_fichier("Sélectionner le fichier npy pour left_hand")
-print("Sélection du fichier pour right_hand...")
-right_hand_all = charger_fichier("Sélectionner le fichier npy pour right_hand")
-print("Sélection du fichier pour pose...")
-pose_all = charger_fichier("Sélectionner le fichier npy pour pose")
-print("Sélection du fichier pour face...")
-face_all = charger_fichier("Sélectionner le fichier npy pour face")
-
-# --- Connexions (exemple MediaPipe) ---
-pose_connections = [
-    (11, 12), (11, 13), (13, 15),
-    (12, 14), (14, 16), (11, 23),
-    (12, 24), (23, 24)
-]
-hand_connections = [
-    (0, 1), (1, 2), (2, 3), (3, 4),    
-    (0, 5), (5, 6), (6, 7), (7, 8),    
-    (0, 9), (9, 10), (10, 11), (11, 12),  
-    (0, 13), (13, 14), (14, 15), (15, 16), 
-    (0, 17), (17, 18), (18, 19), (19, 20)
-]
-
-# --- Paramètres d'animation ---
-num_frames = min(left_hand_all.shape[0],
-                 right_hand_all.shape[0],
-                 pose_all.shape[0],
-                 face_all.shape[0])
-initial_interval = 40  # en ms (~25 fps)
-
-# Variable globale pour la frame courante
-current_frame = 0
-
-# --- Choix du style Matplotlib ---
-plt.style.use('seaborn-v0_8-darkgrid')
-
-# --- Création de la figure et de l'axe principal ---
-fig, ax = plt.subplots(figsize=(8, 6))
-fig.subplots_adjust(bottom=0.3)
-fig.patch.set_facecolor('#2c2c2c')
-ax.set_facecolor('#2c2c2c')
-ax.set_xlim(-1, 1)
-ax.set_ylim(-1, 1)
-
-def frame_generator():
-    """Générateur infini qui retourne current_frame et l'incrémente."""
-    global current_frame
-    while True:
-        yield current_frame
-        current_frame = (current_frame + 1) % num_frames
-
-def update(frame):
-    """Met à jour l'affichage pour la frame donnée."""
-    global current_frame
-    current_frame = frame
-    ax.clear()
-    # Refixer limites et fond après clear()
-    ax.set_xlim(-1, 1)
-    ax.set_ylim(-1, 1)
-    ax.set_facecolor('#2c2c2c')
-    
-    # Extraction des données de la frame courante
-    left_hand = left_hand_all[frame]   # (21, 3)
-    right_hand = right_hand_all[frame]  # (21, 3)
-    pose = pose_all[frame]              # (33, 3)
-    face = face_all[frame]              # (478, 3)
-    
-    # Coordonnées X et Y (affichage 2D)
-    x_pose, y_pose = pose[:, 0], pose[:, 1]
-    x_lh, y_lh = left_hand[:, 0], left_hand[:, 1]
-    x_rh, y_rh = right_hand[:, 0], right_hand[:, 1]
-    x_face, y_face = face[:, 0], face[:, 1]
-    
-    # --- Tracé de la pose (corps) avec liaisons épaissies ---
-    ax.scatter(x_pose, y_pose, c='green', s=20, label='Pose')
-    for (i, j) in pose_connections:
-        if i < pose.shape[0] and j < pose.shape[0]:
-            ax.plot([x_pose[i], x_pose[j]], [y_pose[i], y_pose[j]],
-                    color='green', linewidth=2)  # Épaisseur augmentée pour le corps
-    
-    # --- Tracé des mains avec points réduits ---
-    ax.scatter(x_lh, y_lh, c='red', s=10, label='Main Gauche')  # taille réduite
-    for (i, j) in hand_connections:
-        ax.plot([x_lh[i], x_lh[j]], [y_lh[i], y_lh[j]],
-                color='red', linewidth=2)
-    
-    ax.scatter(x_rh, y_rh, c='blue', s=10, label='Main Droite')  # taille réduite
-    for (i, j) in hand_connections:
-        ax.plot([x_rh[i], x_rh[j]], [y_rh[i], y_rh[j]],
-                color='blue', linewidth=2)
-    
-    # --- Tracé du visage ---
-    ax.scatter(x_face, y_face, c='orange', s=5, alpha=0.6, label='Visage')
-    
-    # --- Arêtes reliant la pose aux mains ---
-    if pose.shape[0] > 15 and left_hand.shape[0] > 0:
-        ax.plot([pose[15, 0], left_hand[0, 0]], [pose[15, 1], left_hand[0, 1]],
-                color='magenta', linewidth=2, label='Relais gauche')
-    if pose.shape[0] > 16 and right_hand.shape[0] > 0:
-        ax.plot([pose[16, 0], right_hand[0, 0]], [pose[16, 1], right_hand[0, 1]],
-                color='cyan', linewidth=2, label='Relais droite')
-    
-    # Mise en forme générale
-    ax.set_title(f"Squelette 2D - Frame {frame}/{num_frames-1}", color='white')
-    ax.set_xlabel("X", color='white')
-    ax.set_ylabel("Y", color='white')
-    ax.invert_yaxis()
-    ax.axis('equal')
-    ax.tick_params(colors='white')
-    for spine in ax.spines.values():
-        spine.set_color('white')
-    ax.grid(True, color='white', alpha=0.2)
-    
-    # Mise à jour du slider de frame sans déclencher sa callback
-    frame_slider.eventson = False
-    frame_slider.set_val(frame)
-    frame_slider.eventson = True
-    
-    if frame == 0:
-        ax.legend(facecolor='#444444', edgecolor='white')
-
-# --- Animation auto avec cache_frame_data désactivé ---
-ani = animation.FuncAnimation(fig, update, frames=frame_generator,
-                              interval=initial_interval, repeat=True,
-                              cache_frame_data=False)
-
-# --- Slider de vitesse (contrôle l'intervalle en ms) ---
-ax_speed = fig.add_axes([0.15, 0.10, 0.70, 0.03], facecolor='#555555')
-speed_slider = Slider(ax_speed, 'Vitesse (ms)', 10, 1000, valinit=initial_interval, valstep=10)
-def update_speed(val):
-    ani.event_source.interval = speed_slider.val
-speed_slider.on_changed(update_speed)
-# Texte informatif placé à droite
-ax_speed.text(1.05, 0.5, "Contrôle de la vitesse", transform=ax_speed.transAxes,
-              color='white', fontsize=9, verticalalignment='center', horizontalalignment='left')
-
-# --- Slider de frame (navigation dans les frames) ---
-ax_frame = fig.add_axes([0.15, 0.05, 0.70, 0.03], facecolor='#555555')
-frame_slider = Slider(ax_frame, 'Frame', 0, num_frames-1, valinit=0, valstep=1)
-def update_frame(val):
-    global current_frame
-    new_frame = int(frame_slider.val)
-    current_frame = new_frame
-    update(new_frame)  # Met à jour immédiatement l'affichage
-    # L'animation continue à partir de new_frame
-frame_slider.on_changed(update_frame)
-# Texte informatif placé à droite
-ax_frame.text(1.05, 0.5, "Navigation dans les frames", transform=ax_frame.transAxes,
-              color='white', fontsize=9, verticalalignment='center', horizontalalignment='left')
-
-# --- Bouton Pause/Resume (ne modifie que l'animation auto) ---
-ax_button = fig.add_axes([0.02, 0.10, 0.1, 0.04])
-pause_button = Button(ax_button, 'Pause', color='gray', hovercolor='red')
-is_paused = False
-def toggle_pause(event):
-    global is_paused
-    if is_paused:
-        ani.event_source.start()
-        pause_button.label.set_text('Pause')
-        is_paused = False
-    else:
-        ani.event_source.stop()
-        pause_button.label.set_text('Resume')
-        is_paused = True
-pause_button.on_clicked(toggle_pause)
+    poses = {}
+    for part in BODY_PARTS:
+        print(f"Sélection du fichier pour {part}...")
+        chemin = filedialog.askopenfilename(title=f"Sélectionner le fichier npy pour {part}", filetypes=[("Fichiers Numpy", "*.npy")])
+        if not chemin:
+            raise FileNotFoundError("Aucun fichier sélectionné pour " + part)
+        poses[part] = np.load(chemin, mmap_mode="r")
+    return poses
+
+def afficher(poses: dict):
+    """Fenêtre interactive : animation, vitesse, navigation dans les frames et pause."""
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider, Button
+
+    # --- Choix du style Matplotlib ---
+    plt.style.use(STYLE)
+
+    # --- Création de la figure et de l'axe principal ---
+    fig, ax = plt.subplots(figsize=(8, 6))
+    fig.subplots_adjust(bottom=0.3)
+    fig.patch.set_facecolor(BACKGROUND)
+    renderer = SkeletonRenderer(ax, poses)
+    num_frames = renderer.num_frames
+    ax.set_title("Squelette 2D", color='white')
+
+    # Frame courante (partagée entre l'animation et les widgets)
+    state = {"frame": 0, "paused": False}
+
+    def frame_generator():
+        """Générateur infini qui retourne la frame courante et l'incrémente."""
+        while True:
+            yield state["frame"]
+            state["frame"] = (state["frame"] + 1) % num_frames
+
+    # --- Slider de frame (navigation dans les frames) ---
+    ax_frame = fig.add_axes([0.15, 0.05, 0.70, 0.03], facecolor='#555555')
+    # Poignée masquée : seuls la barre et la valeur (attributs publics) sont redessinées avec les
+    # artistes animés (blitting) ; une poignée non redessinée resterait figée à sa position initiale
+    frame_slider = Slider(ax_frame, 'Frame', 0, num_frames-1, valinit=0, valstep=1, handle_style={"size": 0})
+    frame_slider.drawon = False
+    slider_artists = [frame_slider.poly, frame_slider.valtext]
+
+    def update(frame):
+        artists = renderer.update(frame)
+        # Mise à jour du slider de frame sans déclencher sa callback
+        frame_slider.eventson = False
+        frame_slider.set_val(frame)
+        frame_slider.eventson = True
+        return artists + slider_artists
 
-plt.show()
+    # --- Animation auto : seuls les artistes retournés par update() sont redessinés ---
+    ani = animation.FuncAnimation(fig, update, frames=frame_generator, init_func=lambda: renderer.artists + slider_artists,
+                                  interval=INITIAL_INTERVAL, blit=True, cache_frame_data=False)
+
+    def update_frame(val):
+        state["frame"] = int(frame_slider.val)
+        # L'animation continue à partir de la nouvelle frame ; en pause, la figure est redessinée entièrement
+        if state["paused"]:
+            update(state["frame"])
+            fig.canvas.draw_idle()
+    frame_slider.on_changed(update_frame)
+    # Texte informatif placé à droite
+    ax_frame.text(1.05, 0.5, "Navigation dans les frames", transform=ax_frame.transAxes,
+                  color='white', fontsize=9, verticalalignment='center', horizontalalignment='left')
+
+    # --- Slider de vitesse (contrôle l'intervalle en ms) ---
+    ax_speed = fig.add_axes([0.15, 0.10, 0.70, 0.03], facecolor='#555555')
+    speed_slider = Slider(ax_speed, 'Vitesse (ms)', 10, 1000, valinit=INITIAL_INTERVAL, valstep=10)
+    def update_speed(val):
+        ani.event_source.interval = speed_slider.val
+    speed_slider.on_changed(update_speed)
+    ax_speed.text(1.05, 0.5, "Contrôle de la vitesse", transform=ax_speed.transAxes,
+                  color='white', fontsize=9, verticalalignment='center', horizontalalignment='left')
+
+    # --- Bouton Pause/Resume (ne modifie que l'animation auto) ---
+    ax_button = fig.add_axes([0.02, 0.10, 0.1, 0.04])
+    pause_button = Button(ax_button, 'Pause', color='gray', hovercolor='red')
+    def toggle_pause(event):
+        if state["paused"]:
+            ani.resume()
+            pause_button.label.set_text('Pause')
+        else:
+            ani.pause()
+            pause_button.label.set_text('Resume')
+        state["paused"] = not state["paused"]
+    pause_button.on_clicked(toggle_pause)
+
+    plt.show()
+
+parser = argparse.ArgumentParser(description="Affiche le squelette 2D d'une instance ou l'exporte en vidéo (mp4 / gif).")
+parser.add_argument("instances", nargs="*", help="Identifiants des instances (fichiers <poses-dir>/<partie>/<instance>.npy)")
+parser.add_argument("--poses-dir", help="Dossier 'poses' du dataset (sinon, sélection des fichiers par boîte de dialogue)")
+parser.add_argument("--export-dir", help="Exporte chaque instance dans ce dossier au lieu de l'afficher")
+parser.add_argument("--format", choices=["mp4", "gif"], default="mp4", help="Format d'export (défaut : mp4)")
+parser.add_argument("--fps", type=int, default=25, help="Images par seconde de l'export (défaut : 25)")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    if args.export_dir:
+        if not args.poses_dir or not args.instances:
+            parser.error("--export-dir nécessite --poses-dir et au moins une instance")
+        for instance_id in args.instances:
+            output_path = Path(args.export_dir) / f"{instance_id}.{args.format}"
+            exporter_animation(charger_instance(args.poses_dir, instance_id), output_path, fps=args.fps)
+            print(f"[EXPORT] {instance_id} -> {output_path}")
+    elif args.poses_dir and args.instances:
+        afficher(charger_instance(args.poses_dir, args.instances[0]))
+    else:
+        afficher(choisir_fichiers())
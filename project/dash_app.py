@@ -1,123 +1,204 @@
 import dash
-from dash import dcc, html
+from dash import dcc, html, ctx, no_update
 from dash.dependencies import Input, Output
 import numpy as np
 import plotly.graph_objs as go
 import json
+from pathlib import Path
+from pose_store import pose_store
+from skeleton_geometry import POSE_CONNECTIONS, HAND_CONNECTIONS, line_segments
 
 # Initialisation de l'application Dash
 app = dash.Dash(__name__)
 
-# Connexions des parties du corps (par exemple, MediaPipe)
-pose_connections = [
-    (11, 12), (11, 13), (13, 15),
-    (12, 14), (14, 16), (11, 23),
-    (12, 24), (23, 24)
-]
-
-hand_connections = [
-    (0, 1), (1, 2), (2, 3), (3, 4),    
-    (0, 5), (5, 6), (6, 7), (7, 8),    
-    (0, 9), (9, 10), (10, 11), (11, 12),  
-    (0, 13), (13, 14), (14, 15), (15, 16), 
-    (0, 17), (17, 18), (18, 19), (19, 20)
-]
+# Paramètres de l'animation dans le navigateur
+FRAME_DURATION_MS = 40         # Durée d'une frame (25 images par seconde)
+MAX_ANIMATION_FRAMES = 1500    # Au-delà (60 s à 25 images par seconde), rendu serveur image par image
+COORD_DECIMALS = 4             # Précision des coordonnées envoyées (réduit la taille du JSON)
 
 # Layout de l'application Dash
 app.layout = html.Div([
     dcc.Store(id='video_paths', data={}),  # Stocker les chemins des fichiers .npy
+    # Mode de rendu : séquence envoyée une fois et animée par le navigateur, ou une figure par frame
+    dcc.RadioItems(
+        id='render-mode',
+        options=[
+            {'label': 'Animation dans le navigateur', 'value': 'client'},
+            {'label': 'Rendu serveur (image par image)', 'value': 'server'},
+        ],
+        value='client',
+        inline=True,
+    ),
+    # Avertissement affiché quand une séquence trop longue est rendue par le serveur
+    html.Div(id='render-notice'),
     dcc.Graph(id='skeleton-graph'),
     html.Button('Pause', id='pause-button', n_clicks=0),
-    dcc.Interval(id='interval-component', interval=40, n_intervals=0),
+    dcc.Interval(id='interval-component', interval=FRAME_DURATION_MS, n_intervals=0, disabled=True),
 ])
 
-# Fonction pour charger un fichier .npy donné par son chemin
-def charger_fichier(chemin):
-    """Charge un fichier .npy à partir d'un chemin donné."""
-    if not chemin:
-        raise FileNotFoundError(f"Aucun fichier trouvé pour le chemin spécifié : {chemin}")
-    return np.load(chemin)
+# Fonction pour ouvrir les fichiers .npy des parties du corps d'une instance
+def charger_poses(chemins):
+    """
+    Ouvre les fichiers .npy ({partie: chemin}) via le cache partagé : les fichiers ne sont
+    ouverts (en mmap) qu'une fois par instance et non à chaque rafraîchissement.
+    """
+    for partie, chemin in chemins.items():
+        if not chemin:
+            raise FileNotFoundError(f"Aucun fichier trouvé pour la partie : {partie}")
+    instance_id = Path(next(iter(chemins.values()))).stem  # Les fichiers portent le nom de l'instance
+    return pose_store.get(instance_id, chemins)
+
+# Tracés (articulations et lignes du squelette) d'une frame
+def traces_frame(left_hand, right_hand, pose, face):
+    # Coordonnées X et Y pour l'affichage 2D
+    x_pose, y_pose = pose[:, 0], pose[:, 1]
+    x_lh, y_lh = left_hand[:, 0], left_hand[:, 1]
+    x_rh, y_rh = right_hand[:, 0], right_hand[:, 1]
+    x_face, y_face = face[:, 0], face[:, 1]
+
+    # Lignes du squelette : une seule trace par partie du corps (liaisons séparées par NaN)
+    x_pose_lines, y_pose_lines = line_segments(pose, POSE_CONNECTIONS)
+    x_lh_lines, y_lh_lines = line_segments(left_hand, HAND_CONNECTIONS)
+    x_rh_lines, y_rh_lines = line_segments(right_hand, HAND_CONNECTIONS)
+
+    return [
+        dict(type='scatter', x=x_pose, y=y_pose, mode='markers', marker=dict(color='green', size=10), name='Pose'),
+        dict(type='scatter', x=x_lh, y=y_lh, mode='markers', marker=dict(color='red', size=6), name='Main Gauche'),
+        dict(type='scatter', x=x_rh, y=y_rh, mode='markers', marker=dict(color='blue', size=6), name='Main Droite'),
+        dict(type='scatter', x=x_face, y=y_face, mode='markers', marker=dict(color='orange', size=3), name='Visage'),
+        dict(type='scatter', x=x_pose_lines, y=y_pose_lines, mode='lines', line=dict(color='green', width=2), showlegend=False),
+        dict(type='scatter', x=x_lh_lines, y=y_lh_lines, mode='lines', line=dict(color='red', width=2), showlegend=False),
+        dict(type='scatter', x=x_rh_lines, y=y_rh_lines, mode='lines', line=dict(color='blue', width=2), showlegend=False),
+    ]
 
-# Écouteur pour recevoir les données envoyées par postMessage (du frontend)
+def layout_squelette(title, **kwargs):
+    return dict(
+        title=title,
+        xaxis=dict(title="X"),
+        yaxis=dict(title="Y", scaleanchor="x"),
+        hovermode='closest',
+        showlegend=True,
+        height=600,
+        **kwargs
+    )
+
+def figure_animee(poses, num_frames):
+    """
+    Figure contenant toute la séquence sous forme de frames Plotly : la lecture, la pause
+    et la navigation (curseur) sont gérées par le navigateur, sans appel au serveur par frame.
+    """
+    # Une seule lecture des fichiers mappés pour toute la séquence (coordonnées X et Y uniquement)
+    sequence = {part: np.round(np.asarray(array[:num_frames, :, :2], dtype=np.float32), COORD_DECIMALS) for part, array in poses.items()}
+
+    frames = [
+        dict(
+            name=str(i),
+            data=traces_frame(sequence['left_hand'][i], sequence['right_hand'][i], sequence['pose'][i], sequence['face'][i]),
+        )
+        for i in range(num_frames)
+    ]
+
+    # Axes fixes : ils ne sont pas recalculés pendant l'animation
+    coords = np.concatenate([array.reshape(-1, 2) for array in sequence.values()])
+    x_min, y_min = np.nanmin(coords, axis=0)
+    x_max, y_max = np.nanmax(coords, axis=0)
+
+    play = dict(frame=dict(duration=FRAME_DURATION_MS, redraw=False), fromcurrent=True, transition=dict(duration=0))
+    pause = dict(frame=dict(duration=0, redraw=False), mode='immediate', transition=dict(duration=0))
+    layout = layout_squelette(
+        f"Squelette 2D - {num_frames} frames",
+        updatemenus=[dict(
+            type='buttons',
+            direction='left',
+            x=0, y=-0.08, xanchor='left', yanchor='top',
+            buttons=[
+                dict(label='Lecture', method='animate', args=[None, play]),
+                dict(label='Pause', method='animate', args=[[None], pause]),
+            ],
+        )],
+        sliders=[dict(
+            active=0,
+            x=0.15, len=0.85, y=-0.05,
+            currentvalue=dict(prefix='Frame '),
+            steps=[dict(label=str(i), method='animate', args=[[str(i)], pause]) for i in range(num_frames)],
+        )],
+    )
+    layout['xaxis']['range'] = [float(x_min), float(x_max)]
+    layout['yaxis']['range'] = [float(y_min), float(y_max)]
+
+    return {'data': frames[0]['data'], 'layout': layout, 'frames': frames}
+
+def chemins_poses(video_paths):
+    """Fichier .npy de chaque partie du corps ({partie: [chemins]} envoyé par la page)."""
+    return {
+        partie: (video_paths.get(partie) or [None])[0]
+        for partie in ('left_hand', 'right_hand', 'pose', 'face')
+    }
+
+def mode_effectif(mode, num_frames):
+    """
+    Mode de rendu appliqué : une séquence de plus de MAX_ANIMATION_FRAMES frames n'est pas
+    envoyée au navigateur (taille de la figure), elle est rendue par le serveur en entier.
+    """
+    if mode == 'client' and num_frames > MAX_ANIMATION_FRAMES:
+        return 'server'
+    return mode
+
+# L'intervalle (une requête par frame) n'est actif qu'en mode rendu serveur
 @app.callback(
-    Output('video_paths', 'data'),
-    Input('interval-component', 'n_intervals'),
-    [dash.dependencies.State('video_paths', 'data')]
+    Output('interval-component', 'disabled'),
+    Output('render-notice', 'children'),
+    Input('render-mode', 'value'),
+    Input('video_paths', 'data')
 )
-def update_video_paths(n_intervals, current_data):
-    # Recevoir les chemins des poses envoyés via postMessage
-    return current_data  # Enregistre ou utilise les données ici
+def toggle_interval(mode, video_paths):
+    if mode != 'client' or not video_paths:
+        return mode == 'client', ""
+    num_frames = min(array.shape[0] for array in charger_poses(chemins_poses(video_paths)).values())
+    if mode_effectif(mode, num_frames) == 'server':
+        return False, (
+            f"Séquence de {num_frames} frames : au-delà de {MAX_ANIMATION_FRAMES} frames "
+            f"({MAX_ANIMATION_FRAMES * FRAME_DURATION_MS // 1000} s), l'animation est rendue par le serveur, image par image."
+        )
+    return True, ""
 
 # Mise à jour de l'animation avec les fichiers .npy
 @app.callback(
     Output('skeleton-graph', 'figure'),
     Input('interval-component', 'n_intervals'),
     Input('pause-button', 'n_clicks'),
-    [dash.dependencies.State('video_paths', 'data')]
+    Input('render-mode', 'value'),
+    # Input : de nouveaux chemins (écrits dans le store par la page) reconstruisent la figure.
+    # Aucun callback ne renvoie le store à chaque intervalle : une frame = un seul rendu.
+    Input('video_paths', 'data')
 )
-def update_graph(n_intervals, n_clicks, video_paths):
+def update_graph(n_intervals, n_clicks, mode, video_paths):
     if not video_paths:
         return go.Figure()  # Retourne une figure vide si aucun chemin n'est disponible
 
-    # Récupération des chemins des fichiers .npy pour chaque partie du corps
-    left_hand_paths = video_paths.get('left_hand', [])
-    right_hand_paths = video_paths.get('right_hand', [])
-    pose_paths = video_paths.get('pose', [])
-    face_paths = video_paths.get('face', [])
-
-    # Charger les fichiers .npy
-    left_hand_all = [charger_fichier(path) for path in left_hand_paths]
-    right_hand_all = [charger_fichier(path) for path in right_hand_paths]
-    pose_all = [charger_fichier(path) for path in pose_paths]
-    face_all = [charger_fichier(path) for path in face_paths]
+    # Récupération du fichier .npy de chaque partie du corps
+    poses = charger_poses(chemins_poses(video_paths))
 
     # Paramètres d'animation et création de la figure
-    current_frame = 0  # Frame courante par défaut
-    num_frames = min(len(left_hand_all), len(right_hand_all), len(pose_all), len(face_all))
+    num_frames = min(array.shape[0] for array in poses.values())
 
-    # Extraction des données pour l'affichage
-    left_hand = left_hand_all[current_frame]
-    right_hand = right_hand_all[current_frame]
-    pose = pose_all[current_frame]
-    face = face_all[current_frame]
+    if mode_effectif(mode, num_frames) == 'client':
+        # La pause est gérée par les boutons de la figure animée
+        if ctx.triggered_id == 'pause-button':
+            return no_update
+        return figure_animee(poses, num_frames)
 
-    # Coordonnées X et Y pour l'affichage 2D
-    x_pose, y_pose = pose[:, 0], pose[:, 1]
-    x_lh, y_lh = left_hand[:, 0], left_hand[:, 1]
-    x_rh, y_rh = right_hand[:, 0], right_hand[:, 1]
-    x_face, y_face = face[:, 0], face[:, 1]
+    current_frame = n_intervals % num_frames  # Frame courante
 
-    # Tracé des lignes du squelette (par exemple, bras, tête, etc.)
-    pose_lines = [
-        go.Scatter(x=[x_pose[i], x_pose[j]], y=[y_pose[i], y_pose[j]], mode='lines', line=dict(color='green', width=2))
-        for (i, j) in pose_connections if i < pose.shape[0] and j < pose.shape[0]
-    ]
-
-    hand_lines_left = [
-        go.Scatter(x=[x_lh[i], x_lh[j]], y=[y_lh[i], y_lh[j]], mode='lines', line=dict(color='red', width=2))
-        for (i, j) in hand_connections
-    ]
-
-    hand_lines_right = [
-        go.Scatter(x=[x_rh[i], x_rh[j]], y=[y_rh[i], y_rh[j]], mode='lines', line=dict(color='blue', width=2))
-        for (i, j) in hand_connections
-    ]
+    # Extraction des données pour l'affichage (vues sur les fichiers mappés, sans copie)
+    left_hand = poses['left_hand'][current_frame]
+    right_hand = poses['right_hand'][current_frame]
+    pose = poses['pose'][current_frame]
+    face = poses['face'][current_frame]
 
     figure = {
-        'data': [
-            go.Scatter(x=x_pose, y=y_pose, mode='markers', marker=dict(color='green', size=10), name='Pose'),
-            go.Scatter(x=x_lh, y=y_lh, mode='markers', marker=dict(color='red', size=6), name='Main Gauche'),
-            go.Scatter(x=x_rh, y=y_rh, mode='markers', marker=dict(color='blue', size=6), name='Main Droite'),
-            go.Scatter(x=x_face, y=y_face, mode='markers', marker=dict(color='orange', size=3), name='Visage')
-        ] + pose_lines + hand_lines_left + hand_lines_right,
-        'layout': go.Layout(
-            title=f"Squelette 2D - Frame {current_frame}/{num_frames-1}",
-            xaxis=dict(title="X"),
-            yaxis=dict(title="Y", scaleanchor="x"),
-            hovermode='closest',
-            showlegend=True,
-            height=600
-        )
+        'data': traces_frame(left_hand, right_hand, pose, face),
+        'layout': layout_squelette(f"Squelette 2D - Frame {current_frame}/{num_frames-1}")
     }
 
     return figure
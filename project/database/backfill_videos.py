@@ -0,0 +1,64 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+from sqlalchemy import select, update
+from database.db_init import engine_cont, engine_isol, SessionCont, SessionIsol
+from database.db import add_video_metadata_columns
+from database.video_probe import probe_videos
+from schema.models_cont import ContVideo
+from schema.models_isol import IsolVideo
+
+# --------------------------------------------------------------------
+"""Remplissage des métadonnées vidéo (durée, fps, résolution, codec) des lignes existantes"""
+# --------------------------------------------------------------------
+DATASETS = {
+    "cont": (engine_cont, SessionCont, ContVideo),
+    "isol": (engine_isol, SessionIsol, IsolVideo),
+}
+
+async def backfill_videos(db_key: str, workers: int, force: bool = False):
+    """Sonde les vidéos dont la durée est inconnue (ou toutes avec --force) et met à jour la table."""
+    engine, session_factory, model = DATASETS[db_key]
+
+    # Les colonnes n'existent pas encore dans les bases créées avant leur introduction
+    async with engine.begin() as conn:
+        await add_video_metadata_columns(conn, model.__table__)
+
+    async with session_factory() as session:
+        query = select(model.video_id, model.path)
+        if not force:
+            query = query.where(model.duration_s.is_(None))
+        rows = (await session.execute(query)).all()
+        print(f"[{db_key}] {len(rows)} vidéo(s) à sonder.")
+        if not rows:
+            return
+
+        metadata_by_path = await asyncio.to_thread(probe_videos, [row.path for row in rows], workers)
+
+        # UPDATE groupé par clé primaire
+        await session.execute(
+            update(model),
+            [{"video_id": row.video_id, **metadata_by_path[row.path]} for row in rows],
+        )
+        await session.commit()
+
+    unknown = sum(1 for metadata in metadata_by_path.values() if metadata["duration_s"] is None)
+    print(f"[{db_key}] {len(rows) - unknown} vidéo(s) mises à jour, {unknown} sans durée lisible.")
+
+async def main(db_keys, workers: int, force: bool):
+    for db_key in db_keys:
+        await backfill_videos(db_key, workers, force)
+
+# Ajout d'arguments pour choisir la base à compléter
+parser = argparse.ArgumentParser(description="Complète les métadonnées des vidéos déjà présentes en base.")
+parser.add_argument("db", choices=["cont", "isol", "all"], help="Base de données à compléter ('cont', 'isol', ou 'all')")
+parser.add_argument("--workers", type=int, default=8, help="Nombre de vidéos sondées en parallèle")
+parser.add_argument("--force", action="store_true", help="Sonder à nouveau toutes les vidéos, même celles déjà renseignées")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.run(main(["cont", "isol"] if args.db == "all" else [args.db], args.workers, args.force))
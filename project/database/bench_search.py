@@ -0,0 +1,107 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+import argparse
+import asyncio
+import statistics
+from sqlalchemy import text
+from database.db_init import engine_cont
+
+# --------------------------------------------------------------------
+"""Benchmark de la recherche ILIKE '%terme%' avec et sans index pg_trgm"""
+# --------------------------------------------------------------------
+# Le corpus synthétique est créé dans des tables temporaires : les tables
+# 'words' et 'subtitles' de la base ne sont jamais modifiées.
+
+# Vocabulaire utilisé pour générer les glosses et les sous-titres
+VOCABULAIRE = [
+    "bonjour", "merci", "maison", "manger", "travail", "famille", "école", "voiture",
+    "aujourd'hui", "demain", "hier", "ami", "enfant", "parler", "comprendre", "signe",
+    "main", "regarder", "apprendre", "beaucoup", "petit", "grand", "ville", "temps",
+]
+
+# Termes recherchés (gloss, phrase courte)
+TERMES = ["bonjour", "manger", "ami", "la maison"]
+
+async def remplir_corpus(conn, n_rows: int):
+    """Crée et remplit les tables temporaires bench_words et bench_subtitles."""
+    vocab = "ARRAY[" + ", ".join("'" + w.replace("'", "''") + "'" for w in VOCABULAIRE) + "]"
+    n_vocab = len(VOCABULAIRE)
+
+    await conn.execute(text("CREATE TEMP TABLE bench_words (word_id serial PRIMARY KEY, word varchar NOT NULL)"))
+    await conn.execute(text("CREATE TEMP TABLE bench_subtitles (sub_id serial PRIMARY KEY, text text NOT NULL)"))
+
+    # Glosses : un mot du vocabulaire suivi d'un suffixe numérique (ex. MANGER_12)
+    await conn.execute(text(f"""
+        INSERT INTO bench_words (word)
+        SELECT upper(({vocab})[1 + floor(random() * {n_vocab})::int]) || '_' || floor(random() * 50)::int
+        FROM generate_series(1, :n)
+    """), {"n": n_rows})
+
+    # Sous-titres : phrases de 4 à 8 mots tirés du vocabulaire
+    await conn.execute(text(f"""
+        INSERT INTO bench_subtitles (text)
+        SELECT (
+            SELECT string_agg(({vocab})[1 + floor(random() * {n_vocab})::int], ' ')
+            FROM generate_series(1, 4 + (g % 5))
+        )
+        FROM generate_series(1, :n) AS g
+    """), {"n": n_rows})
+
+    await conn.execute(text("ANALYZE bench_words"))
+    await conn.execute(text("ANALYZE bench_subtitles"))
+
+async def mesurer(conn, repeat: int) -> dict:
+    """Retourne la latence médiane (ms) de chaque recherche."""
+    requetes = {
+        "words": "SELECT count(*) FROM bench_words WHERE word ILIKE :pattern",
+        "subtitles": "SELECT count(*) FROM bench_subtitles WHERE text ILIKE :pattern",
+    }
+    latences = {}
+    for table, sql in requetes.items():
+        for terme in TERMES:
+            durees = []
+            for _ in range(repeat):
+                debut = time.perf_counter()
+                await conn.execute(text(sql), {"pattern": f"%{terme}%"})
+                durees.append((time.perf_counter() - debut) * 1000)
+            latences[(table, terme)] = statistics.median(durees)
+    return latences
+
+async def main(n_rows: int, repeat: int):
+    async with engine_cont.connect() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+        print(f"Génération d'un corpus synthétique de {n_rows} annotations par table...")
+        debut = time.perf_counter()
+        await remplir_corpus(conn, n_rows)
+        print(f"Corpus généré en {time.perf_counter() - debut:.1f} s")
+
+        sans_index = await mesurer(conn, repeat)
+
+        print("Création des index GIN pg_trgm...")
+        await conn.execute(text("CREATE INDEX ON bench_words USING gin (word gin_trgm_ops)"))
+        await conn.execute(text("CREATE INDEX ON bench_subtitles USING gin (text gin_trgm_ops)"))
+        await conn.execute(text("ANALYZE bench_words"))
+        await conn.execute(text("ANALYZE bench_subtitles"))
+
+        avec_index = await mesurer(conn, repeat)
+        await conn.rollback()
+
+    print(f"\n{'table':<10} {'terme':<12} {'sans index (ms)':>16} {'avec index (ms)':>16} {'gain':>8}")
+    for (table, terme), avant in sans_index.items():
+        apres = avec_index[(table, terme)]
+        gain = avant / apres if apres else float("inf")
+        print(f"{table:<10} {terme:<12} {avant:>16.1f} {apres:>16.1f} {gain:>7.1f}x")
+
+    await engine_cont.dispose()
+
+parser = argparse.ArgumentParser(description="Mesure la latence de la recherche de glosses et de sous-titres avec et sans index pg_trgm.")
+parser.add_argument("--rows", type=int, default=1_000_000, help="Nombre d'annotations synthétiques par table (défaut : 1 000 000)")
+parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures par requête (la médiane est retenue)")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
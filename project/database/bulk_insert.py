@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import asyncio
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy.ext.asyncio import AsyncSession
+from schema.models_cont import ContInstance
+from schema.models_isol import IsolInstance
+from database.insert_db import ANNOT_FILES, fetch_instance_ids, report_skipped
+from database.video_probe import probe_videos, VIDEO_METADATA_COLUMNS
+
+# --------------------------------------------------------------------
+"""Chargement en masse (COPY) des datasets CONT et ISOL"""
+# --------------------------------------------------------------------
+# Chaque table est alimentée par un flux d'enregistrements envoyé par lots
+# via asyncpg `copy_records_to_table`, avec un seul commit par table.
+
+BATCH_SIZE = 50_000
+BODY_PARTS = ['face', 'left_hand', 'pose', 'right_hand']
+
+# Colonnes alimentées par COPY (les clés autoincrémentées sont laissées à PostgreSQL)
+COLUMNS = {
+    "instances_cont": ("id", "signer_id", "session_id", "task_id", "n_frames", "n_signs"),
+    "videos_cont": ("instance_id", "path") + VIDEO_METADATA_COLUMNS,
+    "words": ("instance_id", "word", "sign_type", "hand_type", "start_time", "end_time"),
+    "subtitles": ("instance_id", "text", "start_time", "end_time"),
+    "poses_cont": ("instance_id", "pose_part", "pose_path"),
+    "instances_iso": ("id", "sign", "signer", "start", "end"),
+    "videos_iso": ("instance_id", "path") + VIDEO_METADATA_COLUMNS,
+    "poses_iso": ("instance_id", "pose_part", "pose_path"),
+}
+
+# --- Outils COPY -------------------------------------------
+def batched(records, batch_size: int):
+    """Découpe un flux d'enregistrements en listes de taille batch_size."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def copy_records(session: AsyncSession, table: str, records, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Envoie les enregistrements dans `table` par COPY, lot par lot, puis commit une seule fois.
+    Affiche et retourne le débit obtenu (lignes/seconde).
+    """
+    async def batches():
+        for batch in batched(records, batch_size):
+            yield batch
+
+    return await copy_batches(session, table, batches())
+
+async def copy_batches(session: AsyncSession, table: str, batches) -> dict:
+    """Comme copy_records, pour un flux asynchrone de lots déjà constitués."""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection  # Connexion asyncpg sous-jacente
+
+    start = time.perf_counter()
+    total_rows = 0
+    async for batch in batches:
+        await driver_connection.copy_records_to_table(table, records=batch, columns=COLUMNS[table])
+        total_rows += len(batch)
+    await session.commit()
+    elapsed = time.perf_counter() - start
+
+    rows_per_second = total_rows / elapsed if elapsed > 0 else 0.0
+    print(f"[COPY] {table:<15} {total_rows:>10} lignes en {elapsed:7.2f} s ({rows_per_second:,.0f} lignes/s)")
+    return {"table": table, "rows": total_rows, "seconds": elapsed, "rows_per_second": rows_per_second}
+
+# --- Flux d'enregistrements -------------------------------------------
+def iter_instances_cont(csv_path: str, chunksize: int = BATCH_SIZE):
+    # Lecture du CSV par morceaux pour ne pas le charger entièrement en mémoire
+    for chunk in pd.read_csv(csv_path, sep=';', chunksize=chunksize):
+        for row in chunk.itertuples(index=False):
+            yield (str(row.id), int(row.signer_id), int(row.session_id), int(row.task_id), int(row.n_frames), int(row.n_signs))
+
+def iter_instances_isol(csv_path: str, chunksize: int = BATCH_SIZE):
+    for chunk in pd.read_csv(csv_path, delimiter=',', chunksize=chunksize):
+        for row in chunk.itertuples(index=False):
+            yield (str(row.id), str(row.sign), str(row.signer), int(row.start), int(row.end))
+
+def keep_known(records, known_ids: set, skipped: set):
+    """Ne garde que les enregistrements dont l'instance (premier champ) existe."""
+    for record in records:
+        if record[0] in known_ids:
+            yield record
+        else:
+            skipped.add(record[0])
+
+def parse_word_annotation_file(annotation_file_path: str, hand_type: str, sign_type: str) -> list:
+    """Lit et normalise un fichier d'annotations de mots (exécutable dans un processus séparé)."""
+    assert os.path.exists(annotation_file_path), f"Le fichier d'annotation n'existe pas : {annotation_file_path}"
+    with open(annotation_file_path, 'r') as f:
+        annotations_data = json.load(f)
+
+    return [
+        (instance_id, annotation['value'], sign_type, hand_type, int(annotation['start']), int(annotation['end']))
+        for instance_id, annotations in annotations_data.items()
+        for annotation in annotations
+    ]
+
+def parse_subtitles_file(subtitles_file_path: str) -> list:
+    """Lit et normalise subtitles.json (exécutable dans un processus séparé)."""
+    with open(subtitles_file_path, 'r') as f:
+        subtitles_data = json.load(f)
+
+    return [
+        (instance_id, subtitle['value'], int(subtitle['start']), int(subtitle['end']))
+        for instance_id, subtitles in subtitles_data.items()
+        for subtitle in subtitles
+    ]
+
+def parse_instances_cont(csv_path: str) -> list:
+    """Lit et normalise instances.csv (exécutable dans un processus séparé)."""
+    return list(iter_instances_cont(csv_path))
+
+def iter_word_annotations_cont(annotations_folder: str, known_ids: set, skipped: set):
+    for annotation_file, metadata in ANNOT_FILES.items():
+        annotation_file_path = os.path.join(annotations_folder, annotation_file)
+        records = parse_word_annotation_file(annotation_file_path, metadata['hand_type'], metadata['sign_type'])
+        yield from keep_known(records, known_ids, skipped)
+
+def iter_subtitles_cont(subtitles_file_path: str, known_ids: set, skipped: set):
+    yield from keep_known(parse_subtitles_file(subtitles_file_path), known_ids, skipped)
+
+def iter_poses(poses_folder: str, known_ids: set, skipped: set):
+    # Regroupe les poses par instance puis par partie du corps, comme insert_poses_cont/isol
+    pose_files = []
+    for body_part in BODY_PARTS:
+        body_part_folder = Path(poses_folder) / body_part
+        if not body_part_folder.exists():
+            continue
+        for pose_file in body_part_folder.glob('*.npy'):
+            pose_files.append((pose_file.stem, body_part, str(pose_file)))
+
+    for instance_id, body_part, pose_path in sorted(pose_files):
+        if instance_id not in known_ids:
+            skipped.add(instance_id)
+            continue
+        yield (instance_id, body_part, pose_path)
+
+def iter_videos(video_paths: list, metadata_by_path: dict, known_ids: set, skipped: set):
+    for video_path in video_paths:
+        instance_id = Path(video_path).stem
+        if instance_id not in known_ids:
+            skipped.add(instance_id)
+            continue
+        metadata = metadata_by_path[video_path]
+        yield (instance_id, video_path) + tuple(metadata[column] for column in VIDEO_METADATA_COLUMNS)
+
+async def list_and_probe_videos(folder_path: str):
+    video_folder = Path(folder_path) / 'videos'
+    assert video_folder.exists(), f"Le dossier 'videos' n'existe pas : {video_folder}"
+    video_paths = [str(f) for f in sorted(video_folder.glob('*.mp4'), key=lambda x: x.stem)]
+    metadata_by_path = await asyncio.to_thread(probe_videos, video_paths)
+    return video_paths, metadata_by_path
+
+# --- Chargements complets -------------------------------------------
+async def bulk_load_cont(session: AsyncSession, cont_folder_path: str, batch_size: int = BATCH_SIZE) -> list:
+    """Charge instances, vidéos, mots, sous-titres et poses de CONT ; retourne le débit par table."""
+    annotations_folder = os.path.join(cont_folder_path, 'annotations')
+    assert os.path.exists(annotations_folder), f"Le dossier 'annotations' n'existe pas : {annotations_folder}"
+    report = []
+
+    report.append(await copy_records(
+        session, "instances_cont", iter_instances_cont(os.path.join(cont_folder_path, 'instances.csv'), batch_size), batch_size
+    ))
+    # Instances connues : les lignes orphelines feraient échouer le COPY
+    known_ids = await fetch_instance_ids(session, ContInstance)
+
+    video_paths, metadata_by_path = await list_and_probe_videos(cont_folder_path)
+    skipped = set()
+    report.append(await copy_records(session, "videos_cont", iter_videos(video_paths, metadata_by_path, known_ids, skipped), batch_size))
+    report_skipped("vidéo(s)", "instances_cont", skipped)
+
+    skipped = set()
+    report.append(await copy_records(session, "words", iter_word_annotations_cont(annotations_folder, known_ids, skipped), batch_size))
+    report_skipped("instance(s) d'annotations de mots", "instances_cont", skipped)
+
+    subtitles_file_path = os.path.join(annotations_folder, 'subtitles.json')
+    assert os.path.exists(subtitles_file_path), f"Le fichier 'subtitles.json' n'existe pas : {subtitles_file_path}"
+    skipped = set()
+    report.append(await copy_records(session, "subtitles", iter_subtitles_cont(subtitles_file_path, known_ids, skipped), batch_size))
+    report_skipped("instance(s) de sous-titres", "instances_cont", skipped)
+
+    skipped = set()
+    report.append(await copy_records(session, "poses_cont", iter_poses(os.path.join(cont_folder_path, 'poses'), known_ids, skipped), batch_size))
+    report_skipped("instance(s) de poses", "instances_cont", skipped)
+
+    return report
+
+async def bulk_load_isol(session: AsyncSession, isol_folder_path: str, batch_size: int = BATCH_SIZE) -> list:
+    """Charge instances, vidéos et poses de ISOL ; retourne le débit par table."""
+    instance_csv_path = os.path.join(isol_folder_path, 'instances.csv')
+    assert os.path.exists(instance_csv_path), f"Le fichier 'instances.csv' n'existe pas : {instance_csv_path}"
+    report = []
+
+    report.append(await copy_records(session, "instances_iso", iter_instances_isol(instance_csv_path, batch_size), batch_size))
+    known_ids = await fetch_instance_ids(session, IsolInstance)
+
+    video_paths, metadata_by_path = await list_and_probe_videos(isol_folder_path)
+    skipped = set()
+    report.append(await copy_records(session, "videos_iso", iter_videos(video_paths, metadata_by_path, known_ids, skipped), batch_size))
+    report_skipped("vidéo(s)", "instances_iso", skipped)
+
+    skipped = set()
+    report.append(await copy_records(session, "poses_iso", iter_poses(os.path.join(isol_folder_path, 'poses'), known_ids, skipped), batch_size))
+    report_skipped("instance(s) de poses", "instances_iso", skipped)
+
+    return report
+
+# --- Chargement parallèle (analyse multi-processus, écriture unique) -------------------------------------------
+async def batches_as_completed(futures, known_ids: set, skipped: set, batch_size: int):
+    """Lots d'enregistrements filtrés, produits au fur et à mesure que les processus terminent."""
+    for future in asyncio.as_completed(futures):
+        records = await future
+        for batch in batched(keep_known(records, known_ids, skipped), batch_size):
+            yield batch
+
+async def parallel_load_cont(session: AsyncSession, cont_folder_path: str, workers: int, batch_size: int = BATCH_SIZE) -> list:
+    """
+    Variante de bulk_load_cont : instances.csv, les six fichiers d'annotations de mots et
+    subtitles.json sont analysés en parallèle dans un pool de `workers` processus,
+    pendant qu'une seule connexion écrit les lots par COPY.
+    """
+    annotations_folder = os.path.join(cont_folder_path, 'annotations')
+    assert os.path.exists(annotations_folder), f"Le dossier 'annotations' n'existe pas : {annotations_folder}"
+    subtitles_file_path = os.path.join(annotations_folder, 'subtitles.json')
+    assert os.path.exists(subtitles_file_path), f"Le fichier 'subtitles.json' n'existe pas : {subtitles_file_path}"
+    loop = asyncio.get_running_loop()
+    report = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Toutes les analyses sont lancées d'emblée
+        instances_future = loop.run_in_executor(pool, parse_instances_cont, os.path.join(cont_folder_path, 'instances.csv'))
+        word_futures = [
+            loop.run_in_executor(pool, parse_word_annotation_file, os.path.join(annotations_folder, annotation_file),
+                                 metadata['hand_type'], metadata['sign_type'])
+            for annotation_file, metadata in ANNOT_FILES.items()
+        ]
+        subtitles_future = loop.run_in_executor(pool, parse_subtitles_file, subtitles_file_path)
+
+        # Les instances sont écrites en premier : les autres tables y font référence
+        report.append(await copy_records(session, "instances_cont", await instances_future, batch_size))
+        known_ids = await fetch_instance_ids(session, ContInstance)
+
+        video_paths, metadata_by_path = await list_and_probe_videos(cont_folder_path)
+        skipped = set()
+        report.append(await copy_records(session, "videos_cont", iter_videos(video_paths, metadata_by_path, known_ids, skipped), batch_size))
+        report_skipped("vidéo(s)", "instances_cont", skipped)
+
+        skipped = set()
+        report.append(await copy_batches(session, "words", batches_as_completed(word_futures, known_ids, skipped, batch_size)))
+        report_skipped("instance(s) d'annotations de mots", "instances_cont", skipped)
+
+        skipped = set()
+        report.append(await copy_batches(session, "subtitles", batches_as_completed([subtitles_future], known_ids, skipped, batch_size)))
+        report_skipped("instance(s) de sous-titres", "instances_cont", skipped)
+
+    skipped = set()
+    report.append(await copy_records(session, "poses_cont", iter_poses(os.path.join(cont_folder_path, 'poses'), known_ids, skipped), batch_size))
+    report_skipped("instance(s) de poses", "instances_cont", skipped)
+
+    return report
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from sqlalchemy import Float, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func, distinct, cast
+from schema.models_cont import ContInstance, ContVideo, WordAnnotation, SubtitleAnnotation, ContDatasetStat
+from schema.models_isol import IsolInstance, IsolDatasetStat
+
+# --------------------------------------------------------------------
+"""Statistiques générales pré-calculées (table dataset_stats de chaque base)"""
+# --------------------------------------------------------------------
+# Les métriques de /stats/general ne changent qu'à l'ingestion : elles sont calculées
+# en une requête par base (une sous-requête scalaire par métrique), puis enregistrées
+# avec leur date de calcul. L'endpoint lit ensuite une seule table par base.
+
+def general_stats_queries_cont() -> dict:
+    # Moyenne des clips par gloss
+    clips_per_gloss = select(func.count(WordAnnotation.word_id).label("count")).group_by(WordAnnotation.word).subquery()
+    # Moyenne de gloss par vidéo
+    glosses_per_video = (
+        select(ContVideo.instance_id, func.count(WordAnnotation.word_id).label("count"))
+        .join(ContInstance, ContInstance.id == ContVideo.instance_id)
+        .join(WordAnnotation, WordAnnotation.instance_id == ContInstance.id)
+        .group_by(ContVideo.instance_id)
+        .subquery()
+    )
+    # Moyenne de phrases par vidéo
+    phrases_per_video = (
+        select(ContVideo.instance_id, func.count(SubtitleAnnotation.sub_id).label("count"))
+        .join(ContInstance, ContInstance.id == ContVideo.instance_id)
+        .join(SubtitleAnnotation, SubtitleAnnotation.instance_id == ContInstance.id)
+        .group_by(ContVideo.instance_id)
+        .subquery()
+    )
+    return {
+        "total_clips_cont": select(func.count()).select_from(ContInstance),
+        "total_glosses_cont": select(func.count(distinct(WordAnnotation.word))),
+        "total_signers_cont": select(func.count(distinct(ContInstance.signer_id))),
+        "avg_clip_duration_cont": select(func.avg(cast(WordAnnotation.end_time - WordAnnotation.start_time, Float))),
+        "avg_clips_per_gloss_cont": select(func.avg(cast(clips_per_gloss.c.count, Float))),
+        "avg_glosses_per_video_cont": select(func.avg(cast(glosses_per_video.c.count, Float))),
+        "avg_phrases_per_video_cont": select(func.avg(cast(phrases_per_video.c.count, Float))),
+    }
+
+def general_stats_queries_isol() -> dict:
+    # Moyenne des clips par gloss
+    clips_per_gloss = select(func.count(IsolInstance.id).label("count")).group_by(IsolInstance.sign).subquery()
+    return {
+        "total_clips_isol": select(func.count()).select_from(IsolInstance),
+        "total_glosses_isol": select(func.count(distinct(IsolInstance.sign))),
+        "total_signers_isol": select(func.count(distinct(IsolInstance.signer))),
+        "avg_clip_duration_isol": select(func.avg(cast(IsolInstance.end - IsolInstance.start, Float))),
+        "avg_clips_per_gloss_isol": select(func.avg(cast(clips_per_gloss.c.count, Float))),
+    }
+
+DATASETS = {
+    "cont": (ContDatasetStat, general_stats_queries_cont),
+    "isol": (IsolDatasetStat, general_stats_queries_isol),
+}
+
+async def compute_general_stats(session: AsyncSession, db_key: str) -> dict:
+    """Calcule toutes les métriques d'une base en une requête (sans les enregistrer)."""
+    _, queries = DATASETS[db_key]
+    statement = select(*[query.scalar_subquery().label(name) for name, query in queries().items()])
+    row = (await session.execute(statement)).one()
+    return {name: (float(value) if value is not None else None) for name, value in row._mapping.items()}
+
+async def refresh_general_stats(session: AsyncSession, db_key: str) -> dict:
+    """Recalcule les métriques d'une base et remplace les valeurs enregistrées (à appeler après une ingestion)."""
+    stat_model, _ = DATASETS[db_key]
+    values = await compute_general_stats(session, db_key)
+    computed_at = datetime.now(timezone.utc)
+
+    stmt = pg_insert(stat_model).values([
+        {"name": name, "value": value, "computed_at": computed_at} for name, value in values.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"value": stmt.excluded.value, "computed_at": stmt.excluded.computed_at},
+    )
+    await session.execute(stmt)
+    await session.commit()
+    print(f"[STATS] {db_key} : {len(values)} métrique(s) recalculée(s) à {computed_at.isoformat()}")
+    return values
+
+async def read_general_stats(session: AsyncSession, db_key: str):
+    """
+    Lit les métriques enregistrées d'une base : ({nom: valeur}, date du calcul le plus ancien).
+    Retourne ({}, None) si elles n'ont jamais été calculées.
+    """
+    stat_model, _ = DATASETS[db_key]
+    rows = (await session.execute(select(stat_model))).scalars().all()
+    if not rows:
+        return {}, None
+    return {row.name: row.value for row in rows}, min(row.computed_at for row in rows)
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from schema.models_cont import ContDatasetVersion
+from schema.models_isol import IsolDatasetVersion
+
+# --------------------------------------------------------------------
+"""Version des données de chaque base (invalidation des réponses en cache)"""
+# --------------------------------------------------------------------
+# Une seule ligne par base (id = 1) : le numéro est incrémenté à la fin de chaque ingestion.
+# Les réponses en cache des endpoints /stats/* sont indexées par ce numéro
+# (route/response_cache.py) : une nouvelle ingestion les rend obsolètes.
+
+VERSION_ROW_ID = 1
+DATASETS = {
+    "cont": ContDatasetVersion,
+    "isol": IsolDatasetVersion,
+}
+
+async def bump_dataset_version(session: AsyncSession, db_key: str) -> int:
+    """Incrémente la version d'une base (la crée à 1) et retourne le nouveau numéro."""
+    model = DATASETS[db_key]
+    stmt = pg_insert(model).values(id=VERSION_ROW_ID, version=1, updated_at=datetime.now(timezone.utc))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={"version": model.version + 1, "updated_at": stmt.excluded.updated_at},
+    ).returning(model.version)
+    version = (await session.execute(stmt)).scalar_one()
+    await session.commit()
+    print(f"[VERSION] {db_key} : version des données {version}")
+    return version
+
+async def read_dataset_version(session: AsyncSession, db_key: str):
+    """Retourne (version, date de l'ingestion) d'une base, (0, None) si elle n'a jamais été incrémentée."""
+    row = (await session.execute(select(DATASETS[db_key]).where(DATASETS[db_key].id == VERSION_ROW_ID))).scalar_one_or_none()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
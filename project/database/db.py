@@ -3,11 +3,39 @@ import sys
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 import asyncio
+import argparse
+from sqlalchemy import text
 from database.db_init import engine_cont, engine_isol
 from db_init import SessionCont, SessionIsol
 from schema import models_cont, models_isol
+from database.video_probe import VIDEO_METADATA_COLUMNS
 from insert_db import insert_videos_cont, insert_instances_cont, insert_word_annotations_cont, insert_subtitles_cont, insert_poses_cont
 from insert_db import insert_videos_isol, insert_instances_isol, insert_poses_isol
+from database.bulk_insert import bulk_load_cont, bulk_load_isol, parallel_load_cont, BATCH_SIZE
+from database.incremental import incremental_load_cont, incremental_load_isol
+from database.dataset_stats import refresh_general_stats
+from database.dataset_version import bump_dataset_version
+
+# --------------------------------------------------------------------
+"""Index de recherche (pg_trgm) sur les glosses et les sous-titres, index fonctionnel sur les signes"""
+# --------------------------------------------------------------------
+SEARCH_TABLES_CONT = [models_cont.WordAnnotation.__table__, models_cont.SubtitleAnnotation.__table__]
+SEARCH_TABLES_ISOL = [models_isol.IsolInstance.__table__]
+
+def create_search_indexes(sync_conn, tables=SEARCH_TABLES_CONT):
+    # create_all ne crée les index qu'avec les tables : on les ajoute aussi aux bases existantes
+    for table in tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+# --------------------------------------------------------------------
+"""Colonnes de métadonnées vidéo (ajoutées aux tables créées avant leur introduction)"""
+# --------------------------------------------------------------------
+async def add_video_metadata_columns(conn, table):
+    for column in table.columns:
+        if column.name in VIDEO_METADATA_COLUMNS:
+            sql_type = column.type.compile(dialect=conn.dialect)
+            await conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {sql_type}"))
 
 # --------------------------------------------------------------------
 """Initialisation des bases de données"""
@@ -16,34 +44,84 @@ async def init_db():
     print("Creating tables in the databases... ... ...")
     
     async with engine_cont.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(models_cont.BaseCont.metadata.create_all)
-        print("Tables created for database 'cont'.")
+        await conn.run_sync(create_search_indexes)
+        await add_video_metadata_columns(conn, models_cont.ContVideo.__table__)
+        print("Tables and search indexes created for database 'cont'.")
     
     async with engine_isol.begin() as conn:
         await conn.run_sync(models_isol.BaseIsol.metadata.create_all)
-        print("Tables created for database 'isol'.")
+        await conn.run_sync(create_search_indexes, SEARCH_TABLES_ISOL)
+        await add_video_metadata_columns(conn, models_isol.IsolVideo.__table__)
+        print("Tables and sign index created for database 'isol'.")
 
 # --------------------------------------------------------------------
 """Fonction principale pour exécuter les insertions asynchrones"""
 # --------------------------------------------------------------------
-async def main():
+CONT_FOLDER = r"E:\lsfb dataset\cont"
+ISOL_FOLDER = r"E:\lsfb dataset\isol"
+
+async def load_datasets(session_cont, session_isol, bulk: bool, batch_size: int, workers: int, incremental: bool):
+    if incremental:
+        # Seuls les fichiers et instances modifiés depuis la dernière exécution sont réécrits
+        await incremental_load_cont(session_cont, CONT_FOLDER)
+        await incremental_load_isol(session_isol, ISOL_FOLDER)
+        return
+    if bulk:
+        if workers > 1:
+            # Analyse des fichiers CONT dans un pool de processus, écriture par COPY
+            await parallel_load_cont(session_cont, CONT_FOLDER, workers, batch_size)
+        else:
+            # Chargement en masse par COPY, un commit par table
+            await bulk_load_cont(session_cont, CONT_FOLDER, batch_size)
+        await bulk_load_isol(session_isol, ISOL_FOLDER, batch_size)
+        return
+
+    # Insertion pour 'cont'
+    await insert_instances_cont(session_cont, os.path.join(CONT_FOLDER, "instances.csv"))
+    await insert_videos_cont(session_cont, CONT_FOLDER)
+    await insert_word_annotations_cont(session_cont, CONT_FOLDER)
+    await insert_subtitles_cont(session_cont, CONT_FOLDER)
+    await insert_poses_cont(session_cont, CONT_FOLDER)
+
+    # Insertion pour 'isol'
+    await insert_instances_isol(session_isol, ISOL_FOLDER)
+    await insert_videos_isol(session_isol, ISOL_FOLDER)
+    await insert_poses_isol(session_isol, ISOL_FOLDER)
+
+async def main(bulk: bool = False, batch_size: int = BATCH_SIZE, workers: int = 1, incremental: bool = False):
     # Initialisation de la base de données
     await init_db()
 
     # Insertions asynchrones des données
     async with SessionCont() as session_cont, SessionIsol() as session_isol:
-        # Insertion pour 'cont'
-        await insert_instances_cont(session_cont, r"E:\lsfb dataset\cont\instances.csv")
-        await insert_videos_cont(session_cont, r"E:\lsfb dataset\cont")
-        await insert_word_annotations_cont(session_cont, r"E:\lsfb dataset\cont")
-        await insert_subtitles_cont(session_cont, r"E:\lsfb dataset\cont")
-        await insert_poses_cont(session_cont, r"E:\lsfb dataset\cont")
-
-        # Insertion pour 'isol'
-        await insert_instances_isol(session_isol, r"E:\lsfb dataset\isol")
-        await insert_videos_isol(session_isol, r"E:\lsfb dataset\isol")
-        await insert_poses_isol(session_isol, r"E:\lsfb dataset\isol")
+        await load_datasets(session_cont, session_isol, bulk, batch_size, workers, incremental)
+
+        # Les statistiques générales (/stats/general) ne changent qu'ici : elles sont recalculées une fois,
+        # puis la version des données invalide les réponses /stats/* en cache
+        await refresh_general_stats(session_cont, "cont")
+        await refresh_general_stats(session_isol, "isol")
+        await bump_dataset_version(session_cont, "cont")
+        await bump_dataset_version(session_isol, "isol")
+
+parser = argparse.ArgumentParser(description="Crée les tables et charge les datasets CONT et ISOL.")
+parser.add_argument("--bulk", action="store_true", help="Chargement en masse par COPY (asyncpg) au lieu des insertions ORM")
+parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Nombre de lignes envoyées par lot en mode --bulk")
+parser.add_argument("--incremental", action="store_true", help="N'applique que les changements depuis la dernière exécution (reprend après un arrêt) ; incompatible avec --bulk et --workers")
+parser.add_argument("--workers", type=int, default=1, help="Nombre de processus d'analyse des fichiers CONT ; au-delà de 1, écriture par COPY : requiert --bulk")
+
+def check_args(args):
+    """Refuse les combinaisons d'options dont l'une serait ignorée (argparse quitte avec le message)."""
+    if args.workers < 1:
+        parser.error("--workers doit être au moins 1")
+    if args.incremental and (args.bulk or args.workers > 1):
+        parser.error("--incremental ne peut pas être combiné avec --bulk ni --workers (le chargement incrémental n'utilise pas COPY)")
+    if args.workers > 1 and not args.bulk:
+        parser.error("--workers au-delà de 1 écrit par COPY : ajoutez --bulk")
+    return args
 
 # Exécution du programme principal
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = check_args(parser.parse_args())
+    asyncio.run(main(bulk=args.bulk, batch_size=args.batch_size, workers=args.workers, incremental=args.incremental))
@@ -1,5 +1,6 @@
 import os
 import logging
+import itertools
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
@@ -10,10 +11,60 @@ from dotenv import load_dotenv
 load_dotenv()  # Charge les variables depuis .env
 
 # --------------------------------------------------------------------
-"""Configuration des logs pour voir davantage de détails"""
+"""Profil des moteurs (dev/prod) : pool, délais, cache des requêtes préparées, logs"""
+# --------------------------------------------------------------------
+# DB_PROFILE choisit les valeurs par défaut, chacune pouvant être surchargée par sa variable :
+#   DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s), DB_POOL_PRE_PING (0/1),
+#   DB_STATEMENT_TIMEOUT_MS (0 = aucun), DB_PREPARED_STATEMENT_CACHE_SIZE, DB_SQL_LOG_LEVEL
+# Les requêtes SQL ne sont journalisées (niveau INFO du logger sqlalchemy.engine) qu'en dev.
+ENGINE_PROFILES = {
+    "dev": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": 0,
+        "prepared_statement_cache_size": 100,
+        "sql_log_level": "INFO",
+    },
+    "prod": {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": 15000,
+        "prepared_statement_cache_size": 500,
+        "sql_log_level": "WARNING",
+    },
+}
+
+def load_engine_profile(name: str = None) -> dict:
+    """Valeurs du profil `name` (DB_PROFILE, 'dev' par défaut) surchargées par les variables d'environnement."""
+    name = name or os.getenv("DB_PROFILE", "dev")
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Profil de base de données inconnu : {name!r} (attendu : {', '.join(ENGINE_PROFILES)})")
+    profile = dict(ENGINE_PROFILES[name], name=name)
+    for key, default in ENGINE_PROFILES[name].items():
+        value = os.getenv(f"DB_{key.upper()}")
+        if value is None:
+            continue
+        if isinstance(default, bool):
+            profile[key] = value.strip().lower() in ("1", "true", "yes", "on")
+        elif isinstance(default, int):
+            profile[key] = int(value)
+        else:
+            profile[key] = value.upper()
+    return profile
+
+ENGINE_PROFILE = load_engine_profile()
+
+# --------------------------------------------------------------------
+"""Configuration des logs"""
 # --------------------------------------------------------------------
 logging.basicConfig(level=logging.INFO)  # Active les logs pour une meilleure traçabilité
-logging.getLogger("sqlalchemy.engine").setLevel(logging.DEBUG)  # Affiche les logs SQLAlchemy
+logging.getLogger("sqlalchemy.engine").setLevel(ENGINE_PROFILE["sql_log_level"])  # Requêtes SQL en dev uniquement
 
 # --------------------------------------------------------------------
 """Récupération des paramètres de connexion depuis les variables d'environnement"""
@@ -36,23 +87,107 @@ DATABASES = {
 }
 
 # Génération des URLs de connexion
-DATABASE_URLS = {
-    key: (
+def database_url(config: dict, host: str = None, port: str = None) -> str:
+    return (
         f"postgresql+asyncpg://{config['user']}:{config['password']}@"
-        f"{config['host']}:{config['port']}/{config['dbname']}"
+        f"{host or config['host']}:{port or config['port']}/{config['dbname']}"
     )
-    for key, config in DATABASES.items()
-}
+
+DATABASE_URLS = {key: database_url(config) for key, config in DATABASES.items()}
+
+# Réplicas en lecture : DB_CONT_REPLICAS / DB_ISOL_REPLICAS = "hôte[:port],hôte[:port],..."
+# (mêmes identifiants et même nom de base que le primaire ; aucun réplica par défaut).
+# En local : un second serveur PostgreSQL (ex. localhost:5433) ou le primaire lui-même
+# (DB_CONT_REPLICAS=localhost) sert de réplica pour vérifier le routage.
+def replica_urls(key: str) -> list:
+    urls = []
+    for replica in os.getenv(f"DB_{key.upper()}_REPLICAS", "").split(","):
+        if replica.strip():
+            host, _, port = replica.strip().partition(":")
+            urls.append(database_url(DATABASES[key], host, port or None))
+    return urls
+
+REPLICA_URLS = {key: replica_urls(key) for key in DATABASES}
 
 # --------------------------------------------------------------------
 """Création des moteurs asynchrones pour chaque base"""
 # --------------------------------------------------------------------
-engine_cont = create_async_engine(DATABASE_URLS["cont"], echo=True, future=True)
-engine_isol = create_async_engine(DATABASE_URLS["isol"], echo=True, future=True)
+def create_engine_from_profile(url: str, profile: dict = ENGINE_PROFILE):
+    server_settings = {"application_name": "lsfb-dashboard"}
+    if profile["statement_timeout_ms"]:
+        # Délai appliqué par PostgreSQL à chaque requête de la connexion
+        server_settings["statement_timeout"] = str(profile["statement_timeout_ms"])
+    return create_async_engine(
+        # Cache des requêtes préparées par connexion (dialecte asyncpg de SQLAlchemy)
+        f"{url}?prepared_statement_cache_size={profile['prepared_statement_cache_size']}",
+        pool_size=profile["pool_size"],
+        max_overflow=profile["max_overflow"],
+        pool_timeout=profile["pool_timeout"],
+        pool_recycle=profile["pool_recycle"],
+        pool_pre_ping=profile["pool_pre_ping"],
+        connect_args={"server_settings": server_settings},
+    )
+
+# Moteurs primaires (écriture) : utilisés par l'ingestion et les scripts de database/
+engine_cont = create_engine_from_profile(DATABASE_URLS["cont"])
+engine_isol = create_engine_from_profile(DATABASE_URLS["isol"])
+
+def pool_status(engine) -> dict:
+    """État du pool de connexions d'un moteur (connexions prêtées, au-delà de pool_size, disponibles)."""
+    pool = engine.pool
+    return {
+        "host": f"{engine.url.host}:{engine.url.port}",
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "checked_in": pool.checkedin(),
+        "max_overflow": ENGINE_PROFILE["max_overflow"],
+    }
+
+# --------------------------------------------------------------------
+"""Répartition des lectures du dashboard sur les réplicas"""
+# --------------------------------------------------------------------
+# DB_REPLICA_ROUTING : round_robin (défaut, réplicas à tour de rôle) ou least_connections
+# (réplica ayant le moins de connexions prêtées, à tour de rôle en cas d'égalité).
+# Sans réplica configuré, les lectures passent par le moteur primaire.
+REPLICA_ROUTINGS = ("round_robin", "least_connections")
+
+class ReadRouter:
+    """Choisit le moteur de lecture de chaque session (le moteur d'écriture n'est jamais choisi s'il y a des réplicas)."""
+
+    def __init__(self, writer, readers=(), routing: str = "round_robin"):
+        if routing not in REPLICA_ROUTINGS:
+            raise ValueError(f"Routage des réplicas inconnu : {routing!r} (attendu : {', '.join(REPLICA_ROUTINGS)})")
+        self.writer = writer
+        self.readers = list(readers) or [writer]
+        self.routing = routing
+        self._turn = itertools.count()
+
+    def reader(self):
+        if len(self.readers) == 1:
+            return self.readers[0]
+        start = next(self._turn) % len(self.readers)
+        rotated = self.readers[start:] + self.readers[:start]
+        if self.routing == "least_connections":
+            # min() garde le premier des ex aequo : la rotation répartit les égalités
+            return min(rotated, key=lambda engine: engine.pool.checkedout())
+        return rotated[0]
+
+    def status(self) -> dict:
+        return {
+            "routing": self.routing,
+            "writer": pool_status(self.writer),
+            "readers": [pool_status(engine) for engine in self.readers if engine is not self.writer],
+        }
+
+REPLICA_ROUTING = os.getenv("DB_REPLICA_ROUTING", "round_robin")
+router_cont = ReadRouter(engine_cont, [create_engine_from_profile(url) for url in REPLICA_URLS["cont"]], REPLICA_ROUTING)
+router_isol = ReadRouter(engine_isol, [create_engine_from_profile(url) for url in REPLICA_URLS["isol"]], REPLICA_ROUTING)
 
 # --------------------------------------------------------------------
 """Création des sessions asynchrones"""
 # --------------------------------------------------------------------
+# Liées au moteur primaire (ingestion) ; les sessions du dashboard sont liées à un réplica (get_db_*)
 SessionCont = sessionmaker(autocommit=False, autoflush=False, bind=engine_cont, class_=AsyncSession)
 SessionIsol = sessionmaker(autocommit=False, autoflush=False, bind=engine_isol, class_=AsyncSession)
 
@@ -64,14 +199,14 @@ BaseIsol = declarative_base()
 """Fonction pour récupérer une session asynchrone"""
 # --------------------------------------------------------------------
 async def get_db_cont():
-    async with SessionCont() as session:  # Utilisation de la session asynchrone
+    async with SessionCont(bind=router_cont.reader()) as session:  # Session en lecture sur un réplica
         try:
             yield session
         finally:
             await session.close()  # Fermeture de la session après utilisation
 
 async def get_db_isol():
-    async with SessionIsol() as session:  # Utilisation de la session asynchrone
+    async with SessionIsol(bind=router_isol.reader()) as session:  # Session en lecture sur un réplica
         try:
             yield session
         finally:
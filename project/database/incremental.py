@@ -0,0 +1,236 @@
+import os
+import asyncio
+import hashlib
+from pathlib import Path
+from collections import defaultdict
+from sqlalchemy import insert, delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import select
+from schema.models_cont import ContInstance, ContVideo, WordAnnotation, SubtitleAnnotation, ContPose, ContIngestFingerprint
+from schema.models_isol import IsolInstance, IsolVideo, IsolPose, IsolIngestFingerprint
+from database.insert_db import ANNOT_FILES, fetch_instance_ids
+from database.bulk_insert import (
+    BODY_PARTS, COLUMNS, batched,
+    iter_instances_cont, iter_instances_isol, parse_word_annotation_file, parse_subtitles_file,
+)
+from database.video_probe import probe_videos
+
+# --------------------------------------------------------------------
+"""Ingestion incrémentale et reprenable"""
+# --------------------------------------------------------------------
+# Une empreinte est enregistrée pour chaque fichier source (taille:mtime) et pour
+# chaque instance d'un fichier d'annotations (hash de ses annotations). Seules les
+# clés dont l'empreinte a changé sont réécrites (suppression puis insertion des lignes
+# concernées), par paquets validés avec leurs empreintes : après un arrêt, la
+# relance reprend au premier paquet non validé.
+
+CHUNK_SIZE = 500
+FILE_KEY = ""  # Clé de l'empreinte d'un fichier source entier
+
+# --- Empreintes -------------------------------------------
+def file_fingerprint(path) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def annotation_fingerprint(path, known_ids) -> str:
+    """
+    Empreinte d'un fichier d'annotations : celle du fichier et celle des instances connues. Les
+    annotations d'instances absentes du CSV sont ignorées ; une instance ajoutée ensuite doit
+    faire relire le fichier même s'il n'a pas changé.
+    """
+    ids_digest = hashlib.sha1("\n".join(sorted(map(str, known_ids))).encode("utf-8")).hexdigest()
+    return f"{file_fingerprint(path)}:{ids_digest}"
+
+def group_fingerprints(records):
+    """Regroupe les enregistrements par instance (premier champ) et calcule le hash de chaque groupe."""
+    grouped = defaultdict(list)
+    for record in records:
+        grouped[record[0]].append(record)
+    fingerprints = {key: hashlib.sha1(repr(sorted(group)).encode("utf-8")).hexdigest() for key, group in grouped.items()}
+    return grouped, fingerprints
+
+def diff_fingerprints(stored: dict, current: dict):
+    """Retourne (clés nouvelles ou modifiées, clés disparues)."""
+    changed = [key for key, fingerprint in current.items() if stored.get(key) != fingerprint]
+    removed = [key for key in stored if key not in current]
+    return changed, removed
+
+async def load_fingerprints(session: AsyncSession, fp_model, source: str) -> dict:
+    result = await session.execute(select(fp_model.key, fp_model.fingerprint).where(fp_model.source == source))
+    return dict(result.all())
+
+async def save_fingerprints(session: AsyncSession, fp_model, source: str, fingerprints: dict):
+    if not fingerprints:
+        return
+    stmt = pg_insert(fp_model).values([
+        {"source": source, "key": key, "fingerprint": fingerprint} for key, fingerprint in fingerprints.items()
+    ])
+    stmt = stmt.on_conflict_do_update(index_elements=["source", "key"], set_={"fingerprint": stmt.excluded.fingerprint})
+    await session.execute(stmt)
+
+async def forget_fingerprints(session: AsyncSession, fp_model, source: str, keys: list):
+    await session.execute(delete(fp_model).where(fp_model.source == source, fp_model.key.in_(keys)))
+
+async def sync_source(session: AsyncSession, fp_model, source: str, current: dict, replace, remove=None, file_fp: str = None):
+    """
+    Applique les changements d'une source par paquets de CHUNK_SIZE clés.
+    `replace(keys)` réécrit les lignes des clés nouvelles ou modifiées, `remove(keys)` supprime
+    celles des clés disparues (None : les lignes sont conservées). L'empreinte du fichier
+    entier n'est enregistrée qu'une fois tous les paquets validés.
+    """
+    stored = await load_fingerprints(session, fp_model, source)
+    stored.pop(FILE_KEY, None)
+    changed, removed = diff_fingerprints(stored, current)
+
+    for keys in batched(changed, CHUNK_SIZE):
+        await replace(keys)
+        await save_fingerprints(session, fp_model, source, {key: current[key] for key in keys})
+        await session.commit()
+
+    if remove is not None:
+        for keys in batched(removed, CHUNK_SIZE):
+            await remove(keys)
+            await forget_fingerprints(session, fp_model, source, keys)
+            await session.commit()
+
+    if file_fp is not None:
+        await save_fingerprints(session, fp_model, source, {FILE_KEY: file_fp})
+        await session.commit()
+
+    n_removed = len(removed) if remove is not None else 0
+    print(f"[INCR] {source:<40} {len(changed):>7} modifié(s) {n_removed:>7} supprimé(s)")
+    return len(changed), n_removed
+
+async def file_unchanged(session: AsyncSession, fp_model, source: str, file_fp: str) -> bool:
+    result = await session.execute(
+        select(fp_model.fingerprint).where(fp_model.source == source, fp_model.key == FILE_KEY)
+    )
+    if result.scalar() == file_fp:
+        print(f"[INCR] {source:<40} inchangé")
+        return True
+    return False
+
+# --- Sources -------------------------------------------
+async def sync_instances(session: AsyncSession, fp_model, model, csv_path: str, records, source: str = "instances.csv"):
+    """Upsert (INSERT ... ON CONFLICT) des lignes modifiées du CSV des instances."""
+    file_fp = file_fingerprint(csv_path)
+    if await file_unchanged(session, fp_model, source, file_fp):
+        return
+    columns = COLUMNS[model.__tablename__]
+    grouped, current = group_fingerprints(records)
+
+    async def replace(keys):
+        stmt = pg_insert(model).values([dict(zip(columns, record)) for key in keys for record in grouped[key]])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"], set_={column: stmt.excluded[column] for column in columns if column != "id"}
+        )
+        await session.execute(stmt)
+
+    # Les instances retirées du CSV sont conservées : d'autres tables y font référence
+    await sync_source(session, fp_model, source, current, replace, file_fp=file_fp)
+
+async def sync_annotation_file(session: AsyncSession, fp_model, model, columns, source: str, path: str, records, known_ids: set, slice_filters=()):
+    """Réécrit les annotations des instances connues dont le contenu a changé dans un fichier JSON."""
+    file_fp = annotation_fingerprint(path, known_ids)
+    if await file_unchanged(session, fp_model, source, file_fp):
+        return
+    grouped, current = group_fingerprints(record for record in records() if record[0] in known_ids)
+
+    async def remove(keys):
+        # slice_filters limite la suppression aux lignes issues de ce fichier (main / type de signe)
+        await session.execute(delete(model).where(model.instance_id.in_(keys), *slice_filters))
+
+    async def replace(keys):
+        await remove(keys)
+        await session.execute(insert(model), [dict(zip(columns, record)) for key in keys for record in grouped[key]])
+
+    await sync_source(session, fp_model, source, current, replace, remove, file_fp=file_fp)
+
+async def sync_videos(session: AsyncSession, fp_model, model, folder_path: str, known_ids: set):
+    """Ajoute ou met à jour les vidéos nouvelles ou modifiées (métadonnées sondées pour celles-ci uniquement)."""
+    video_folder = Path(folder_path) / 'videos'
+    assert video_folder.exists(), f"Le dossier 'videos' n'existe pas : {video_folder}"
+    video_files = {f"videos/{f.name}": f for f in video_folder.glob('*.mp4') if f.stem in known_ids}
+    current = {key: file_fingerprint(f) for key, f in video_files.items()}
+
+    async def remove(keys):
+        await session.execute(delete(model).where(model.instance_id.in_([Path(key).stem for key in keys])))
+
+    async def replace(keys):
+        await remove(keys)
+        video_paths = [str(video_files[key]) for key in keys]
+        metadata_by_path = await asyncio.to_thread(probe_videos, video_paths)
+        await session.execute(insert(model), [
+            {"instance_id": Path(video_path).stem, "path": video_path, **metadata_by_path[video_path]}
+            for video_path in video_paths
+        ])
+
+    await sync_source(session, fp_model, "videos", current, replace, remove)
+
+async def sync_poses(session: AsyncSession, fp_model, model, folder_path: str, known_ids: set):
+    """Ajoute ou met à jour les fichiers de poses nouveaux ou modifiés."""
+    poses_folder = Path(folder_path) / 'poses'
+    assert poses_folder.exists(), f"Le dossier 'poses' n'existe pas : {poses_folder}"
+    pose_files = {}
+    for body_part in BODY_PARTS:
+        body_part_folder = poses_folder / body_part
+        if not body_part_folder.exists():
+            continue
+        for pose_file in body_part_folder.glob('*.npy'):
+            if pose_file.stem in known_ids:
+                pose_files[f"poses/{body_part}/{pose_file.name}"] = (pose_file.stem, body_part, str(pose_file))
+    current = {key: file_fingerprint(pose_path) for key, (_, _, pose_path) in pose_files.items()}
+
+    def key_pairs(keys):
+        # Clé "poses/<partie>/<instance>.npy" -> (instance, partie)
+        return [(Path(key).stem, Path(key).parent.name) for key in keys]
+
+    async def remove(keys):
+        await session.execute(delete(model).where(tuple_(model.instance_id, model.pose_part).in_(key_pairs(keys))))
+
+    async def replace(keys):
+        await remove(keys)
+        await session.execute(insert(model), [
+            {"instance_id": instance_id, "pose_part": pose_part, "pose_path": pose_path}
+            for instance_id, pose_part, pose_path in (pose_files[key] for key in keys)
+        ])
+
+    await sync_source(session, fp_model, "poses", current, replace, remove)
+
+# --- Chargements incrémentaux -------------------------------------------
+async def incremental_load_cont(session: AsyncSession, cont_folder_path: str):
+    annotations_folder = os.path.join(cont_folder_path, 'annotations')
+    assert os.path.exists(annotations_folder), f"Le dossier 'annotations' n'existe pas : {annotations_folder}"
+
+    csv_path = os.path.join(cont_folder_path, 'instances.csv')
+    await sync_instances(session, ContIngestFingerprint, ContInstance, csv_path, iter_instances_cont(csv_path))
+    known_ids = await fetch_instance_ids(session, ContInstance)
+
+    await sync_videos(session, ContIngestFingerprint, ContVideo, cont_folder_path, known_ids)
+
+    for annotation_file, metadata in ANNOT_FILES.items():
+        path = os.path.join(annotations_folder, annotation_file)
+        await sync_annotation_file(
+            session, ContIngestFingerprint, WordAnnotation, COLUMNS["words"], f"annotations/{annotation_file}", path,
+            lambda path=path, metadata=metadata: parse_word_annotation_file(path, metadata['hand_type'], metadata['sign_type']),
+            known_ids,
+            slice_filters=(WordAnnotation.hand_type == metadata['hand_type'], WordAnnotation.sign_type == metadata['sign_type']),
+        )
+
+    subtitles_path = os.path.join(annotations_folder, 'subtitles.json')
+    await sync_annotation_file(
+        session, ContIngestFingerprint, SubtitleAnnotation, COLUMNS["subtitles"], "annotations/subtitles.json", subtitles_path,
+        lambda: parse_subtitles_file(subtitles_path), known_ids,
+    )
+
+    await sync_poses(session, ContIngestFingerprint, ContPose, cont_folder_path, known_ids)
+
+async def incremental_load_isol(session: AsyncSession, isol_folder_path: str):
+    csv_path = os.path.join(isol_folder_path, 'instances.csv')
+    assert os.path.exists(csv_path), f"Le fichier 'instances.csv' n'existe pas : {csv_path}"
+    await sync_instances(session, IsolIngestFingerprint, IsolInstance, csv_path, iter_instances_isol(csv_path))
+    known_ids = await fetch_instance_ids(session, IsolInstance)
+
+    await sync_videos(session, IsolIngestFingerprint, IsolVideo, isol_folder_path, known_ids)
+    await sync_poses(session, IsolIngestFingerprint, IsolPose, isol_folder_path, known_ids)
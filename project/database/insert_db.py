@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -8,10 +9,30 @@ from sqlalchemy import text
 from sqlalchemy.sql import select
 from schema.models_cont import ContInstance, WordAnnotation, SubtitleAnnotation, ContPose, ContVideo
 from schema.models_isol import IsolInstance, IsolPose, IsolVideo
+from database.video_probe import probe_videos
 # --------------------------------------------------------------------
 """Fonctions pour insérer les données"""
 # --------------------------------------------------------------------
 
+# Identifiants des instances connues, chargés en une seule requête
+async def fetch_instance_ids(session: AsyncSession, model) -> set:
+    result = await session.execute(select(model.id))
+    return set(result.scalars().all())
+
+# Chemins des fichiers de poses par instance : {instance: {partie: chemin}}, chargés en une seule requête
+async def fetch_pose_paths(session: AsyncSession, model) -> dict:
+    rows = (await session.execute(select(model.instance_id, model.pose_part, model.pose_path))).all()
+    paths = {}
+    for instance_id, pose_part, pose_path in rows:
+        paths.setdefault(instance_id, {})[pose_part] = pose_path
+    return paths
+
+# Résumé des éléments ignorés faute d'instance correspondante (insertions ORM et chargement par COPY)
+def report_skipped(label: str, table: str, skipped):
+    if skipped:
+        apercu = ", ".join(sorted(skipped)[:10]) + (" ..." if len(skipped) > 10 else "")
+        print(f"{len(skipped)} {label} ignoré(s) : instance absente de la table '{table}' ({apercu})")
+
 # --- CONT -------------------------------------------
 
     # ---videos-------------------------------------------
@@ -22,23 +43,22 @@ async def insert_videos_cont(session: AsyncSession, cont_folder_path: str):
     # Parcours du dossier et ajout des fichiers vidéo par ordre alphabétique croissant
     video_files = sorted(video_folder.glob('*.mp4'), key=lambda x: x.stem)
 
+    # Les instances existantes sont chargées une seule fois (au lieu d'un SELECT par vidéo)
+    known_ids = await fetch_instance_ids(session, ContInstance)
+    skipped = [f.stem for f in video_files if f.stem not in known_ids]
+    video_files = [f for f in video_files if f.stem in known_ids]
+
+    # Sondage des métadonnées (durée, fps, résolution, codec) une seule fois, en parallèle
+    metadata_by_path = await asyncio.to_thread(probe_videos, [str(f) for f in video_files])
+
     for video_file in video_files:
         video_name = video_file.stem
         video_path = str(video_file)  # Le chemin complet vers la vidéo
-        print(f"Traitement de la vidéo : {video_name}, Chemin : {video_path}")
+        video = ContVideo(instance_id=video_name, path=video_path, **metadata_by_path[video_path])
+        session.add(video)
 
-        # Vérifier si l'instance_id existe dans la table 'instances_cont'
-        result = await session.execute(select(ContInstance).filter_by(id=video_name))
-        instance = result.scalars().first()  # On récupère le premier résultat (s'il existe)
-        
-        if instance:
-            # L'instance existe, insérer la vidéo
-            video = ContVideo(instance_id=video_name, path=video_path)
-            session.add(video)
-            print(f"Vidéo ajoutée : {video_name}, Chemin : {video_path}")
-        else:
-            # L'instance n'existe pas, passer à la suivante
-            print(f"L'instance {video_name} n'existe pas dans la table 'instances_cont'. La vidéo est ignorée.")
+    print(f"{len(video_files)} vidéo(s) ajoutée(s).")
+    report_skipped("vidéo(s)", "instances_cont", skipped)
 
     # Commit des changements dans la base de données
     try:
@@ -84,16 +104,17 @@ async def insert_instances_cont(session: AsyncSession, file_path: str):
 
 
     #---word_annotations-------------------------------------------
-async def insert_word_annotations_cont(session: AsyncSession, cont_folder_path: str):
-    ANNOT_FILES = {
-        "signs_left_hand.json": {"hand_type": "left_hand", "sign_type": "normal"},
-        "signs_right_hand.json": {"hand_type": "right_hand", "sign_type": "normal"},
-        "signs_both_hands.json": {"hand_type": "both_hands", "sign_type": "normal"},
-        "special_signs_left_hand.json": {"hand_type": "left_hand", "sign_type": "special"},
-        "special_signs_right_hand.json": {"hand_type": "right_hand", "sign_type": "special"},
-        "special_signs_both_hands.json": {"hand_type": "both_hands", "sign_type": "special"},
-    }
+# Fichiers d'annotations de mots et métadonnées associées
+ANNOT_FILES = {
+    "signs_left_hand.json": {"hand_type": "left_hand", "sign_type": "normal"},
+    "signs_right_hand.json": {"hand_type": "right_hand", "sign_type": "normal"},
+    "signs_both_hands.json": {"hand_type": "both_hands", "sign_type": "normal"},
+    "special_signs_left_hand.json": {"hand_type": "left_hand", "sign_type": "special"},
+    "special_signs_right_hand.json": {"hand_type": "right_hand", "sign_type": "special"},
+    "special_signs_both_hands.json": {"hand_type": "both_hands", "sign_type": "special"},
+}
 
+async def insert_word_annotations_cont(session: AsyncSession, cont_folder_path: str):
     annotations_folder = os.path.join(cont_folder_path, 'annotations')
     assert os.path.exists(annotations_folder), f"Le dossier 'annotations' n'existe pas : {annotations_folder}"
     
@@ -130,25 +151,29 @@ async def insert_subtitles_cont(session: AsyncSession, cont_folder_path: str):
     with open(subtitles_file_path, 'r') as f:
         subtitles_data = json.load(f)
 
+    # Les instances existantes sont chargées une seule fois (au lieu d'un SELECT par instance)
+    known_ids = await fetch_instance_ids(session, ContInstance)
+    skipped = []
+    added = 0
+
     for instance_id, subtitles in subtitles_data.items():
-        # Vérifier si l'instance_id existe dans 'instances_cont'
-        result = await session.execute(select(ContInstance).filter_by(id=instance_id))
-        instance = result.scalars().first()  # Récupère l'instance si elle existe
-        
-        if instance:
-            # Si l'instance existe, insérer les sous-titres
-            for subtitle in subtitles:
-                subtitle_annotation = SubtitleAnnotation(
-                    instance_id=instance_id,
-                    text=subtitle['value'],
-                    start_time=subtitle['start'],
-                    end_time=subtitle['end']
-                )
-                session.add(subtitle_annotation)
-            print(f"Sous-titres ajoutés pour l'instance {instance_id}")
-        else:
+        if instance_id not in known_ids:
             # Si l'instance n'existe pas, ignorer les sous-titres
-            print(f"L'instance {instance_id} n'existe pas dans la table 'instances_cont'. Les sous-titres sont ignorés.")
+            skipped.append(instance_id)
+            continue
+
+        for subtitle in subtitles:
+            subtitle_annotation = SubtitleAnnotation(
+                instance_id=instance_id,
+                text=subtitle['value'],
+                start_time=subtitle['start'],
+                end_time=subtitle['end']
+            )
+            session.add(subtitle_annotation)
+            added += 1
+
+    print(f"{added} sous-titre(s) ajouté(s) pour {len(subtitles_data) - len(skipped)} instance(s).")
+    report_skipped("instance(s) de sous-titres", "instances_cont", skipped)
 
     # Commit des changements dans la base de données
     try:
@@ -209,13 +234,16 @@ async def insert_videos_isol(session: AsyncSession, isol_folder_path: str):
     # Liste et trie les fichiers vidéo .mp4 par ordre alphabétique croissant
     video_files = sorted([f for f in os.listdir(video_folder) if f.endswith('.mp4')], key=lambda x: x.lower())
 
+    # Sondage des métadonnées (durée, fps, résolution, codec) une seule fois, en parallèle
+    metadata_by_path = await asyncio.to_thread(probe_videos, [os.path.join(video_folder, f) for f in video_files])
+
     for video_file in video_files:
         video_name = os.path.splitext(video_file)[0]
         video_path = os.path.join(video_folder, video_file)
         print(f"Vidéo ajoutée : {video_name}, Chemin : {video_path}")
         
         # Créer un objet vidéo et l'ajouter à la session
-        video = IsolVideo(instance_id=video_name, path=video_path)
+        video = IsolVideo(instance_id=video_name, path=video_path, **metadata_by_path[video_path])
         session.add(video)
 
     # Commit les changements dans la base de données
@@ -0,0 +1,81 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+from pathlib import Path
+from sqlalchemy import delete, insert
+from database.db_init import engine_cont, engine_isol, SessionCont, SessionIsol
+from database.insert_db import fetch_pose_paths
+from database.bulk_insert import batched
+from schema.models_cont import ContPose, ContPoseArchive
+from schema.models_isol import IsolPose, IsolPoseArchive
+from pose_archive import SHARD_FRAMES, write_archive, new_archive_dir, remove_previous_archives
+
+# --------------------------------------------------------------------
+"""Conversion des fichiers de poses (.npy par partie et par instance) en archive consolidée"""
+# --------------------------------------------------------------------
+# L'archive d'un split est écrite dans un nouveau dossier <output-dir>/<cont|isol>/v<date>,
+# puis la position de chaque instance (fichier, première frame, nombre de frames) remplace
+# en base l'ancienne archive, en une transaction. Les fichiers de l'ancienne archive, lus par
+# le serveur tant que la transaction n'est pas validée, ne sont supprimés qu'ensuite.
+# Les lignes poses_cont / poses_iso sont conservées (visualiseurs, ingestion).
+DATASETS = {
+    "cont": (engine_cont, SessionCont, ContPose, ContPoseArchive),
+    "isol": (engine_isol, SessionIsol, IsolPose, IsolPoseArchive),
+}
+INSERT_BATCH = 10_000
+
+async def pack_poses(db_key: str, output_dir, dtype: str, shard_frames: int):
+    engine, session_factory, pose_model, archive_model = DATASETS[db_key]
+
+    # La table n'existe pas encore dans les bases créées avant son introduction
+    async with engine.begin() as conn:
+        await conn.run_sync(archive_model.__table__.create, checkfirst=True)
+
+    async with session_factory() as session:
+        pose_paths = await fetch_pose_paths(session, pose_model)
+        print(f"[{db_key}] {len(pose_paths)} instance(s) à archiver ({dtype}).")
+
+        split_dir = Path(output_dir) / db_key
+        archive_dir = new_archive_dir(split_dir)
+        index = await asyncio.to_thread(write_archive, pose_paths, archive_dir, dtype, shard_frames)
+
+        # Remplacement des positions en une transaction
+        await session.execute(delete(archive_model))
+        rows = [
+            {
+                "instance_id": instance_id,
+                "shard_path": str((archive_dir / index["shards"][shard_number]).resolve()),
+                "frame_offset": frame_offset,
+                "n_frames": n_frames,
+            }
+            for instance_id, (shard_number, frame_offset, n_frames) in index["instances"].items()
+        ]
+        for batch in batched(rows, INSERT_BATCH):
+            await session.execute(insert(archive_model), batch)
+        await session.commit()
+    print(f"[{db_key}] {len(rows)} instance(s) archivée(s) dans {len(index['shards'])} fichier(s) : {archive_dir}")
+
+    removed = await asyncio.to_thread(remove_previous_archives, split_dir, archive_dir)
+    if removed:
+        print(f"[{db_key}] Ancienne archive supprimée : {', '.join(path.name for path in removed)}")
+
+async def main(db_keys, output_dir, dtype: str, shard_frames: int):
+    for db_key in db_keys:
+        await pack_poses(db_key, output_dir, dtype, shard_frames)
+
+parser = argparse.ArgumentParser(description="Regroupe les fichiers de poses de chaque instance dans une archive consolidée.")
+parser.add_argument("db", choices=["cont", "isol", "all"], help="Base de données à traiter ('cont', 'isol', ou 'all')")
+parser.add_argument("--output-dir", required=True, help="Dossier de l'archive (un sous-dossier par split, une génération par exécution)")
+parser.add_argument("--float16", action="store_true", help="Stocker les coordonnées en float16 (archive deux fois plus petite)")
+parser.add_argument("--shard-frames", type=int, default=SHARD_FRAMES, help=f"Nombre maximal de frames par fichier (défaut : {SHARD_FRAMES})")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.run(main(
+        ["cont", "isol"] if args.db == "all" else [args.db],
+        args.output_dir, "float16" if args.float16 else "float32", args.shard_frames,
+    ))
@@ -0,0 +1,40 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+from database.db_init import engine_cont, engine_isol, SessionCont, SessionIsol
+from database.dataset_stats import DATASETS as STAT_MODELS, refresh_general_stats
+from database.dataset_version import DATASETS as VERSION_MODELS, bump_dataset_version
+
+# --------------------------------------------------------------------
+"""Recalcul des statistiques générales (/stats/general) sans relancer l'ingestion"""
+# --------------------------------------------------------------------
+# database/db.py les recalcule déjà après chaque chargement ; ce script sert après une
+# modification manuelle des données ou pour une base chargée avant leur introduction.
+# La version des données est aussi incrémentée (les réponses /stats/* en cache sont invalidées).
+DATASETS = {
+    "cont": (engine_cont, SessionCont),
+    "isol": (engine_isol, SessionIsol),
+}
+
+async def main(db_keys):
+    for db_key in db_keys:
+        engine, session_factory = DATASETS[db_key]
+        stat_model, _ = STAT_MODELS[db_key]
+        # Les tables n'existent pas encore dans les bases créées avant leur introduction
+        async with engine.begin() as conn:
+            await conn.run_sync(stat_model.__table__.create, checkfirst=True)
+            await conn.run_sync(VERSION_MODELS[db_key].__table__.create, checkfirst=True)
+        async with session_factory() as session:
+            await refresh_general_stats(session, db_key)
+            await bump_dataset_version(session, db_key)
+
+parser = argparse.ArgumentParser(description="Recalcule les statistiques générales pré-calculées.")
+parser.add_argument("db", choices=["cont", "isol", "all"], help="Base de données à traiter ('cont', 'isol', ou 'all')")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.run(main(["cont", "isol"] if args.db == "all" else [args.db]))
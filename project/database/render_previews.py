@@ -0,0 +1,85 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from database.db_init import SessionCont, SessionIsol
+from database.insert_db import fetch_pose_paths
+from schema.models_cont import ContPose
+from schema.models_isol import IsolPose
+from skeleton_previews import BODY_PARTS, PREVIEW_CACHE_DIR, preview_digest, preview_exists, render_preview
+
+# --------------------------------------------------------------------
+"""Rendu en tâche de fond des aperçus du squelette de chaque instance"""
+# --------------------------------------------------------------------
+# Les instances dont l'aperçu est déjà dans le cache (même hash de poses) sont ignorées :
+# la commande peut être relancée après chaque ingestion.
+DATASETS = {
+    "cont": (SessionCont, ContPose),
+    "isol": (SessionIsol, IsolPose),
+}
+
+def pending_previews(pose_paths: dict, cache_dir, limit: int = None) -> dict:
+    """Instances dont l'aperçu n'est pas encore dans le cache (les fichiers de poses absents sont signalés)."""
+    pending = {}
+    for instance_id, paths_by_part in pose_paths.items():
+        try:
+            if preview_exists(preview_digest(paths_by_part), cache_dir):
+                continue
+        except FileNotFoundError as e:
+            print(f"[WARN] {instance_id} : fichier de poses introuvable ({e.filename})")
+            continue
+        pending[instance_id] = paths_by_part
+        if limit is not None and len(pending) >= limit:
+            break
+    return pending
+
+async def render_previews(db_key: str, workers: int, cache_dir, limit: int = None):
+    session_factory, model = DATASETS[db_key]
+    async with session_factory() as session:
+        # Seules les instances dont les quatre parties sont connues ont un aperçu
+        pose_paths = {
+            instance_id: parts for instance_id, parts in (await fetch_pose_paths(session, model)).items()
+            if all(part in parts for part in BODY_PARTS)
+        }
+
+    pending = await asyncio.to_thread(pending_previews, pose_paths, cache_dir, limit)
+    print(f"[{db_key}] {len(pose_paths)} instance(s), {len(pending)} aperçu(s) à rendre.")
+    if not pending:
+        return
+
+    loop = asyncio.get_running_loop()
+    rendered, failed = 0, 0
+    # Rendu Matplotlib (CPU) dans des processus séparés
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            loop.run_in_executor(executor, render_preview, paths_by_part, cache_dir): instance_id
+            for instance_id, paths_by_part in pending.items()
+        }
+        for future in asyncio.as_completed(futures):
+            try:
+                await future
+                rendered += 1
+            except Exception as e:
+                failed += 1
+                print(f"[WARN] Échec du rendu d'un aperçu : {e}")
+            if (rendered + failed) % 100 == 0:
+                print(f"[{db_key}] {rendered + failed}/{len(pending)} aperçu(s) traités")
+    print(f"[{db_key}] {rendered} aperçu(s) rendu(s), {failed} échec(s).")
+
+async def main(db_keys, workers: int, cache_dir, limit: int = None):
+    for db_key in db_keys:
+        await render_previews(db_key, workers, cache_dir, limit)
+
+parser = argparse.ArgumentParser(description="Rend les aperçus du squelette (planche + vignette) des instances dans le cache.")
+parser.add_argument("db", choices=["cont", "isol", "all"], help="Base de données à traiter ('cont', 'isol', ou 'all')")
+parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Nombre de processus de rendu")
+parser.add_argument("--cache-dir", default=str(PREVIEW_CACHE_DIR), help="Dossier du cache des aperçus")
+parser.add_argument("--limit", type=int, default=None, help="Nombre maximal d'aperçus rendus par base")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.run(main(["cont", "isol"] if args.db == "all" else [args.db], args.workers, args.cache_dir, args.limit))
@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pymediainfo import MediaInfo
+
+# --------------------------------------------------------------------
+"""Lecture des métadonnées techniques des vidéos (MediaInfo)"""
+# --------------------------------------------------------------------
+# Colonnes de videos_cont / videos_iso remplies à l'ingestion
+VIDEO_METADATA_COLUMNS = ("duration_s", "fps", "width", "height", "codec")
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def probe_video(video_path: str) -> dict:
+    """
+    Retourne la durée (en secondes), le nombre d'images par seconde, la résolution
+    et le codec de la piste vidéo d'un fichier.
+    Les valeurs inconnues (fichier absent, pas de piste vidéo) valent None.
+    """
+    metadata = dict.fromkeys(VIDEO_METADATA_COLUMNS)
+
+    # Vérifier que le fichier existe
+    if not os.path.isfile(video_path):
+        print(f"[WARN] Fichier introuvable: {video_path}")
+        return metadata
+
+    try:
+        media_info = MediaInfo.parse(video_path)
+    except Exception as e:
+        print(f"[WARN] Erreur MediaInfo pour {video_path}: {e}")
+        return metadata
+
+    # Parcourir les pistes pour trouver la piste vidéo
+    for track in media_info.tracks:
+        if track.track_type == "Video":
+            duration_ms = _to_float(track.duration)
+            # La durée est en millisecondes, conversion en secondes
+            metadata["duration_s"] = duration_ms / 1000.0 if duration_ms is not None else None
+            metadata["fps"] = _to_float(track.frame_rate)
+            metadata["width"] = _to_int(track.width)
+            metadata["height"] = _to_int(track.height)
+            metadata["codec"] = str(track.format) if track.format else None
+            break
+    return metadata
+
+def probe_videos(video_paths: list, max_workers: int = 8) -> dict:
+    """Sonde plusieurs vidéos en parallèle et retourne {chemin: métadonnées}."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(video_paths, executor.map(probe_video, video_paths)))
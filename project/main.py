@@ -7,6 +7,7 @@ from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from database.db_init import get_db_cont, get_db_isol
 from route.route import router
+from route.media import MediaFiles, MEDIA_ACCEL_REDIRECT
 import dash
 from dash_app import app as dash_app  # Assure-toi que dash_app est importé correctement
 import json
@@ -21,11 +22,15 @@ BASE_DIR_ISOL = Path(r"E:\lsfb dataset\isol")
 BASE_DIR_CONT_POSES = Path(r"E:\lsfb dataset\cont\poses")
 BASE_DIR_ISOL_POSES = Path(r"E:\lsfb dataset\isol\poses")
 
-# Montage des fichiers statiques
-app.mount("/cont", StaticFiles(directory=str(BASE_DIR_CONT)), name="static_cont")
-app.mount("/isol", StaticFiles(directory=str(BASE_DIR_ISOL)), name="static_isol")
-app.mount("/cont_poses", StaticFiles(directory=str(BASE_DIR_CONT_POSES)), name="cont_poses")
-app.mount("/isol_poses", StaticFiles(directory=str(BASE_DIR_ISOL_POSES)), name="isol_poses")
+# Montage des fichiers du corpus (vidéos et poses) : requêtes Range, ETag, nombre de flux borné
+# (MEDIA_ACCEL_REDIRECT : fichiers servis par nginx via X-Accel-Redirect, voir route/media.py)
+def media_accel(prefix: str):
+    return f"{MEDIA_ACCEL_REDIRECT.rstrip('/')}{prefix}" if MEDIA_ACCEL_REDIRECT else None
+
+app.mount("/cont", MediaFiles(directory=BASE_DIR_CONT, accel_redirect=media_accel("/cont")), name="static_cont")
+app.mount("/isol", MediaFiles(directory=BASE_DIR_ISOL, accel_redirect=media_accel("/isol")), name="static_isol")
+app.mount("/cont_poses", MediaFiles(directory=BASE_DIR_CONT_POSES, accel_redirect=media_accel("/cont_poses")), name="cont_poses")
+app.mount("/isol_poses", MediaFiles(directory=BASE_DIR_ISOL_POSES, accel_redirect=media_accel("/isol_poses")), name="isol_poses")
 app.mount("/static", StaticFiles(directory=r"D:\Etudes\Bachelier Informatique Unamur\Bloc 3\Projet\lsfb_projet\static"), name="static")
 
 # Montage  l'application Dash à l'URL "/dash"
@@ -0,0 +1,190 @@
+import os
+import json
+import shutil
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+from route.pose_stream import POSE_PARTS
+
+# --------------------------------------------------------------------
+"""Archive consolidée des poses (toutes les parties de toutes les instances d'un split)"""
+# --------------------------------------------------------------------
+# Les quatre fichiers .npy d'une instance sont fusionnés le long de l'axe des joints
+# (ordre de POSE_PARTS, comme le flux binaire de route/pose_stream.py) et les instances
+# sont mises bout à bout dans des fichiers .npy de SHARD_FRAMES frames au plus :
+#   <archive>/poses_000.npy, poses_001.npy, ... : (frames, joints, dims), float16 ou float32
+#   <archive>/index.json : disposition des parties et {instance: [fichier, première frame, nombre de frames]}
+# Les frames d'une instance sont contiguës : lire une plage de frames est une seule lecture
+# dans un fichier ouvert en mmap. Les positions sont aussi enregistrées en base
+# (pose_archives_cont / pose_archives_iso).
+
+INDEX_FILE = "index.json"
+VERSION_PREFIX = "v"         # Sous-dossier d'une génération de l'archive : <split>/v<date UTC>
+ARCHIVE_VERSION = 1
+ARCHIVE_DTYPES = {"float16": "<f2", "float32": "<f4"}
+SHARD_FRAMES = 100_000
+
+def read_shapes(paths_by_part: dict) -> dict:
+    """Forme de chaque partie, lue dans l'en-tête des fichiers (les données ne sont pas chargées)."""
+    return {part: np.load(paths_by_part[part], mmap_mode="r").shape for part in POSE_PARTS}
+
+def merge_parts(paths_by_part: dict, n_frames: int, n_dims: int, dtype: str) -> np.ndarray:
+    """Fusionne les parties d'une instance en un tableau (frames, joints, dims)."""
+    arrays = [np.load(paths_by_part[part], mmap_mode="r")[:n_frames, :, :n_dims] for part in POSE_PARTS]
+    return np.concatenate(arrays, axis=1).astype(ARCHIVE_DTYPES[dtype])
+
+def plan_shards(entries: list, shard_frames: int) -> list:
+    """
+    Répartit les instances [(instance, n_frames), ...] dans des fichiers d'au plus `shard_frames` frames
+    (une instance plus longue occupe seule un fichier). Retourne [[(instance, première frame, n_frames), ...], ...].
+    """
+    shards, current, filled = [], [], 0
+    for instance_id, n_frames in entries:
+        if current and filled + n_frames > shard_frames:
+            shards.append(current)
+            current, filled = [], 0
+        current.append((instance_id, filled, n_frames))
+        filled += n_frames
+    if current:
+        shards.append(current)
+    return shards
+
+def write_archive(paths_by_instance: dict, output_dir, dtype: str = "float32", shard_frames: int = SHARD_FRAMES, name: str = "poses") -> dict:
+    """
+    Écrit l'archive des instances {instance: {partie: chemin}} dans `output_dir` et retourne son index.
+    Les instances dont une partie manque ou dont le nombre de joints diffère sont ignorées.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1. Lecture des en-têtes : nombre de frames commun et disposition des parties
+    layout, n_dims, entries, skipped = None, None, [], []
+    for instance_id, paths_by_part in paths_by_instance.items():
+        try:
+            shapes = read_shapes(paths_by_part)
+        except (KeyError, OSError, ValueError):
+            skipped.append(instance_id)
+            continue
+        joints = {part: shape[1] for part, shape in shapes.items()}
+        if layout is None:
+            layout, n_dims = joints, min(shape[2] for shape in shapes.values())
+        if joints != layout:
+            skipped.append(instance_id)
+            continue
+        entries.append((instance_id, min(shape[0] for shape in shapes.values())))
+    if skipped:
+        print(f"[WARN] {len(skipped)} instance(s) ignorée(s) (parties manquantes ou illisibles), ex. : {skipped[:5]}")
+
+    parts, first_joint = {}, 0
+    for part in POSE_PARTS:
+        count = layout[part] if layout else 0
+        parts[part] = [first_joint, count]
+        first_joint += count
+
+    # 2. Écriture des fichiers : chaque instance est copiée à sa position
+    index = {"version": ARCHIVE_VERSION, "dtype": dtype, "n_dims": n_dims, "parts": parts, "shards": [], "instances": {}}
+    for shard_number, shard in enumerate(plan_shards(entries, shard_frames)):
+        shard_name = f"{name}_{shard_number:03d}.npy"
+        total = sum(n_frames for _, _, n_frames in shard)
+        tmp_path = output_dir / f"{shard_name}.tmp"
+        data = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=ARCHIVE_DTYPES[dtype], shape=(total, first_joint, n_dims))
+        for instance_id, frame_offset, n_frames in shard:
+            data[frame_offset:frame_offset + n_frames] = merge_parts(paths_by_instance[instance_id], n_frames, n_dims, dtype)
+            index["instances"][instance_id] = [shard_number, frame_offset, n_frames]
+        data.flush()
+        del data
+        os.replace(tmp_path, output_dir / shard_name)
+        index["shards"].append(shard_name)
+        print(f"[ARCHIVE] {shard_name} : {len(shard)} instance(s), {total} frame(s)")
+
+    # L'index est écrit en dernier (puis remplacé d'un coup) : une archive sans index est incomplète
+    tmp_index = output_dir / f"{INDEX_FILE}.tmp"
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_index, output_dir / INDEX_FILE)
+    return index
+
+def new_archive_dir(split_dir) -> Path:
+    """
+    Dossier (à créer) d'une nouvelle génération de l'archive d'un split. Une réécriture ne
+    remplace jamais les fichiers lus par le serveur : les positions en base désignent
+    l'ancienne génération jusqu'à la validation des nouvelles.
+    """
+    split_dir = Path(split_dir)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = split_dir / f"{VERSION_PREFIX}{stamp}"
+    suffix = 1
+    while path.exists():
+        path = split_dir / f"{VERSION_PREFIX}{stamp}-{suffix}"
+        suffix += 1
+    return path
+
+def remove_previous_archives(split_dir, current_dir) -> list:
+    """
+    Supprime les générations antérieures d'un split (et une archive écrite directement dans
+    `split_dir` par une version précédente), une fois les positions de `current_dir` validées en base.
+    """
+    split_dir, current_dir = Path(split_dir), Path(current_dir)
+    removed = []
+    for path in split_dir.iterdir():
+        if path.is_dir() and path.name.startswith(VERSION_PREFIX) and path.resolve() != current_dir.resolve():
+            shutil.rmtree(path)
+            removed.append(path)
+        elif path.is_file() and (path.name == INDEX_FILE or path.suffix == ".npy"):
+            path.unlink()
+            removed.append(path)
+    return removed
+
+# Les caches sont indexés par (inode, date de modification) en plus du chemin : une archive
+# réécrite par un autre processus (database/pack_poses.py) est relue au lieu de servir
+# l'ancien index ou l'ancien fichier encore ouvert en mmap.
+def file_version(path) -> tuple:
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns
+
+@lru_cache(maxsize=8)
+def _load_index(index_path: str, version: tuple) -> dict:
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def load_index(archive_dir) -> dict:
+    index_path = str(Path(archive_dir) / INDEX_FILE)
+    return _load_index(index_path, file_version(index_path))
+
+@lru_cache(maxsize=32)
+def _open_shard(shard_path: str, version: tuple) -> np.ndarray:
+    return np.load(shard_path, mmap_mode="r")
+
+def open_shard(shard_path) -> np.ndarray:
+    return _open_shard(str(shard_path), file_version(shard_path))
+
+def read_entry(shard_path, frame_offset: int, n_frames: int, start: int = 0, end: int = None, parts=None) -> dict:
+    """
+    Retourne {partie: vue (frames, joints, dims)} des frames [start, end) d'une instance,
+    à partir de sa position dans l'archive (telle qu'enregistrée en base).
+    """
+    layout = load_index(str(Path(shard_path).parent))["parts"]
+    end = n_frames if end is None else min(end, n_frames)
+    start = min(start, end)
+    frames = open_shard(str(shard_path))[frame_offset + start:frame_offset + end]
+    return {part: frames[:, first:first + count] for part, (first, count) in layout.items() if parts is None or part in parts}
+
+class PoseArchive:
+    """Lecture d'une archive à partir de son dossier (sans passer par la base)."""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = Path(archive_dir)
+        self.index = load_index(str(self.archive_dir))
+
+    def __contains__(self, instance_id) -> bool:
+        return instance_id in self.index["instances"]
+
+    def entry(self, instance_id):
+        """Retourne (fichier, première frame, nombre de frames) d'une instance."""
+        shard_number, frame_offset, n_frames = self.index["instances"][instance_id]
+        return self.archive_dir / self.index["shards"][shard_number], frame_offset, n_frames
+
+    def read(self, instance_id, start: int = 0, end: int = None, parts=None) -> dict:
+        shard_path, frame_offset, n_frames = self.entry(instance_id)
+        return read_entry(shard_path, frame_offset, n_frames, start, end, parts)
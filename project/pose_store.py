@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# --------------------------------------------------------------------
+"""Cache partagé des fichiers de poses (.npy) ouverts en mmap"""
+# --------------------------------------------------------------------
+# Les fichiers sont ouverts avec mmap_mode='r' : seules les pages des frames lues
+# sont chargées par le système, et une frame est une vue sur le fichier (aucune copie).
+# Les tableaux ouverts sont gardés dans un LRU par instance, borné par la taille
+# totale des fichiers mappés.
+
+MAX_MAPPED_BYTES = 512 * 1024 * 1024  # Taille totale des fichiers gardés ouverts
+
+class PoseStore:
+    def __init__(self, max_bytes: int = MAX_MAPPED_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clé d'instance -> {partie: tableau mappé}
+        self._sizes = {}
+        self._mapped_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, paths_by_part: dict) -> dict:
+        """
+        Retourne {partie: tableau mappé} pour une instance.
+        Les fichiers ne sont ouverts qu'au premier accès ; les accès suivants sont servis par le cache.
+        """
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is not None and all(part in arrays for part in paths_by_part):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return arrays
+            self.misses += 1
+
+        # Ouverture hors du verrou : seul l'en-tête des fichiers est lu
+        arrays = {part: np.load(path, mmap_mode="r") for part, path in paths_by_part.items()}
+        size = sum(array.nbytes for array in arrays.values())
+
+        with self._lock:
+            if key in self._entries:
+                self._mapped_bytes -= self._sizes[key]
+            self._entries[key] = arrays
+            self._sizes[key] = size
+            self._mapped_bytes += size
+            # L'instance demandée est toujours conservée, même si elle dépasse la limite à elle seule
+            while self._mapped_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._mapped_bytes -= self._sizes.pop(evicted_key)
+                self.evictions += 1
+        return arrays
+
+    def n_frames(self, key, paths_by_part: dict) -> int:
+        """Nombre de frames commun à toutes les parties."""
+        return min(array.shape[0] for array in self.get(key, paths_by_part).values())
+
+    def frame(self, key, paths_by_part: dict, index: int) -> dict:
+        """Retourne {partie: vue (joints, dimensions)} de la frame `index`, sans copie."""
+        return {part: array[index] for part, array in self.get(key, paths_by_part).items()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "instances": len(self._entries),
+                "mapped_bytes": self._mapped_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._mapped_bytes = 0
+
+# Instance partagée par les visualiseurs Dash et les routes
+pose_store = PoseStore()
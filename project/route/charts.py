@@ -0,0 +1,76 @@
+import io
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# --------------------------------------------------------------------
+"""Rendu des graphiques (PNG) hors de la boucle d'événements"""
+# --------------------------------------------------------------------
+# Les figures sont créées avec l'API objet de Matplotlib (Figure + canvas Agg) : aucun
+# état global pyplot n'est partagé entre les requêtes, le rendu peut donc s'exécuter
+# dans un pool de threads. Les PNG sont gardés dans un cache LRU en mémoire.
+
+CHART_WORKERS = 2
+CHART_CACHE_SIZE = 256  # Nombre de PNG gardés en mémoire
+
+_executor = ThreadPoolExecutor(max_workers=CHART_WORKERS, thread_name_prefix="charts")
+
+class ChartCache:
+    """Cache LRU des PNG rendus, indexé par les paramètres du graphique."""
+
+    def __init__(self, max_entries: int = CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+            return png
+
+    def put(self, key, png: bytes):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+chart_cache = ChartCache()
+
+def render_duration_histogram(sign: str, distribution: dict) -> bytes:
+    """
+    Histogramme des durées d'un signe, retourné au format PNG, à partir des classes déjà
+    comptées en SQL (route.route.duration_distribution).
+    """
+    fig = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    bins = distribution["bins"]
+    ax.bar(
+        [b["start"] for b in bins], [b["count"] for b in bins],
+        width=[(b["end"] - b["start"]) or 1 for b in bins], align='edge',
+        alpha=0.7, color='blue', edgecolor='black',
+    )
+    ax.axvline(distribution["mean"], color='red', linestyle='dashed', linewidth=2,
+               label=f"Durée moyenne: {distribution['mean']:.2f} ms")
+    ax.set_xlabel("Durée (millisecondes)")
+    ax.set_ylabel("Nombre d'occurrences")
+    ax.set_title(f"Distribution des durées pour le signe '{sign}'")
+    ax.legend()
+
+    img_buf = io.BytesIO()
+    fig.savefig(img_buf, format='png')
+    return img_buf.getvalue()
+
+async def render_chart(render, *args) -> bytes:
+    """Exécute une fonction de rendu dans le pool de threads dédié aux graphiques."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, render, *args)
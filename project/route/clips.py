@@ -0,0 +1,144 @@
+import os
+import time
+import asyncio
+import hashlib
+from pathlib import Path
+
+# --------------------------------------------------------------------
+"""Extraits vidéo d'un segment (annotation CONT), découpés par ffmpeg et gardés sur disque"""
+# --------------------------------------------------------------------
+# Un extrait est ré-encodé (H.264, faststart) pour commencer exactement au début du segment,
+# marge comprise. Le nom du fichier est le hash de la vidéo source (chemin, taille, date de
+# modification), des bornes et de la marge : une vidéo modifiée donne de nouveaux extraits.
+#   <cache>/<2 premiers caractères>/<hash>.mp4
+# Le cache est borné (CLIP_CACHE_MAX_BYTES) : les extraits les moins récemment servis
+# (date de modification, mise à jour à chaque lecture) sont supprimés en premier. Un extrait
+# servi depuis moins de CLIP_EVICT_GRACE_S secondes n'est jamais supprimé : une autre requête
+# peut être en train de l'envoyer (le cache dépasse alors brièvement sa taille maximale).
+
+CLIP_CACHE_DIR = Path(os.getenv("CLIP_CACHE_DIR", Path(__file__).resolve().parent.parent / "cache" / "clips"))
+CLIP_CACHE_MAX_BYTES = int(os.getenv("CLIP_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+CLIP_VERSION = 1              # À incrémenter quand les paramètres d'encodage changent
+CLIP_PADDING_MS = 250         # Marge par défaut avant et après le segment
+CLIP_MAX_PADDING_MS = 5000
+CLIP_MAX_DURATION_MS = 60_000 # Segment le plus long accepté (hors marge)
+CLIP_WORKERS = 2              # Processus ffmpeg simultanés
+CLIP_EVICT_GRACE_S = 60       # Délai de protection d'un extrait après lecture
+
+class ClipError(Exception):
+    pass
+
+def clip_key(video_path, start_ms: int, end_ms: int, padding_ms: int) -> str:
+    """Hash d'un extrait (la vidéo absente lève FileNotFoundError)."""
+    stat = os.stat(video_path)
+    fingerprint = f"v{CLIP_VERSION}|{video_path}|{stat.st_size}:{stat.st_mtime_ns}|{start_ms}|{end_ms}|{padding_ms}"
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+def ffmpeg_clip_command(video_path, output_path, start_ms: int, end_ms: int, padding_ms: int) -> list:
+    clip_start = max(start_ms - padding_ms, 0)
+    duration = end_ms + padding_ms - clip_start
+    return [
+        FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", f"{clip_start / 1000:.3f}", "-i", str(video_path), "-t", f"{duration / 1000:.3f}",
+        "-map", "0:v:0", "-an",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart",
+        "-f", "mp4", str(output_path),
+    ]
+
+class ClipCache:
+    """Extraits sur disque, évincés du moins récemment servi au plus récent au-delà de `max_bytes`."""
+
+    def __init__(self, directory=None, max_bytes: int = None, grace_s: float = None):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._grace_s = grace_s
+
+    @property
+    def directory(self) -> Path:
+        # Résolus à l'appel : CLIP_CACHE_DIR / CLIP_CACHE_MAX_BYTES peuvent être modifiés (tests, configuration)
+        return Path(self._directory or CLIP_CACHE_DIR)
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes if self._max_bytes is not None else CLIP_CACHE_MAX_BYTES
+
+    @property
+    def grace_s(self) -> float:
+        return self._grace_s if self._grace_s is not None else CLIP_EVICT_GRACE_S
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.mp4"
+
+    def lookup(self, key: str):
+        """Chemin de l'extrait s'il est en cache (marqué comme récemment servi), sinon None."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def evict(self) -> int:
+        """
+        Supprime les extraits les plus anciens jusqu'à repasser sous `max_bytes` ; retourne leur nombre.
+        Les extraits servis depuis moins de `grace_s` secondes sont conservés.
+        """
+        protected_after = time.time_ns() - int(self.grace_s * 1e9)
+        entries = []
+        for path in self.directory.glob("*/*.mp4"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime_ns, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes or mtime_ns > protected_after:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+clip_cache = ClipCache()
+
+_inflight = {}
+_workers = asyncio.Semaphore(CLIP_WORKERS)
+
+async def render_clip(video_path, start_ms: int, end_ms: int, padding_ms: int, output_path: Path, cache: ClipCache):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Extension .part : ignoré par evict() tant que ffmpeg écrit
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.part")
+    async with _workers:
+        process = await asyncio.create_subprocess_exec(
+            *ffmpeg_clip_command(video_path, tmp_path, start_ms, end_ms, padding_ms),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+    if process.returncode != 0:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise ClipError(stderr.decode("utf-8", "replace").strip()[-500:] or f"ffmpeg a échoué ({process.returncode})")
+    # Renommé une fois complet : un extrait n'est jamais servi à moitié écrit
+    os.replace(tmp_path, output_path)
+    await asyncio.to_thread(cache.evict)
+    return output_path
+
+async def get_clip(video_path, start_ms: int, end_ms: int, padding_ms: int = CLIP_PADDING_MS, cache: ClipCache = clip_cache) -> Path:
+    """
+    Chemin de l'extrait d'un segment, découpé au premier appel. Les requêtes simultanées pour
+    le même extrait attendent le même processus ffmpeg.
+    """
+    key = await asyncio.to_thread(clip_key, video_path, start_ms, end_ms, padding_ms)
+    path = await asyncio.to_thread(cache.lookup, key)
+    if path is not None:
+        return path
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(render_clip(video_path, start_ms, end_ms, padding_ms, cache.path(key), cache))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield : un client qui se déconnecte n'interrompt pas le découpage attendu par les autres
+    return await asyncio.shield(task)
@@ -0,0 +1,227 @@
+import os
+import re
+import asyncio
+import mimetypes
+from pathlib import Path
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response, PlainTextResponse
+
+# --------------------------------------------------------------------
+"""Diffusion des vidéos et des poses du corpus (requêtes Range, ETag, cache navigateur)"""
+# --------------------------------------------------------------------
+# MediaFiles remplace StaticFiles pour les montages /cont, /isol, /cont_poses et /isol_poses :
+#   - Range (une plage par requête) -> 206 + Content-Range, plage invalide -> 416, If-Range respecté ;
+#   - ETag fort (taille + date de modification en ns), Last-Modified, 304 sur If-None-Match ;
+#   - Cache-Control long (les fichiers du corpus ne changent qu'à une nouvelle préparation) ;
+#   - envoi sans copie (extension ASGI http.response.zerocopysend) quand le serveur la propose,
+#     sinon lecture par blocs dans un thread ;
+#   - nombre de flux simultanés borné (StreamLimiter) : au-delà, 503 + Retry-After ;
+#   - MEDIA_ACCEL_REDIRECT : derrière nginx, seul l'en-tête X-Accel-Redirect est renvoyé
+#     (nginx sert le fichier et gère lui-même Range) ; préfixe d'une location `internal`.
+
+MEDIA_MAX_AGE = 7 * 24 * 3600                                        # Secondes
+MEDIA_MAX_STREAMS = int(os.getenv("MEDIA_MAX_STREAMS", "32"))        # Flux simultanés (toutes les bases)
+MEDIA_QUEUE_TIMEOUT = float(os.getenv("MEDIA_QUEUE_TIMEOUT", "2"))   # Attente maximale d'une place (s)
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT")             # Ex. "/_media" (None : désactivé)
+CHUNK_SIZE = 256 * 1024
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+class StreamLimitExceeded(Exception):
+    pass
+
+class StreamLimiter:
+    """Borne le nombre de fichiers envoyés en même temps ; une requête attend au plus `wait_timeout` secondes."""
+
+    def __init__(self, max_streams: int = MEDIA_MAX_STREAMS, wait_timeout: float = MEDIA_QUEUE_TIMEOUT):
+        self.max_streams = max_streams
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self._semaphore = asyncio.Semaphore(max_streams)
+
+    @asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            raise StreamLimitExceeded() from None
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+media_limiter = StreamLimiter()
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+def parse_range(header: str, size: int):
+    """
+    Plage (début, fin incluse) demandée par l'en-tête Range, None si l'en-tête est ignoré
+    (plusieurs plages ou syntaxe inconnue : le fichier entier est servi). Lève ValueError si
+    la plage n'est pas satisfiable.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffixe : les `last` derniers octets
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+class FileRangeResponse(Response):
+    """Envoie les octets [start, end] d'un fichier (corps vide pour HEAD), en occupant une place du limiteur."""
+
+    def __init__(self, path: Path, start: int, end: int, status_code: int, headers: dict,
+                 send_body: bool = True, limiter: StreamLimiter = None):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.start = start
+        self.length = end - start + 1
+        self.send_body = send_body
+        self.limiter = limiter or media_limiter
+
+    async def __call__(self, scope, receive, send):
+        if not self.send_body or self.length <= 0:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        try:
+            async with self.limiter.slot():
+                await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+                await self.send_file(scope, send)
+        except StreamLimitExceeded:
+            busy = PlainTextResponse("Trop de flux simultanés", status_code=503, headers={"Retry-After": "1"})
+            await busy(scope, receive, send)
+
+    async def send_file(self, scope, send):
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                # Le serveur envoie directement depuis le descripteur (sendfile)
+                await send({"type": "http.response.zerocopysend", "file": file.wrapped.fileno(),
+                            "offset": self.start, "count": self.length})
+                return
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+
+class MediaFiles:
+    """Application ASGI à monter comme StaticFiles : app.mount("/cont", MediaFiles(directory=...))."""
+
+    def __init__(self, directory, accel_redirect: str = None, limiter: StreamLimiter = None, max_age: int = MEDIA_MAX_AGE):
+        self.directory = Path(directory)
+        self.accel_redirect = accel_redirect.rstrip("/") if accel_redirect else None
+        self.limiter = limiter or media_limiter
+        self.max_age = max_age
+
+    def resolve(self, relative_path: str):
+        """Chemin du fichier demandé, None s'il n'existe pas ou sort du dossier servi."""
+        root = self.directory.resolve()
+        try:
+            path = (root / relative_path.lstrip("/")).resolve()
+        except (OSError, ValueError):
+            return None
+        if not path.is_relative_to(root) or not path.is_file():
+            return None
+        return path
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        response = await self.get_response(request)
+        await response(scope, receive, send)
+
+    async def get_response(self, request: Request) -> Response:
+        if request.method not in ("GET", "HEAD"):
+            return PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+
+        # Chemin relatif au point de montage
+        relative_path = request.scope["path"][len(request.scope.get("root_path", "")):]
+        path = await anyio.to_thread.run_sync(self.resolve, relative_path)
+        if path is None:
+            return PlainTextResponse("Not Found", status_code=404)
+        return self.file_response(request, path)
+
+    def file_response(self, request: Request, path: Path) -> Response:
+        """Réponse (200, 206, 304, 416) pour un fichier existant, aussi utilisée hors montage (extraits vidéo)."""
+        stat = path.stat()
+        etag = file_etag(stat)
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": last_modified,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Accept-Ranges": "bytes",
+        }
+        if self.is_not_modified(request, etag, stat.st_mtime):
+            return Response(status_code=304, headers=headers)
+
+        if self.accel_redirect:
+            # nginx sert le fichier (Range compris) depuis sa location interne
+            relative = path.resolve().relative_to(self.directory.resolve()).as_posix()
+            headers["X-Accel-Redirect"] = f"{self.accel_redirect}/{relative}"
+            return Response(status_code=200, headers=headers, media_type=mimetypes.guess_type(path.name)[0])
+
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        headers["Content-Type"] = media_type
+        size = stat.st_size
+        byte_range = None
+        range_header = request.headers.get("range")
+        if range_header and self.if_range_matches(request, etag, last_modified):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+        send_body = request.method == "GET"
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            return FileRangeResponse(path, 0, size - 1, 200, headers, send_body, self.limiter)
+        start, end = byte_range
+        headers["Content-Length"] = str(end - start + 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return FileRangeResponse(path, start, end, 206, headers, send_body, self.limiter)
+
+    @staticmethod
+    def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+        # If-None-Match prime sur If-Modified-Since (RFC 9110)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return etag in tags or "*" in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def if_range_matches(request: Request, etag: str, last_modified: str) -> bool:
+        """If-Range : la plage n'est servie que si le fichier n'a pas changé (sinon 200 complet)."""
+        if_range = request.headers.get("if-range")
+        if if_range is None:
+            return True
+        return if_range.strip() in (etag, last_modified)
@@ -0,0 +1,73 @@
+import struct
+import numpy as np
+
+# --------------------------------------------------------------------
+"""Format binaire compact des poses d'une instance"""
+# --------------------------------------------------------------------
+# En-tête little-endian :
+#   magic "LSFB" | version (u8) | dtype (u8 : 1 = float16, 2 = float32) | n_parts (u16)
+#   | n_frames (u32) | n_joints (u32) | n_dims (u32)
+# puis n_parts entrées (nom sur 16 octets, premier joint u32, nombre de joints u32),
+# puis les frames : n_frames x n_joints x n_dims valeurs little-endian, frame par frame.
+# Les parties sont concaténées dans l'ordre de POSE_PARTS (ou de la sélection demandée).
+
+POSE_PARTS = ("pose", "left_hand", "right_hand", "face")
+POSE_DTYPES = {"float16": (1, "<f2"), "float32": (2, "<f4")}
+MAGIC = b"LSFB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHIII")
+PART_ENTRY = struct.Struct("<16sII")
+FRAMES_PER_CHUNK = 256  # Nombre de frames envoyées par morceau
+
+def frame_range(arrays: dict, start: int = 0, end: int = None):
+    """Bornes [start, end) limitées au nombre de frames commun à toutes les parties."""
+    n_frames = min(array.shape[0] for array in arrays.values())
+    end = n_frames if end is None else min(end, n_frames)
+    start = min(start, end)
+    return start, end
+
+def pack_header(arrays: dict, n_frames: int, dtype: str) -> bytes:
+    n_dims = min(array.shape[2] for array in arrays.values())
+    entries = []
+    first_joint = 0
+    for part, array in arrays.items():
+        entries.append(PART_ENTRY.pack(part.encode("ascii"), first_joint, array.shape[1]))
+        first_joint += array.shape[1]
+    header = HEADER.pack(MAGIC, VERSION, POSE_DTYPES[dtype][0], len(arrays), n_frames, first_joint, n_dims)
+    return header + b"".join(entries)
+
+def payload_size(arrays: dict, start: int, end: int, dtype: str) -> int:
+    """Taille totale (en octets) du flux, pour l'en-tête Content-Length."""
+    n_joints = sum(array.shape[1] for array in arrays.values())
+    n_dims = min(array.shape[2] for array in arrays.values())
+    item_size = np.dtype(POSE_DTYPES[dtype][1]).itemsize
+    return HEADER.size + PART_ENTRY.size * len(arrays) + (end - start) * n_joints * n_dims * item_size
+
+def encode_pose_stream(arrays: dict, start: int, end: int, dtype: str = "float16", frames_per_chunk: int = FRAMES_PER_CHUNK):
+    """Générateur des octets du flux : l'en-tête puis les frames par morceaux de `frames_per_chunk`."""
+    numpy_dtype = POSE_DTYPES[dtype][1]
+    n_dims = min(array.shape[2] for array in arrays.values())
+    yield pack_header(arrays, end - start, dtype)
+
+    for chunk_start in range(start, end, frames_per_chunk):
+        chunk_end = min(chunk_start + frames_per_chunk, end)
+        # Seules les frames du morceau sont lues depuis les fichiers mappés
+        frames = np.concatenate([array[chunk_start:chunk_end, :, :n_dims] for array in arrays.values()], axis=1)
+        yield np.ascontiguousarray(frames, dtype=numpy_dtype).tobytes()
+
+def decode_pose_stream(data: bytes):
+    """Décode un flux complet : retourne ({partie: (premier joint, nombre de joints)}, frames)."""
+    magic, version, dtype_code, n_parts, n_frames, n_joints, n_dims = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Flux de poses invalide")
+
+    parts = {}
+    offset = HEADER.size
+    for _ in range(n_parts):
+        name, first_joint, count = PART_ENTRY.unpack_from(data, offset)
+        parts[name.rstrip(b"\0").decode("ascii")] = (first_joint, count)
+        offset += PART_ENTRY.size
+
+    numpy_dtype = next(code for key, (value, code) in POSE_DTYPES.items() if value == dtype_code)
+    frames = np.frombuffer(data, dtype=numpy_dtype, offset=offset).reshape(n_frames, n_joints, n_dims)
+    return parts, frames
@@ -0,0 +1,146 @@
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from database.dataset_version import read_dataset_version
+
+# --------------------------------------------------------------------
+"""Cache des réponses JSON des endpoints /stats/* (invalidé par la version des données)"""
+# --------------------------------------------------------------------
+# Une réponse est indexée par route, paramètres de requête et version des bases qu'elle lit
+# (database/dataset_version.py, incrémentée par chaque ingestion) : après une ingestion, la
+# clé change et l'ancienne réponse n'est plus servie. La durée de vie (CACHE_TTL) borne en
+# plus l'âge d'une réponse. La version est relue au plus toutes les VERSION_CHECK_INTERVAL
+# secondes : une réponse en cache ne coûte alors aucune requête en base.
+# Chaque réponse porte un ETag (hash du contenu) et un Last-Modified (date de l'ingestion) :
+# le navigateur revalide (Cache-Control: no-cache) et reçoit un 304 sans contenu.
+
+CACHE_TTL = 600               # Secondes
+CACHE_SIZE = 256              # Nombre de réponses gardées en mémoire
+VERSION_CHECK_INTERVAL = 5    # Secondes entre deux lectures de la version d'une base
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    last_modified: Optional[str]
+    expires_at: float
+
+class ResponseCache:
+    """Cache LRU des réponses, avec expiration."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, body: bytes, last_modified: Optional[str]) -> CachedResponse:
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            last_modified=last_modified,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class DatasetVersions:
+    """Dernière version lue de chaque base, relue au plus toutes les `check_interval` secondes."""
+
+    def __init__(self, check_interval: float = VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._versions = {}
+
+    async def get(self, session, db_key: str):
+        cached = self._versions.get(db_key)
+        if cached is not None and time.monotonic() - cached[0] < self.check_interval:
+            return cached[1]
+        version = await read_dataset_version(session, db_key)
+        self._versions[db_key] = (time.monotonic(), version)
+        return version
+
+    def clear(self):
+        self._versions.clear()
+
+response_cache = ResponseCache()
+dataset_versions = DatasetVersions()
+
+def not_modified(request: Request, entry: CachedResponse) -> bool:
+    # If-None-Match prime sur If-Modified-Since (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return entry.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified:
+        try:
+            return parsedate_to_datetime(entry.last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def cached_json_response(request: Request, sessions: dict, build) -> Response:
+    """
+    Sert la réponse JSON d'un endpoint depuis le cache, ou l'y place.
+    `sessions` : {"cont"|"isol": session} des bases lues par l'endpoint (leur version fait partie de la clé).
+    `build` : coroutine sans argument retournant le contenu (dict) ou une Response JSON dont les
+    en-têtes (Server-Timing...) sont conservés lors du calcul.
+    """
+    # Versions des bases lues en parallèle (une session par base)
+    versions = dict(zip(sessions, await asyncio.gather(
+        *(dataset_versions.get(session, db_key) for db_key, session in sessions.items())
+    )))
+    key = (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        tuple((db_key, version) for db_key, (version, _) in sorted(versions.items())),
+    )
+
+    entry = response_cache.get(key)
+    extra_headers = {}
+    if entry is None:
+        content = await build()
+        if isinstance(content, Response):
+            body = content.body
+            extra_headers = {name: value for name, value in content.headers.items() if name == "server-timing"}
+        else:
+            body = json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        # Last-Modified : date de l'ingestion la plus récente parmi les bases lues
+        updated = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+        last_modified = format_datetime(max(updated).astimezone(timezone.utc), usegmt=True) if updated else None
+        entry = response_cache.put(key, body, last_modified)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **extra_headers}
+    if entry.last_modified:
+        headers["Last-Modified"] = entry.last_modified
+    if not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -1,34 +1,42 @@
 import matplotlib as mpl
 mpl.rcParams['animation.ffmpeg_path'] = r"C:\ffmpeg\bin\ffmpeg.exe"  # Chemin vers ffmpeg
 import asyncio
-import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-import io
-import base64
 import json, urllib.parse
+import hashlib
 import os
 import math
 import numpy as np
-from pymediainfo import MediaInfo
 from pathlib import Path
 from fastapi import APIRouter, Request, HTTPException, Depends, Query
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse, Response
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, contains_eager
 from sqlalchemy.sql import func, distinct, cast
-from sqlalchemy import Float
+from sqlalchemy import Float, false, true, case, or_
 from math import ceil
-from database.db_init import get_db_cont, get_db_isol
-from schema.models_cont import ContInstance, ContVideo, WordAnnotation, SubtitleAnnotation, ContPose
-from schema.models_isol import IsolInstance, IsolVideo, IsolPose
+from database.db_init import get_db_cont, get_db_isol, router_cont, router_isol, ENGINE_PROFILE
+from database.dataset_stats import compute_general_stats, read_general_stats
+from pose_store import pose_store
+from pose_archive import read_entry
+from route.charts import chart_cache, render_chart, render_duration_histogram
+from route.timing import QueryTimings
+from route.response_cache import cached_json_response, dataset_versions
+from route.media import MediaFiles, MEDIA_MAX_AGE
+from route.clips import CLIP_CACHE_DIR, CLIP_PADDING_MS, CLIP_MAX_PADDING_MS, CLIP_MAX_DURATION_MS, ClipError, get_clip
+from skeleton_previews import PREVIEW_KINDS, preview_digest, preview_path
+from schema.models_cont import ContInstance, ContVideo, WordAnnotation, SubtitleAnnotation, ContPose, ContPoseArchive
+from schema.models_isol import IsolInstance, IsolVideo, IsolPose, IsolPoseArchive
 from typing import Optional, List, Dict
+from route.pose_stream import POSE_PARTS, frame_range, payload_size, encode_pose_stream
 
 
 # 1) Créer un router
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
+DEFAULT_VIDEO_FPS = 50  # Cadence des vidéos LSFB, si elle n'a pas encore été sondée (backfill_videos.py)
 
 # 2) Définir les routes
 # --- Pages HTML simples ---
@@ -72,47 +80,16 @@ async def read_video_view(request: Request):
     return templates.TemplateResponse(request, "video_view_isol.html", {"request": request})
 
 
-""""""""""""""""""""
-#fonction générée par ChatGPT pour determiner la durée réelle d'une vidéo de cont
-DURATIONS_CACHE = {}# Dictionnaire pour mettre en cache les durées déjà calculées
-
-def get_real_video_duration_s(video_path: str) -> float:
-    """
-    Retourne la durée réelle d'une vidéo (en secondes) en utilisant pymediainfo.
-    Stocke le résultat dans un cache (DURATIONS_CACHE) pour éviter de recalculer
-    la durée pour le même fichier.
-    
-    Nécessite que la bibliothèque pymediainfo soit installée et que MediaInfo
-    soit disponible sur le système.
-    """
-    # Si la durée a déjà été calculée, la renvoyer directement
-    if video_path in DURATIONS_CACHE:
-        return DURATIONS_CACHE[video_path]
-
-    # Vérifier que le fichier existe
-    if not os.path.isfile(video_path):
-        print(f"[WARN] Fichier introuvable: {video_path}")
-        DURATIONS_CACHE[video_path] = 0.0
-        return 0.0
-
-    try:
-        # Récupérer les métadonnées du fichier vidéo
-        media_info = MediaInfo.parse(video_path)
-        # Parcourir les pistes pour trouver la piste vidéo et sa durée
-        for track in media_info.tracks:
-            if track.track_type == "Video" and track.duration:
-                # La durée est en millisecondes, conversion en secondes
-                duration = float(track.duration) / 1000.0
-                DURATIONS_CACHE[video_path] = duration
-                return duration
-        # Aucune durée trouvée
-        DURATIONS_CACHE[video_path] = 0.0
-        return 0.0
-    except Exception as e:
-        print(f"[WARN] Erreur MediaInfo pour {video_path}: {e}")
-        DURATIONS_CACHE[video_path] = 0.0
-        return 0.0
+# --- État des pools de connexions ---
+@router.get("/health/db")
+async def health_db():
+    return {
+        "profile": ENGINE_PROFILE["name"],
+        "cont": router_cont.status(),
+        "isol": router_isol.status(),
+    }
 
+""""""""""""""""""""
 #Fonction de conversion de millisecondes en format MM:SS   
 def format_time(ms):
     """Convertir les millisecondes en format MM:SS."""
@@ -133,6 +110,125 @@ def format_time(ms):
     return "Invalid time format"
 
 
+# --- Prédicat de recherche compatible avec les index trigram ---
+def contains_term(column, term: str):
+    """
+    Équivalent de `column ILIKE '%term%'` où les jokers saisis par l'utilisateur
+    (%, _) sont échappés. Ce prédicat est servi par les index GIN pg_trgm
+    créés par `db.init_db` dès que le terme compte au moins 3 caractères.
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+# --- Construction SQL de la recherche CONT ---
+ITEMS_PAR_PAGE = 15
+
+# Valeurs du formulaire (left/right/both) -> valeurs de l'ENUM hand_enum
+HAND_TYPE_VALUES = {"left": "left_hand", "right": "right_hand", "both": "both_hands"}
+# Valeurs de l'ENUM type_enum
+SIGN_TYPE_VALUES = {"normal", "special"}
+
+def build_cont_search_filters(
+    search_type: str,
+    term_lower: str,
+    signer: Optional[str] = None,
+    session_id: Optional[str] = None,
+    task_id: Optional[str] = None,
+    min_duration: Optional[int] = None,
+    max_duration: Optional[int] = None,
+    hand_type: Optional[str] = None,
+    sign_type: Optional[str] = None,
+):
+    """
+    Traduit la recherche et les filtres CONT en clauses WHERE.
+    Retourne (modèle d'annotation, filtres sur les annotations, filtres sur les instances) :
+    - les filtres d'annotation portent sur le terme, la durée, la main et le type de signe ;
+    - les filtres d'instance portent sur le signataire, la session et la tâche.
+    """
+    if search_type == "phrase":
+        annotation = SubtitleAnnotation
+        annotation_filters = [contains_term(SubtitleAnnotation.text, term_lower)]
+    else:
+        annotation = WordAnnotation
+        annotation_filters = [contains_term(WordAnnotation.word, term_lower)]
+
+    # Filtres sur la durée de l'annotation (en millisecondes)
+    if min_duration is not None:
+        annotation_filters.append((annotation.end_time - annotation.start_time) >= min_duration)
+    if max_duration is not None:
+        annotation_filters.append((annotation.end_time - annotation.start_time) <= max_duration)
+    # Filtres propres aux annotations de mots (colonnes ENUM : une valeur hors de l'ENUM,
+    # rejetée par PostgreSQL, ne correspond à rien)
+    if hand_type and search_type == "word":
+        hand_value = hand_type.strip().lower()
+        hand_value = HAND_TYPE_VALUES.get(hand_value, hand_value)
+        annotation_filters.append(WordAnnotation.hand_type == hand_value if hand_value in HAND_TYPE_VALUES.values() else false())
+    if sign_type and search_type == "word":
+        sign_value = sign_type.strip().lower()
+        annotation_filters.append(WordAnnotation.sign_type == sign_value if sign_value in SIGN_TYPE_VALUES else false())
+
+    # Filtres sur l'instance (colonnes entières : une valeur non numérique ne correspond à rien)
+    instance_filters = []
+    for column, value in (
+        (ContInstance.signer_id, signer),
+        (ContInstance.session_id, session_id),
+        (ContInstance.task_id, task_id),
+    ):
+        if value:
+            value = value.strip()
+            instance_filters.append(column == int(value) if value.isdigit() else false())
+
+    return annotation, annotation_filters, instance_filters
+
+def build_cont_search_query(annotation, annotation_filters, instance_filters):
+    """
+    Requête des vidéos CONT ayant au moins une annotation correspondante.
+    L'EXISTS évite la jointure sur les annotations et le DISTINCT qui en découlait,
+    la jointure sur l'instance sert à la fois aux filtres et au chargement de `instance_cont`.
+    """
+    matching_annotation = (
+        select(annotation.instance_id)
+        .where(annotation.instance_id == ContVideo.instance_id, *annotation_filters)
+        .exists()
+    )
+    return (
+        select(ContVideo)
+        .join(ContInstance, ContInstance.id == ContVideo.instance_id)
+        .options(contains_eager(ContVideo.instance_cont))
+        .where(matching_annotation, *instance_filters)
+    )
+
+def segment_entry(instance_id: str, start_ms: int, end_ms: int) -> dict:
+    """
+    Segment affiché (MM:SS) avec ses bornes en millisecondes, l'URL de son extrait vidéo et le
+    début de l'extrait dans la vidéo complète (marge comprise, pour synchroniser le squelette).
+    """
+    return {
+        "start": format_time(start_ms),
+        "end": format_time(end_ms),
+        "start_ms": start_ms,
+        "end_ms": end_ms,
+        "clip": f"/clip/cont/{urllib.parse.quote(instance_id)}?start={start_ms}&end={end_ms}",
+        "clip_start_ms": max(start_ms - CLIP_PADDING_MS, 0),
+    }
+
+async def fetch_cont_segments(db_cont: AsyncSession, annotation, annotation_filters, instance_ids: List[str]) -> Dict[str, list]:
+    """Charge uniquement les annotations correspondantes des instances de la page affichée."""
+    segments = {instance_id: [] for instance_id in instance_ids}
+    if not instance_ids:
+        return segments
+
+    query = (
+        select(annotation.instance_id, annotation.start_time, annotation.end_time)
+        .where(annotation.instance_id.in_(instance_ids), *annotation_filters)
+        .order_by(annotation.instance_id, annotation.start_time)
+    )
+    result = await db_cont.execute(query)
+    for row in result.all():
+        segments[row.instance_id].append(segment_entry(row.instance_id, row.start_time, row.end_time))
+    return segments
+
+
 # --- Route de recherche : /results_cont ---
 @router.get("/results_cont", response_class=HTMLResponse)
 async def results_cont(
@@ -146,14 +242,15 @@ async def results_cont(
     task_id: Optional[str] = Query(None, description="Task"),
     min_duration_str: Optional[str] = Query(None, description="Durée min (en millisecondes)"),
     max_duration_str: Optional[str] = Query(None, description="Durée max (en millisecondes)"),
-    page: int = Query(1, description="Page de pagination"),
+    page: int = Query(1, ge=1, description="Page de pagination"),
     db_cont: AsyncSession = Depends(get_db_cont),
 ):
     """
     Recherche CONT avec jointures et filtres.
     - Recherche par mot (`WordAnnotation`) ou phrase (`SubtitleAnnotation`).
-    - Calcule la durée réelle des vidéos.
-    - Transmet les segments à `video_view_cont.html`.
+    - Filtres et pagination exécutés en SQL (COUNT puis LIMIT/OFFSET).
+    - Seules les annotations correspondantes de la page affichée sont chargées.
+    - La durée réelle des vidéos est lue en base (colonne `duration_s` remplie à l'ingestion).
     - Garde les statistiques pour analyse.
     """
 
@@ -164,70 +261,33 @@ async def results_cont(
     term_lower = term.strip().lower()
     search_type = "phrase" if " " in term_lower else "word"  # Déterminer le type de recherche
 
-    #Construction de la requête principale avec jointures
-    if search_type == "phrase":
-        query_global = (
-            select(ContVideo)
-            .join(ContInstance)
-            .join(SubtitleAnnotation)
-            .filter(SubtitleAnnotation.text.ilike(f"%{term_lower}%"))
-            .options(
-                selectinload(ContVideo.instance_cont).selectinload(ContInstance.subtitle_annotations),
-                selectinload(ContVideo.instance_cont).selectinload(ContInstance.word_annotations),
-            )
-            .distinct()
+    #Construction des clauses WHERE (les filtres ne s'appliquent qu'en mode "filter")
+    if submitType == "filter":
+        annotation, annotation_filters, instance_filters = build_cont_search_filters(
+            search_type, term_lower,
+            signer=signer, session_id=session_id, task_id=task_id,
+            min_duration=min_duration, max_duration=max_duration,
+            hand_type=hand_type, sign_type=sign_type,
         )
     else:
-        query_global = (
-            select(ContVideo)
-            .join(ContInstance)
-            .join(WordAnnotation)
-            .filter(WordAnnotation.word.ilike(f"%{term_lower}%"))
-            .options(
-                selectinload(ContVideo.instance_cont).selectinload(ContInstance.subtitle_annotations),
-                selectinload(ContVideo.instance_cont).selectinload(ContInstance.word_annotations),
-            )
-            .distinct()
-        )
+        annotation, annotation_filters, instance_filters = build_cont_search_filters(search_type, term_lower)
+    query_global = build_cont_search_query(annotation, annotation_filters, instance_filters)
 
-    #Exécution de la requête
-    result_global = await db_cont.execute(query_global)
-    global_results = result_global.scalars().all()
+    #Comptage des résultats en SQL
+    total_results = await db_cont.scalar(
+        select(func.count()).select_from(query_global.with_only_columns(ContVideo.video_id).subquery())
+    ) or 0
+    total_pages = ceil(total_results / ITEMS_PAR_PAGE)
 
-    #Appliquer les filtres supplémentaires
-    if submitType == "filter":
-        filtered_results = []
-        for video in global_results:
-            instance = video.instance_cont
-
-            # Filtrage sur signer, session, task
-            if signer and str(instance.signer_id).lower() != signer.lower():
-                continue
-            if session_id and str(instance.session_id).lower() != session_id.lower():
-                continue
-            if task_id and str(instance.task_id).lower() != task_id.lower():
-                continue
-
-            meets_filters = True
-            annotations = instance.subtitle_annotations if search_type == "phrase" else instance.word_annotations
-
-            # Filtres spécifiques
-            if min_duration is not None:
-                annotations = [a for a in annotations if (a.end_time - a.start_time) >= min_duration]
-            if max_duration is not None:
-                annotations = [a for a in annotations if (a.end_time - a.start_time) <= max_duration]
-            if hand_type and search_type == "word":
-                annotations = [a for a in annotations if a.hand_type.lower() == hand_type.lower()]
-            if sign_type and search_type == "word":
-                annotations = [a for a in annotations if a.sign_type.lower() == sign_type.lower()]
-
-            if not annotations:
-                meets_filters = False
-
-            if meets_filters:
-                filtered_results.append(video)
-
-        global_results = filtered_results
+    #Récupération de la page demandée uniquement
+    query_page = (
+        query_global
+        .order_by(ContVideo.instance_id)
+        .offset((page - 1) * ITEMS_PAR_PAGE)
+        .limit(ITEMS_PAR_PAGE)
+    )
+    result_page = await db_cont.execute(query_page)
+    paginated_results = result_page.scalars().all()
 
     #Récupération des statistiques
     stats = {}
@@ -237,34 +297,18 @@ async def results_cont(
         else:
             stats = await get_word_stats(term_lower, db_cont)
 
-    #Construction de la liste des vidéos avec leurs segments
-    videos_with_segments = []
-    if global_results:
-        for vid in global_results:
-            instance = vid.instance_cont
-            annotations = instance.subtitle_annotations if search_type == "phrase" else instance.word_annotations
-            matched = [a for a in annotations if term_lower in (a.text if search_type == "phrase" else a.word).lower()]
-            segs = [{"start": format_time(a.start_time), "end": format_time(a.end_time)} for a in matched]
-
-            videos_with_segments.append({
-                "video": vid,
-                "segments": segs,
-                "search_type": search_type
-            })
-
-    #Calcul de la durée réelle des vidéos via MediaInfo
-    for vid in global_results:
-        real_seconds = get_real_video_duration_s(vid.path)
-        # Ajout d'un attribut éphémère pour la durée
-        vid.real_duration_s = real_seconds
-
-    # Pagination
-    ITEMS_PAR_PAGE = 15
-    total_results = len(global_results)
-    total_pages = ceil(total_results / ITEMS_PAR_PAGE)
-    start_index = (page - 1) * ITEMS_PAR_PAGE
-    end_index = start_index + ITEMS_PAR_PAGE
-    paginated_results = global_results[start_index:end_index]
+    #Construction de la liste des vidéos de la page avec leurs segments
+    segments_by_instance = await fetch_cont_segments(
+        db_cont, annotation, annotation_filters, [vid.instance_id for vid in paginated_results]
+    )
+    videos_with_segments = [
+        {
+            "video": vid,
+            "segments": segments_by_instance.get(vid.instance_id, []),
+            "search_type": search_type
+        }
+        for vid in paginated_results
+    ]
 
     #Rendu du template avec les résultats
     return templates.TemplateResponse(
@@ -345,6 +389,7 @@ async def get_video_cont(
             "video_path": video_url,  # L'URL de la vidéo à afficher
             "previous_term": previous_term,  # Le terme précédent de recherche
             "format_time": format_time,
+            "fps": video_cont.fps or DEFAULT_VIDEO_FPS,  # Synchronisation du squelette avec la vidéo
             "dataset": "cont",  # Nom du dataset (ici "cont")
         }
     )
@@ -363,19 +408,72 @@ async def get_segments(
             # Recherche par phrase dans SubtitleAnnotation
             segments_query = select(SubtitleAnnotation.start_time, SubtitleAnnotation.end_time).filter(
                 SubtitleAnnotation.instance_id == video_id,  # Filtrer les annotations de sous-titres pour la vidéo
-                SubtitleAnnotation.text.ilike(f"%{previous_term}%")  # Recherche par phrase dans les sous-titres
+                contains_term(SubtitleAnnotation.text, previous_term)  # Recherche par phrase dans les sous-titres
             )
         else:
             # Recherche par mot dans WordAnnotation
             segments_query = select(WordAnnotation.start_time, WordAnnotation.end_time).filter(
                 WordAnnotation.instance_id == video_id,  # Filtrer les annotations de mots pour la vidéo
-                WordAnnotation.word.ilike(f"%{previous_term}%")  # Recherche par mot (terme précédent)
+                contains_term(WordAnnotation.word, previous_term)  # Recherche par mot (terme précédent)
             )
     if segments_query is not None:
         segments = await db_cont.execute(segments_query)
-        segments_list = [{"start": format_time(row.start_time), "end": format_time(row.end_time)} for row in segments.all()]
+        segments_list = [segment_entry(video_id, row.start_time, row.end_time) for row in segments.all()]
     return {"segments_list": segments_list}  # Envoie les données sous forme de dictionnaire directement
 
+# --- Extrait vidéo d'un segment : /clip/cont/{instance_id} ---
+clip_files = MediaFiles(directory=CLIP_CACHE_DIR, max_age=MEDIA_MAX_AGE)
+
+@router.get("/clip/cont/{instance_id}")
+async def get_clip_cont(
+    request: Request,
+    instance_id: str,
+    start: int = Query(..., ge=0, description="Début du segment (ms)"),
+    end: int = Query(..., ge=0, description="Fin du segment (ms)"),
+    padding: int = Query(CLIP_PADDING_MS, ge=0, le=CLIP_MAX_PADDING_MS, description="Marge avant et après le segment (ms)"),
+    db_cont: AsyncSession = Depends(get_db_cont)
+):
+    """
+    Extrait (MP4, faststart) d'un segment annoté d'une vidéo CONT, découpé au premier appel puis
+    servi depuis le cache disque (Range, ETag). Seuls les segments existants (mot ou phrase
+    annoté avec exactement ces bornes) sont acceptés.
+    """
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end doit être supérieur à start")
+    if end - start > CLIP_MAX_DURATION_MS:
+        raise HTTPException(status_code=422, detail=f"Segment trop long (maximum {CLIP_MAX_DURATION_MS} ms)")
+
+    def annotated(annotation):
+        return (
+            select(annotation.instance_id)
+            .where(annotation.instance_id == instance_id, annotation.start_time == start, annotation.end_time == end)
+            .exists()
+        )
+
+    query = select(ContVideo.path).where(
+        ContVideo.instance_id == instance_id,
+        or_(annotated(WordAnnotation), annotated(SubtitleAnnotation)),
+    )
+    video_path = (await db_cont.execute(query)).scalar_one_or_none()
+    if video_path is None:
+        raise HTTPException(status_code=404, detail="Segment introuvable")
+
+    async def clip_response():
+        try:
+            clip_path = await get_clip(video_path, start, end, padding)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Vidéo introuvable")
+        except ClipError as error:
+            print(f"[CLIP] Échec du découpage de {instance_id} [{start}, {end}] : {error}")
+            raise HTTPException(status_code=502, detail="Échec du découpage de l'extrait")
+        return clip_files.file_response(request, clip_path)
+
+    try:
+        return await clip_response()
+    except FileNotFoundError:
+        # Extrait évincé entre lookup() et l'envoi (découpage d'un autre segment) : redécoupé une fois
+        return await clip_response()
+
 # --- Route de recherche : /results_isol ---
 @router.get("/results_isol", response_class=HTMLResponse)
 async def results_isol(
@@ -481,6 +579,99 @@ async def get_cont_poses(
     # Retourner un dictionnaire avec les parties du corps comme clés et les chemins des poses comme valeurs
     return {"pose_paths": poses_dict}
 
+async def pose_data_response(session: AsyncSession, pose_model, archive_model, video_id: str, start: int, end: Optional[int], parts: Optional[str], dtype: str):
+    """
+    Retourne les frames des parties demandées, fusionnées le long de l'axe des joints,
+    sous forme d'un flux binaire (voir route/pose_stream.py) envoyé par morceaux.
+    Les poses sont lues dans l'archive consolidée si l'instance y figure, sinon dans ses fichiers .npy.
+    """
+    requested_parts = [part.strip() for part in parts.split(",") if part.strip()] if parts else list(POSE_PARTS)
+    unknown_parts = [part for part in requested_parts if part not in POSE_PARTS]
+    if unknown_parts:
+        raise HTTPException(status_code=422, detail=f"Parties inconnues : {', '.join(unknown_parts)}")
+
+    archive_data = await session.execute(select(archive_model).where(archive_model.instance_id == video_id))
+    archive_entry = archive_data.scalar_one_or_none()
+    if archive_entry is not None:
+        try:
+            # Frames de l'instance contiguës dans un seul fichier de l'archive (ouvert en mmap)
+            views = await asyncio.to_thread(
+                read_entry, archive_entry.shard_path, archive_entry.frame_offset, archive_entry.n_frames, 0, None, requested_parts
+            )
+            arrays = {part: views[part] for part in requested_parts}
+        except (OSError, ValueError, KeyError) as e:
+            raise HTTPException(status_code=404, detail=f"Archive de poses illisible pour {video_id} : {e}")
+    else:
+        poses_data = await session.execute(
+            select(pose_model.pose_part, pose_model.pose_path).where(pose_model.instance_id == video_id)
+        )
+        paths_by_part = dict(poses_data.all())
+        missing_parts = [part for part in requested_parts if part not in paths_by_part]
+        if missing_parts:
+            raise HTTPException(status_code=404, detail=f"Poses introuvables pour {video_id} : {', '.join(missing_parts)}")
+
+        try:
+            # Fichiers ouverts en mmap et gardés en cache : seules les frames envoyées sont lues depuis le disque
+            mapped = await asyncio.to_thread(pose_store.get, (pose_model.__tablename__, video_id), paths_by_part)
+            arrays = {part: mapped[part] for part in requested_parts}
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=404, detail=f"Fichier de poses illisible pour {video_id} : {e}")
+
+    start, end = frame_range(arrays, start, end)
+    return StreamingResponse(
+        encode_pose_stream(arrays, start, end, dtype),
+        media_type="application/octet-stream",
+        headers={"Content-Length": str(payload_size(arrays, start, end, dtype))},
+    )
+
+@router.get("/cont_pose_data/{video_id}")
+async def get_cont_pose_data(
+    video_id: str,
+    start: int = Query(0, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    parts: Optional[str] = Query(None, description="Parties séparées par des virgules (pose,left_hand,right_hand,face)"),
+    dtype: str = Query("float16", pattern="^(float16|float32)$"),
+    db_cont: AsyncSession = Depends(get_db_cont)
+):
+    return await pose_data_response(db_cont, ContPose, ContPoseArchive, video_id, start, end, parts, dtype)
+
+async def skeleton_preview_response(request: Request, session: AsyncSession, pose_model, video_id: str, kind: str):
+    """
+    Sert l'aperçu pré-calculé du squelette (planche 'sprite' ou vignette 'poster') d'une instance.
+    Aucun rendu n'est fait ici : l'aperçu est produit par database/render_previews.py.
+    """
+    if kind not in PREVIEW_KINDS:
+        raise HTTPException(status_code=404, detail=f"Type d'aperçu inconnu : {kind}")
+
+    poses_data = await session.execute(
+        select(pose_model.pose_part, pose_model.pose_path).where(pose_model.instance_id == video_id)
+    )
+    paths_by_part = dict(poses_data.all())
+    try:
+        digest = await asyncio.to_thread(preview_digest, paths_by_part)
+    except (KeyError, OSError):
+        raise HTTPException(status_code=404, detail=f"Poses introuvables pour {video_id}")
+
+    path = preview_path(digest, kind)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Aperçu pas encore rendu pour {video_id}")
+
+    # Le hash identifie le contenu : il sert d'ETag
+    etag = f'"{digest}-{kind}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/png", headers=headers)
+
+@router.get("/cont_preview/{video_id}/{kind}")
+async def get_cont_preview(
+    request: Request,
+    video_id: str,
+    kind: str,
+    db_cont: AsyncSession = Depends(get_db_cont)
+):
+    return await skeleton_preview_response(request, db_cont, ContPose, video_id, kind)
+
 
 #--- Route d'affichage vidéo isol : /video/isol/{video_id} ---
 # Définir le chemin de base du dataset "isol"
@@ -534,6 +725,7 @@ async def get_video_isol(
             "instance_id": video_id,  # Passer l'ID de la vidéo
             "video_path": video_url,  # L'URL de la vidéo à afficher
             "previous_term": previous_term,  # Le terme de recherche précédent
+            "fps": video_isol.fps or DEFAULT_VIDEO_FPS,  # Synchronisation du squelette avec la vidéo
             "dataset": "isol"  # Nom du dataset (ici, "isol")
         }
     )
@@ -559,91 +751,102 @@ async def get_isol_poses(
     # Retourner un dictionnaire avec les parties du corps comme clés et les chemins des poses comme valeurs
     return {"pose_paths": poses_dict}
 
+@router.get("/isol_pose_data/{video_id}")
+async def get_isol_pose_data(
+    video_id: str,
+    start: int = Query(0, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    parts: Optional[str] = Query(None, description="Parties séparées par des virgules (pose,left_hand,right_hand,face)"),
+    dtype: str = Query("float16", pattern="^(float16|float32)$"),
+    db_isol: AsyncSession = Depends(get_db_isol)
+):
+    return await pose_data_response(db_isol, IsolPose, IsolPoseArchive, video_id, start, end, parts, dtype)
+
+@router.get("/isol_preview/{video_id}/{kind}")
+async def get_isol_preview(
+    request: Request,
+    video_id: str,
+    kind: str,
+    db_isol: AsyncSession = Depends(get_db_isol)
+):
+    return await skeleton_preview_response(request, db_isol, IsolPose, video_id, kind)
+
 
 # Fonctions asynchrones pour calculer les statistiques
+# (une seule requête d'agrégat par base et par page de résultats)
 # --- Statistiques sur les mots ou les phrases dans Cont ---
-async def get_word_stats(word: str, db_session: AsyncSession):
-    # Recherche dans SubtitleAnnotation toutes les phrases contenant le mot (insensible à la casse)
-    query_subs = select(SubtitleAnnotation).filter(
-        SubtitleAnnotation.text.ilike(f"%{word}%")
+def build_word_stats_query(word: str):
+    # Occurrences du mot dans un sous-titre (insensible à la casse, sans chevauchement comme str.count) :
+    # (longueur du texte - longueur du texte sans le mot) / longueur du mot
+    text_lower = func.lower(SubtitleAnnotation.text)
+    occurrences = (func.length(text_lower) - func.length(func.replace(text_lower, word.lower(), ""))) // len(word)
+    # Nombre d'annotations dans WordAnnotation contenant le mot (sous-requête évaluée une fois)
+    word_annotations = (
+        select(func.count(WordAnnotation.word_id))
+        .filter(contains_term(WordAnnotation.word, word))
+        .scalar_subquery()
     )
-    result_subs = await db_session.execute(query_subs)
-    subtitle_annotations = result_subs.scalars().all()
-    
-    total_occurrences = 0
-    phrases_count = 0
-    for ann in subtitle_annotations:
-        # Comptage insensible à la casse
-        count = ann.text.lower().count(word.lower())
-        if count > 0:
-            total_occurrences += count
-            phrases_count += 1
-
-    # Nombre d'annotations dans WordAnnotation contenant le mot (insensible à la casse)
-    query_word = select(func.count(WordAnnotation.word_id)).filter(
-        WordAnnotation.word.ilike(f"%{word}%")
+    return (
+        select(
+            func.coalesce(func.sum(occurrences), 0).label("total_occurrences_in_phrases"),
+            func.count().label("number_of_phrases"),
+            word_annotations.label("word_annotations_count"),
+        )
+        .select_from(SubtitleAnnotation)
+        .filter(contains_term(SubtitleAnnotation.text, word))
     )
-    result_word = await db_session.execute(query_word)
-    word_annotations_count = result_word.scalar()
-    
+
+async def get_word_stats(word: str, db_session: AsyncSession):
+    row = (await db_session.execute(build_word_stats_query(word))).one()
     return {
-        "total_occurrences_in_phrases": total_occurrences,
-        "number_of_phrases": phrases_count,
-        "word_annotations_count": word_annotations_count,
+        "total_occurrences_in_phrases": row.total_occurrences_in_phrases,
+        "number_of_phrases": row.number_of_phrases,
+        "word_annotations_count": row.word_annotations_count,
     }
 
 # --- Statistiques sur les phrases dans Cont ---
-async def get_phrase_stats(phrase: str, db_session: AsyncSession):
-    # Nombre d'occurrences de la phrase dans SubtitleAnnotation (insensible à la casse)
-    query_phrase = select(func.count(SubtitleAnnotation.sub_id)).filter(
-        SubtitleAnnotation.text.ilike(f"%{phrase}%")
-    )
-    result_phrase = await db_session.execute(query_phrase)
-    phrase_occurrences = result_phrase.scalar()
-    
-    # Nombre distinct de signataires ayant prononcé cette phrase
-    query_signers = (
-        select(func.count(distinct(ContInstance.signer_id))).
-        join(SubtitleAnnotation, SubtitleAnnotation.instance_id == ContInstance.id).
-        filter(SubtitleAnnotation.text.ilike(f"%{phrase}%"))
+def build_phrase_stats_query(phrase: str):
+    # Occurrences de la phrase dans SubtitleAnnotation et nombre distinct de signataires
+    # l'ayant prononcée (jointure externe : chaque sous-titre est compté même sans instance)
+    return (
+        select(
+            func.count(SubtitleAnnotation.sub_id).label("phrase_occurrences"),
+            func.count(distinct(ContInstance.signer_id)).label("distinct_signers"),
+        )
+        .select_from(SubtitleAnnotation)
+        .outerjoin(ContInstance, SubtitleAnnotation.instance_id == ContInstance.id)
+        .filter(contains_term(SubtitleAnnotation.text, phrase))
     )
-    result_signers = await db_session.execute(query_signers)
-    distinct_signers = result_signers.scalar()
 
+async def get_phrase_stats(phrase: str, db_session: AsyncSession):
+    row = (await db_session.execute(build_phrase_stats_query(phrase))).one()
     return {
-        "phrase_occurrences": phrase_occurrences,
-        "distinct_signers": distinct_signers,
+        "phrase_occurrences": row.phrase_occurrences,
+        "distinct_signers": row.distinct_signers,
     }
+
 # --- Statistiques particulières par signe dans Isolé ---
+def build_isol_sign_stats_query(sign_lower: str):
+    # Le prédicat lower(sign) = :sign est servi par l'index fonctionnel ix_instances_iso_sign_lower
+    duration = IsolInstance.end - IsolInstance.start
+    return (
+        select(
+            func.count().label("occurrences"),
+            func.avg(duration).label("average_duration"),
+            func.min(duration).label("min_duration"),
+            func.max(duration).label("max_duration"),
+            func.count(distinct(IsolInstance.signer)).label("distinct_signers"),
+        )
+        .where(func.lower(IsolInstance.sign) == sign_lower)
+    )
+
 async def get_isol_sign_statistics(sign: str, session: AsyncSession):
     # Conversion en minuscules pour une comparaison insensible à la casse
     sign_lower = sign.lower()
-    
-    # Nombre d'occurrences du signe (insensible à la casse)
-    count = await session.scalar(
-        select(func.count()).select_from(IsolInstance)
-        .where(func.lower(IsolInstance.sign) == sign_lower)
-    )
-    
-    # Durée moyenne du signe (calculée sur la différence entre end et start)
-    avg_duration = await session.scalar(
-        select(func.avg(IsolInstance.end - IsolInstance.start))
-        .where(func.lower(IsolInstance.sign) == sign_lower)
-    )
-    
-    # Nombre de signataires distincts ayant réalisé ce signe
-    distinct_signers_count = await session.scalar(
-        select(func.count(func.distinct(IsolInstance.signer)))
-        .where(func.lower(IsolInstance.sign) == sign_lower)
-    )
-    
-    # Récupérer les durées pour chaque occurrence
-    query = select(IsolInstance.start, IsolInstance.end).where(func.lower(IsolInstance.sign) == sign_lower)
-    results = await session.execute(query)
-    durations = [(row.end - row.start) for row in results]
-    
-    # S'il n'y a pas de durées, renvoyer des statistiques par défaut
-    if not durations:
+    row = (await session.execute(build_isol_sign_stats_query(sign_lower))).one()
+
+    # S'il n'y a aucune occurrence, renvoyer des statistiques par défaut
+    if not row.occurrences:
         return {
             "sign": sign,
             "occurrences": 0,
@@ -651,126 +854,180 @@ async def get_isol_sign_statistics(sign: str, session: AsyncSession):
             "min_duration": 0,
             "max_duration": 0,
             "distinct_signers": 0,
-            "graph": ""
+            "distribution": ""
         }
-    
-    # Calcul des durées minimale et maximale à partir de la liste obtenue
-    min_duration_value = min(durations)
-    max_duration_value = max(durations)
-    
-    # Génération d'un histogramme des durées
-    plt.figure(figsize=(8, 5))
-    plt.hist(durations, bins=10, alpha=0.7, color='blue', edgecolor='black')
-    plt.axvline(avg_duration, color='red', linestyle='dashed', linewidth=2,
-                label=f"Durée moyenne: {avg_duration:.2f} ms")
-    plt.xlabel("Durée (millisecondes)")
-    plt.ylabel("Nombre d'occurrences")
-    plt.title(f"Distribution des durées pour le signe '{sign}'")
-    plt.legend()
-    
-    # Sauvegarde de l'image dans un buffer en mémoire
-    img_buf = io.BytesIO()
-    plt.savefig(img_buf, format='png')
-    plt.close()  # Libère la mémoire en fermant la figure
-    img_buf.seek(0)
-    img_base64 = base64.b64encode(img_buf.getvalue()).decode('utf-8')
-    
+
     # Retourne un dictionnaire avec toutes les statistiques calculées
+    # (la distribution des durées est servie par sa propre URL et dessinée côté client)
     return {
         "sign": sign,
-        "occurrences": count,
-        "average_duration": avg_duration,
-        "min_duration": min_duration_value,
-        "max_duration": max_duration_value,
-        "distinct_signers": distinct_signers_count,
-        "graph": f"data:image/png;base64,{img_base64}"
+        "occurrences": row.occurrences,
+        "average_duration": float(row.average_duration),
+        "min_duration": row.min_duration,
+        "max_duration": row.max_duration,
+        "distinct_signers": row.distinct_signers,
+        "distribution": f"/stats/isol/sign_distribution?{urllib.parse.urlencode({'sign': sign, 'bins': HISTOGRAM_BINS})}"
     }
 
+# --- Histogramme des durées d'un signe (PNG, pour l'export ; la page utilise sign_distribution) ---
+HISTOGRAM_BINS = 10
+@router.get("/stats/isol/sign_histogram.png")
+async def get_isol_sign_histogram(
+    request: Request,
+    sign: str,
+    bins: int = Query(HISTOGRAM_BINS, ge=1, le=100),
+    session: AsyncSession = Depends(get_db_isol)
+):
+    sign_lower = sign.strip().lower()
+    # La version des données fait partie de la clé : une ingestion rend les PNG en cache obsolètes
+    version, _ = await dataset_versions.get(session, "isol")
+    cache_key = ("isol_sign_durations", sign_lower, bins, version)
+    png = chart_cache.get(cache_key)
+    if png is None:
+        # Classes comptées en SQL (même requête que /stats/isol/sign_distribution)
+        rows = (await session.execute(build_duration_distribution_query(sign_lower, bins))).all()
+        distribution = duration_distribution(sign_lower, rows, bins)
+        if not distribution["count"]:
+            raise HTTPException(status_code=404, detail=f"Aucune occurrence pour le signe '{sign}'")
+        # Rendu Matplotlib (API objet) dans le pool de threads : la boucle d'événements n'est pas bloquée
+        png = await render_chart(render_duration_histogram, sign_lower, distribution)
+        chart_cache.put(cache_key, png)
+
+    # Revalidation à chaque affichage (ETag du contenu) plutôt qu'une durée de cache fixe
+    etag = f'"{hashlib.sha1(png).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=png, media_type="image/png", headers=headers)
+
+# --- Distribution des durées d'un signe (données pour un rendu côté client) ---
+DURATION_PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+def build_duration_distribution_query(sign_lower: str, bins: int):
+    """
+    Une seule requête d'agrégat : résumé des durées (nombre, min, max, moyenne, percentiles)
+    et effectifs des classes width_bucket. Une ligne par classe non vide, le résumé est répété
+    sur chaque ligne (une seule ligne avec bucket NULL si le signe n'a aucune occurrence).
+    """
+    durations = (
+        select(cast(IsolInstance.end - IsolInstance.start, Float).label("duration"))
+        .where(func.lower(IsolInstance.sign) == sign_lower)
+        .cte("durations")
+    )
+    summary = select(
+        func.count().label("count"),
+        func.min(durations.c.duration).label("min"),
+        func.max(durations.c.duration).label("max"),
+        func.avg(durations.c.duration).label("mean"),
+        *[
+            func.percentile_cont(fraction).within_group(durations.c.duration).label(name)
+            for name, fraction in DURATION_PERCENTILES.items()
+        ],
+    ).cte("summary")
+    # width_bucket place la borne haute dans la classe bins + 1 : elle est ramenée dans la dernière.
+    # Toutes les durées égales (min = max) : une seule classe, width_bucket refusant des bornes égales.
+    bucket = case(
+        (summary.c.max > summary.c.min,
+         func.least(func.width_bucket(durations.c.duration, summary.c.min, summary.c.max, bins), bins)),
+        else_=1,
+    )
+    bucketed = select(bucket.label("bucket")).select_from(durations.join(summary, true())).subquery("bucketed")
+    histogram = (
+        select(bucketed.c.bucket, func.count().label("n"))
+        .group_by(bucketed.c.bucket)
+        .subquery("histogram")
+    )
+    return (
+        select(summary, histogram.c.bucket, histogram.c.n)
+        .select_from(summary.outerjoin(histogram, true()))
+        .order_by(histogram.c.bucket)
+    )
+
+def duration_distribution(sign: str, rows, bins: int) -> dict:
+    """Met en forme les lignes de build_duration_distribution_query (classes vides comprises)."""
+    rows = list(rows)
+    summary = rows[0] if rows else None
+    if summary is None or not summary.count:
+        return {"sign": sign, "count": 0, "min": None, "max": None, "mean": None,
+                **{name: None for name in DURATION_PERCENTILES}, "bins": []}
+
+    counts = {row.bucket: row.n for row in rows if row.bucket is not None}
+    low, high = summary.min, summary.max
+    n_bins = bins if high > low else 1
+    width = (high - low) / n_bins
+    return {
+        "sign": sign,
+        "count": summary.count,
+        "min": low,
+        "max": high,
+        "mean": float(summary.mean),
+        **{name: getattr(summary, name) for name in DURATION_PERCENTILES},
+        "bins": [
+            {"start": low + i * width, "end": low + (i + 1) * width if i < n_bins - 1 else high, "count": counts.get(i + 1, 0)}
+            for i in range(n_bins)
+        ],
+    }
+
+@router.get("/stats/isol/sign_distribution")
+async def get_isol_sign_distribution(
+    request: Request,
+    sign: str,
+    bins: int = Query(HISTOGRAM_BINS, ge=1, le=100),
+    session: AsyncSession = Depends(get_db_isol)
+):
+    async def build():
+        sign_lower = sign.strip().lower()
+        rows = (await session.execute(build_duration_distribution_query(sign_lower, bins))).all()
+        distribution = duration_distribution(sign_lower, rows, bins)
+        if not distribution["count"]:
+            raise HTTPException(status_code=404, detail=f"Aucune occurrence pour le signe '{sign}'")
+        return distribution
+
+    return await cached_json_response(request, {"isol": session}, build)
+
 
 # --- Statistiques générales ---
 # --- Statistiques générales sur les instances ---
+async def load_general_stats(session: AsyncSession, db_key: str, timings: QueryTimings):
+    # Métriques pré-calculées à l'ingestion (database/dataset_stats.py) : une lecture par base.
+    # Jamais calculées (base chargée avant leur introduction) : calcul à la volée, en une requête.
+    values, computed = await timings.measure(f"{db_key}-read", read_general_stats(session, db_key))
+    if not values:
+        values = await timings.measure(f"{db_key}-compute", compute_general_stats(session, db_key))
+    return values, computed
+
 @router.get("/stats/general")
 async def get_general_statistics(
+    request: Request,
     session_cont: AsyncSession = Depends(get_db_cont),
     session_isol: AsyncSession = Depends(get_db_isol)
 ):
-    # CONT
-    total_clips_cont = await session_cont.scalar(select(func.count()).select_from(ContInstance))
-    total_glosses_cont = await session_cont.scalar(select(func.count(distinct(WordAnnotation.word))))
-    total_signers_cont = await session_cont.scalar(select(func.count(distinct(ContInstance.signer_id))))
-
-    # Moyenne de la durée des clips CONT
-    avg_clip_duration_cont = await session_cont.scalar(select(func.avg(cast(WordAnnotation.end_time - WordAnnotation.start_time, Float))))
-
-    # Moyenne des clips par gloss CONT
-    subq_clips_per_gloss_cont = select(func.count(WordAnnotation.word_id).label("count")).group_by(WordAnnotation.word).subquery()
-    avg_clips_per_gloss_cont = await session_cont.scalar(select(func.avg(cast(subq_clips_per_gloss_cont.c.count, Float))))
-
-
-    # Moyenne de gloss par vidéo CONT
-    subq_glosses_per_video_cont = select(
-        ContVideo.instance_id,
-        func.count(WordAnnotation.word_id).label('count')
-    ).join(
-        ContInstance, ContInstance.id == ContVideo.instance_id
-    ).join(
-        WordAnnotation, WordAnnotation.instance_id == ContInstance.id
-    ).group_by(ContVideo.instance_id).subquery()
-    avg_glosses_per_video_cont = await session_cont.scalar(select(func.avg(cast(subq_glosses_per_video_cont.c.count, Float))))
-
-    # Statistiques ISOL
-    total_clips_isol = await session_isol.scalar(select(func.count()).select_from(IsolInstance))
-    total_glosses_isol = await session_isol.scalar(select(func.count(distinct(IsolInstance.sign))))
-    total_signers_isol = await session_isol.scalar(select(func.count(distinct(IsolInstance.signer))))
-
-    # Moyenne durée des clips ISOL
-    avg_clip_duration_isol = await session_isol.scalar(select(func.avg(cast(IsolInstance.end - IsolInstance.start, Float))))
-
-    # Moyenne des clips par gloss ISOL
-    subq_clips_per_gloss_isol = select(func.count(IsolInstance.id).label('count')).group_by(IsolInstance.sign).subquery()
-    avg_clips_per_gloss_isol = await session_isol.scalar(select(func.avg(cast(subq_clips_per_gloss_isol.c.count, Float))))
+    return await cached_json_response(
+        request, {"cont": session_cont, "isol": session_isol},
+        lambda: compute_general_statistics(session_cont, session_isol),
+    )
+
+async def compute_general_statistics(session_cont: AsyncSession, session_isol: AsyncSession):
+    # Les deux bases sont interrogées en parallèle, chacune sur sa session (et sa connexion) :
+    # la latence est celle de la base la plus lente, pas la somme des deux
+    timings = QueryTimings()
+    (values_cont, computed_cont), (values_isol, computed_isol) = await asyncio.gather(
+        load_general_stats(session_cont, "cont", timings),
+        load_general_stats(session_isol, "isol", timings),
+    )
+    stats = {**values_cont, **values_isol}
+    computed_at = {"cont": computed_cont, "isol": computed_isol}
+
+    # Les totaux sont des entiers, les moyennes sont arrondies vers le bas (floor) si elles ne sont pas None
+    for name, value in stats.items():
+        if value is not None:
+            stats[name] = int(value) if name.startswith("total_") else math.floor(value)
 
     # Moyenne des gloss par vidéo ISOL (toujours 1 gloss par vidéo dans isol)
-    avg_glosses_per_video_isol = 1
-
-    # Moyenne de phrases par vidéo CONT
-    subq_phrases_per_video_cont = select(ContVideo.instance_id,func.count(SubtitleAnnotation.sub_id).label('count')).join(ContInstance, ContInstance.id == ContVideo.instance_id
-    ).join(SubtitleAnnotation, SubtitleAnnotation.instance_id == ContInstance.id).group_by(ContVideo.instance_id).subquery()
-
-    avg_phrases_per_video_cont = await session_cont.scalar(select(func.avg(cast(subq_phrases_per_video_cont.c.count, Float))))
-
-    # --- Arrondir les moyennes vers le bas (floor) si elles ne sont pas None ---
-    if avg_clip_duration_cont is not None:
-        avg_clip_duration_cont = math.floor(avg_clip_duration_cont)
-    if avg_clip_duration_isol is not None:
-        avg_clip_duration_isol = math.floor(avg_clip_duration_isol)
-    if avg_clips_per_gloss_cont is not None:
-        avg_clips_per_gloss_cont = math.floor(avg_clips_per_gloss_cont)
-    if avg_clips_per_gloss_isol is not None:
-        avg_clips_per_gloss_isol = math.floor(avg_clips_per_gloss_isol)
-    if avg_glosses_per_video_cont is not None:
-        avg_glosses_per_video_cont = math.floor(avg_glosses_per_video_cont)
-    # Pour ISOL, on laisse "1" en dur, donc pas besoin de floor
-    if avg_phrases_per_video_cont is not None:
-        avg_phrases_per_video_cont = math.floor(avg_phrases_per_video_cont)
-
-
-    # Retour des résultats
-    return {
-        "total_clips_cont": total_clips_cont,
-        "total_clips_isol": total_clips_isol,
-        "total_glosses_cont": total_glosses_cont,
-        "total_glosses_isol": total_glosses_isol,
-        "total_signers_cont": total_signers_cont,
-        "total_signers_isol": total_signers_isol,
-        "avg_clip_duration_cont": avg_clip_duration_cont,
-        "avg_clip_duration_isol": avg_clip_duration_isol,
-        "avg_clips_per_gloss_cont": avg_clips_per_gloss_cont,
-        "avg_clips_per_gloss_isol": avg_clips_per_gloss_isol,
-        "avg_glosses_per_video_cont": avg_glosses_per_video_cont,
-        "avg_glosses_per_video_isol": avg_glosses_per_video_isol,
-        "avg_phrases_per_video_cont": avg_phrases_per_video_cont
-    }
+    stats["avg_glosses_per_video_isol"] = 1
+    # Date du dernier calcul de chaque base (None : calculées pour cette requête)
+    stats["computed_at"] = {db_key: computed.isoformat() if computed else None for db_key, computed in computed_at.items()}
+    return JSONResponse(content=stats, headers={"Server-Timing": timings.header()})
 
 # --- Statistiques sur les vidéos ---
 @router.get("/stats/videos/info")
@@ -805,49 +1062,57 @@ async def get_videos_info(session: AsyncSession = Depends(get_db_cont)):
 
 # --- Statistiques sur les poses et mouvements ---
 @router.get("/stats/poses/distribution")
-async def get_pose_distribution(session: AsyncSession = Depends(get_db_cont)):
-    query = select(
-        ContPose.pose_part, func.count(ContPose.pose_id).label("count")).group_by(ContPose.pose_part)
+async def get_pose_distribution(request: Request, session: AsyncSession = Depends(get_db_cont)):
+    async def build():
+        query = select(
+            ContPose.pose_part, func.count(ContPose.pose_id).label("count")).group_by(ContPose.pose_part)
 
-    results = await session.execute(query)
-    # Retourne la distribution des poses par partie du corps
-    return {part: count for part, count in results.all()}
+        results = await session.execute(query)
+        # Retourne la distribution des poses par partie du corps
+        return {part: count for part, count in results.all()}
+    return await cached_json_response(request, {"cont": session}, build)
 
 
 # --- Statistiques sur les signers ---
 @router.get("/stats/signers/variability")
-async def get_signer_variability(session: AsyncSession = Depends(get_db_cont)):
-    query = select(
-        ContInstance.signer_id,func.count(distinct(WordAnnotation.word)).label("unique_glosses")
-    ).join(WordAnnotation, ContInstance.id == WordAnnotation.instance_id).group_by(ContInstance.signer_id)
-
-    results = await session.execute(query)
-    # Variabilité des signers : nombre de gloss uniques signés par chaque signer
-    # => Convertissons signer_id en chaîne pour être cohérent dans le JSON
-    return {str(signer_id): gloss_count for signer_id, gloss_count in results.all()}
+async def get_signer_variability(request: Request, session: AsyncSession = Depends(get_db_cont)):
+    async def build():
+        query = select(
+            ContInstance.signer_id,func.count(distinct(WordAnnotation.word)).label("unique_glosses")
+        ).join(WordAnnotation, ContInstance.id == WordAnnotation.instance_id).group_by(ContInstance.signer_id)
+
+        results = await session.execute(query)
+        # Variabilité des signers : nombre de gloss uniques signés par chaque signer
+        # => Convertissons signer_id en chaîne pour être cohérent dans le JSON
+        return {str(signer_id): gloss_count for signer_id, gloss_count in results.all()}
+    return await cached_json_response(request, {"cont": session}, build)
 
 from fastapi import Query
 
 # --- Visualisations des glosses les plus fréquents ---
 @router.get("/stats/visualizations/histogram")
 async def get_gloss_histogram(
+    request: Request,
     top: int = Query(10, le=20, ge=5),  # Valeur par défaut 10, minimum 5, maximum 20
     session: AsyncSession = Depends(get_db_cont)
 ):
-    query = (
-        select(WordAnnotation.word, func.count(WordAnnotation.word_id).label("count"))
-        .group_by(WordAnnotation.word)
-        .order_by(func.count(WordAnnotation.word_id).desc())
-        .limit(top)
-    )
+    async def build():
+        query = (
+            select(WordAnnotation.word, func.count(WordAnnotation.word_id).label("count"))
+            .group_by(WordAnnotation.word)
+            .order_by(func.count(WordAnnotation.word_id).desc())
+            .limit(top)
+        )
 
-    results = await session.execute(query)
-    return {word: count for word, count in results.all()}
+        results = await session.execute(query)
+        return {word: count for word, count in results.all()}
+    return await cached_json_response(request, {"cont": session}, build)
 
 
 # --- Visualisations des sous-titres(expressions) les plus fréquents ---
 @router.get("/stats/visualizations/top_subtitles")
 async def get_top_subtitles(
+    request: Request,
     top: int = Query(10, le=20, ge=5),
     session: AsyncSession = Depends(get_db_cont)
 ):
@@ -856,25 +1121,29 @@ async def get_top_subtitles(
     sous la forme { "Sous-titre 1": 12, "Sous-titre 2": 9, ... }.
     L'utilisateur peut spécifier le nombre de résultats via le paramètre 'top' (entre 1 et 20).
     """
-    query = (
-        select(SubtitleAnnotation.text, func.count(SubtitleAnnotation.sub_id).label("count"))
-        .group_by(SubtitleAnnotation.text)
-        .order_by(func.count(SubtitleAnnotation.sub_id).desc())
-        .limit(top)
-    )
-    results = await session.execute(query)
-    return {text: count for text, count in results.all()}
+    async def build():
+        query = (
+            select(SubtitleAnnotation.text, func.count(SubtitleAnnotation.sub_id).label("count"))
+            .group_by(SubtitleAnnotation.text)
+            .order_by(func.count(SubtitleAnnotation.sub_id).desc())
+            .limit(top)
+        )
+        results = await session.execute(query)
+        return {text: count for text, count in results.all()}
+    return await cached_json_response(request, {"cont": session}, build)
 
 
 
 # --- Statistiques sur les glosses ---
 @router.get("/stats/glosses/frequency")
-async def get_gloss_frequency(session: AsyncSession = Depends(get_db_cont)):
-    # Compte les occurrences de chaque gloss dans les annotations
-    query = select(WordAnnotation.word,func.count(WordAnnotation.word_id).label("frequency")).group_by(WordAnnotation.word).order_by(func.count(WordAnnotation.word_id).desc())
-    results = await session.execute(query)
-    # Retourne un dictionnaire {gloss: fréquence}
-    return {word: freq for word, freq in results.all()}
+async def get_gloss_frequency(request: Request, session: AsyncSession = Depends(get_db_cont)):
+    async def build():
+        # Compte les occurrences de chaque gloss dans les annotations
+        query = select(WordAnnotation.word,func.count(WordAnnotation.word_id).label("frequency")).group_by(WordAnnotation.word).order_by(func.count(WordAnnotation.word_id).desc())
+        results = await session.execute(query)
+        # Retourne un dictionnaire {gloss: fréquence}
+        return {word: freq for word, freq in results.all()}
+    return await cached_json_response(request, {"cont": session}, build)
 
 # --- Statistiques sur les phrases (analyse de cooccurrence) ---
 """from collections import Counter
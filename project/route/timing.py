@@ -0,0 +1,25 @@
+import time
+
+# --------------------------------------------------------------------
+"""Mesure de la durée des requêtes d'un endpoint (en-tête Server-Timing)"""
+# --------------------------------------------------------------------
+# Les durées sont visibles dans l'onglet réseau du navigateur (Timing) :
+#   Server-Timing: cont-read;dur=3.1, isol-read;dur=4.7, total;dur=4.9
+
+class QueryTimings:
+    """Durées (ms) des requêtes d'un endpoint, indexées par nom, dans l'ordre de fin."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}
+
+    async def measure(self, name: str, awaitable):
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.durations[name] = (time.perf_counter() - started) * 1000
+
+    def header(self) -> str:
+        durations = {**self.durations, "total": (time.perf_counter() - self.started) * 1000}
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in durations.items())
@@ -1,4 +1,6 @@
-from sqlalchemy import String, Integer, ForeignKey, Text, Enum
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from database.db_init import BaseCont  # Import spécifique pour 'cont'
 
@@ -45,6 +47,12 @@ class ContVideo(BaseCont):  # Table pour stocker les vidéos
     video_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)  # ID unique de la vidéo
     instance_id: Mapped[str] = mapped_column(String, ForeignKey("instances_cont.id"))  # ID de la vidéo liée
     path: Mapped[str] = mapped_column(String, nullable=False)
+    # Métadonnées techniques sondées une seule fois à l'ingestion (None si inconnues)
+    duration_s: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    width: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    height: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    codec: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
     # Relation one-to-one avec ContInstance (chaque vidéo est associée à une seule instance)
     instance_cont: Mapped["ContInstance"] = relationship("ContInstance", back_populates="video", uselist=False, lazy="joined")
@@ -53,11 +61,20 @@ class ContVideo(BaseCont):  # Table pour stocker les vidéos
         return {
             "video_id": self.video_id,
             "instance_id": self.instance_id,
-            "path": self.path
+            "path": self.path,
+            "duration_s": self.duration_s,
+            "fps": self.fps,
+            "width": self.width,
+            "height": self.height,
+            "codec": self.codec
         }
 
 class WordAnnotation(BaseCont):  # Table pour stocker les annotations de mots
     __tablename__ = "words"
+    __table_args__ = (
+        # Index trigram (pg_trgm) pour les recherches ILIKE '%terme%' sur les glosses
+        Index("ix_words_word_trgm", "word", postgresql_using="gin", postgresql_ops={"word": "gin_trgm_ops"}),
+    )
 
     word_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     instance_id: Mapped[str] = mapped_column(String, ForeignKey('instances_cont.id'), nullable=False)
@@ -83,6 +100,10 @@ class WordAnnotation(BaseCont):  # Table pour stocker les annotations de mots
 
 class SubtitleAnnotation(BaseCont):  # Table pour stocker les annotations de sous-titres
     __tablename__ = "subtitles"
+    __table_args__ = (
+        # Index trigram (pg_trgm) pour les recherches ILIKE '%phrase%' sur les sous-titres
+        Index("ix_subtitles_text_trgm", "text", postgresql_using="gin", postgresql_ops={"text": "gin_trgm_ops"}),
+    )
 
     sub_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     instance_id: Mapped[str] = mapped_column(String, ForeignKey('instances_cont.id'), nullable=False)
@@ -120,3 +141,60 @@ class ContPose(BaseCont):  # Table pour stocker les poses
             "pose_part": self.pose_part,
             "pose_path": self.pose_path
         }
+
+class ContIngestFingerprint(BaseCont):  # Table des empreintes de l'ingestion incrémentale
+    __tablename__ = 'ingest_fingerprints'
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)  # Fichier ou dossier source (chemin relatif au dataset)
+    key: Mapped[str] = mapped_column(String, primary_key=True)  # Instance ou fichier concerné ("" pour le fichier source entier)
+    fingerprint: Mapped[str] = mapped_column(String, nullable=False)  # Taille:mtime d'un fichier ou hash du contenu d'une instance
+
+    def as_dict(self):
+        return {
+            "source": self.source,
+            "key": self.key,
+            "fingerprint": self.fingerprint
+        }
+
+class ContPoseArchive(BaseCont):  # Position des poses d'une instance dans l'archive consolidée
+    __tablename__ = 'pose_archives_cont'
+
+    instance_id: Mapped[str] = mapped_column(String, ForeignKey('instances_cont.id'), primary_key=True)
+    shard_path: Mapped[str] = mapped_column(String, nullable=False)  # Fichier .npy de l'archive contenant l'instance
+    frame_offset: Mapped[int] = mapped_column(Integer, nullable=False)  # Première frame de l'instance dans ce fichier
+    n_frames: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def as_dict(self):
+        return {
+            "instance_id": self.instance_id,
+            "shard_path": self.shard_path,
+            "frame_offset": self.frame_offset,
+            "n_frames": self.n_frames
+        }
+
+class ContDatasetStat(BaseCont):  # Statistiques générales pré-calculées (rafraîchies après chaque ingestion)
+    __tablename__ = 'dataset_stats'
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)  # Nom de la métrique (clé de /stats/general)
+    value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # None si la table source est vide
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "value": self.value,
+            "computed_at": self.computed_at.isoformat()
+        }
+
+class ContDatasetVersion(BaseCont):  # Version des données, incrémentée par chaque ingestion (invalidation des caches)
+    __tablename__ = 'dataset_version'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # Ligne unique (id = 1)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def as_dict(self):
+        return {
+            "version": self.version,
+            "updated_at": self.updated_at.isoformat()
+        }
@@ -1,4 +1,6 @@
-from sqlalchemy import String, Integer, ForeignKey
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from database.db_init import BaseIsol  # Import spécifique pour 'isol'
 
@@ -27,12 +29,21 @@ class IsolInstance(BaseIsol):  # Table des instances isol
             "video": self.video.as_dict() if self.video else None
         }
 
+# Index fonctionnel pour les statistiques par signe (prédicat lower(sign) = :sign)
+Index("ix_instances_iso_sign_lower", func.lower(IsolInstance.sign))
+
 class IsolVideo(BaseIsol):  # Table des vidéos isol
     __tablename__ = "videos_iso"
     
     video_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     instance_id: Mapped[str] = mapped_column(String, ForeignKey("instances_iso.id"))
     path: Mapped[str] = mapped_column(String, nullable=False)
+    # Métadonnées techniques sondées une seule fois à l'ingestion (None si inconnues)
+    duration_s: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    width: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    height: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    codec: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
     # Relation one-to-one avec IsolInstance
     instance_iso: Mapped["IsolInstance"] = relationship("IsolInstance", back_populates="video", uselist=False)
@@ -42,7 +53,12 @@ class IsolVideo(BaseIsol):  # Table des vidéos isol
             "video_id": self.video_id,
             "instance_id": self.instance_id,
             "duration": int(self.instance_iso.end - self.instance_iso.start) if self.instance_iso else None,
-            "path": self.path
+            "path": self.path,
+            "duration_s": self.duration_s,
+            "fps": self.fps,
+            "width": self.width,
+            "height": self.height,
+            "codec": self.codec
         }
 
 class IsolPose(BaseIsol):  # Table des poses isol
@@ -63,3 +79,60 @@ class IsolPose(BaseIsol):  # Table des poses isol
             "pose_part": self.pose_part,
             "pose_path": self.pose_path
         }
+
+class IsolIngestFingerprint(BaseIsol):  # Table des empreintes de l'ingestion incrémentale
+    __tablename__ = "ingest_fingerprints"
+    
+    source: Mapped[str] = mapped_column(String, primary_key=True)  # Fichier ou dossier source (chemin relatif au dataset)
+    key: Mapped[str] = mapped_column(String, primary_key=True)  # Instance ou fichier concerné ("" pour le fichier source entier)
+    fingerprint: Mapped[str] = mapped_column(String, nullable=False)  # Taille:mtime d'un fichier ou hash du contenu d'une instance
+    
+    def as_dict(self):
+        return {
+            "source": self.source,
+            "key": self.key,
+            "fingerprint": self.fingerprint
+        }
+
+class IsolPoseArchive(BaseIsol):  # Position des poses d'une instance dans l'archive consolidée
+    __tablename__ = "pose_archives_iso"
+    
+    instance_id: Mapped[str] = mapped_column(String, ForeignKey("instances_iso.id"), primary_key=True)
+    shard_path: Mapped[str] = mapped_column(String, nullable=False)  # Fichier .npy de l'archive contenant l'instance
+    frame_offset: Mapped[int] = mapped_column(Integer, nullable=False)  # Première frame de l'instance dans ce fichier
+    n_frames: Mapped[int] = mapped_column(Integer, nullable=False)
+    
+    def as_dict(self):
+        return {
+            "instance_id": self.instance_id,
+            "shard_path": self.shard_path,
+            "frame_offset": self.frame_offset,
+            "n_frames": self.n_frames
+        }
+
+class IsolDatasetStat(BaseIsol):  # Statistiques générales pré-calculées (rafraîchies après chaque ingestion)
+    __tablename__ = 'dataset_stats'
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)  # Nom de la métrique (clé de /stats/general)
+    value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # None si la table source est vide
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "value": self.value,
+            "computed_at": self.computed_at.isoformat()
+        }
+
+class IsolDatasetVersion(BaseIsol):  # Version des données, incrémentée par chaque ingestion (invalidation des caches)
+    __tablename__ = 'dataset_version'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # Ligne unique (id = 1)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def as_dict(self):
+        return {
+            "version": self.version,
+            "updated_at": self.updated_at.isoformat()
+        }
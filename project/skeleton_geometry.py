@@ -0,0 +1,46 @@
+from functools import lru_cache
+import numpy as np
+
+# --------------------------------------------------------------------
+"""Géométrie du squelette : lignes de toutes les liaisons d'une partie du corps en un seul tracé"""
+# --------------------------------------------------------------------
+# Les liaisons (i, j) sont converties en tableaux d'indices ; les coordonnées des deux
+# extrémités sont extraites en une opération (indexation NumPy) et séparées par NaN :
+#   x = [x_i1, x_j1, nan, x_i2, x_j2, nan, ...]
+# Plotly et Matplotlib interrompent la ligne sur NaN : une seule trace (ou un seul
+# appel à plot) suffit pour toutes les liaisons d'une partie du corps.
+
+# Connexions (MediaPipe)
+POSE_CONNECTIONS = (
+    (11, 12), (11, 13), (13, 15),
+    (12, 14), (14, 16), (11, 23),
+    (12, 24), (23, 24)
+)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (0, 9), (9, 10), (10, 11), (11, 12),
+    (0, 13), (13, 14), (14, 15), (15, 16),
+    (0, 17), (17, 18), (18, 19), (19, 20)
+)
+
+@lru_cache(maxsize=None)
+def connection_indices(connections: tuple, n_joints: int):
+    """Tableaux d'indices (début, fin) des liaisons valides pour `n_joints` articulations."""
+    valid = [(i, j) for i, j in connections if i < n_joints and j < n_joints]
+    start = np.array([i for i, _ in valid], dtype=np.intp)
+    end = np.array([j for _, j in valid], dtype=np.intp)
+    return start, end
+
+def line_segments(points: np.ndarray, connections) -> tuple:
+    """
+    Retourne (x, y) des liaisons séparées par NaN.
+    `points` : (joints, dims) pour une frame, ou (frames, joints, dims) pour une séquence :
+    le résultat a alors la forme (frames, 3 x nombre de liaisons).
+    """
+    start, end = connection_indices(tuple(connections), points.shape[-2])
+    segments = np.full(points.shape[:-2] + (len(start), 3, 2), np.nan, dtype=np.float32)
+    segments[..., 0, :] = points[..., start, :2]
+    segments[..., 1, :] = points[..., end, :2]
+    segments = segments.reshape(points.shape[:-2] + (-1, 2))
+    return segments[..., 0], segments[..., 1]
@@ -0,0 +1,81 @@
+import os
+import hashlib
+from pathlib import Path
+import numpy as np
+from matplotlib import image as mpimg
+from matplotlib import style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from Utilitaires.skeleton_viewer import BODY_PARTS, STYLE, BACKGROUND, SkeletonRenderer
+
+# --------------------------------------------------------------------
+"""Aperçus pré-calculés du squelette (planche d'images animable + vignette)"""
+# --------------------------------------------------------------------
+# Chaque instance est rendue une seule fois (database/render_previews.py) dans un cache
+# adressé par contenu : le nom des fichiers est le hash des empreintes (taille:mtime) des
+# quatre fichiers de poses et de la version du rendu. Des poses modifiées donnent un
+# nouveau hash et l'ancien aperçu n'est plus servi.
+#   <cache>/<2 premiers caractères>/<hash>.sprite.png : SPRITE_FRAMES frames côte à côte
+#   <cache>/<2 premiers caractères>/<hash>.poster.png : frame du milieu, en plus grand
+
+PREVIEW_CACHE_DIR = Path(os.getenv("PREVIEW_CACHE_DIR", Path(__file__).resolve().parent / "cache" / "previews"))
+PREVIEW_VERSION = 1       # À incrémenter quand le rendu change
+PREVIEW_KINDS = ("sprite", "poster")
+SPRITE_FRAMES = 24        # Frames échantillonnées sur toute la séquence
+CELL_SIZE = (1.6, 1.2)    # Taille d'une frame de la planche (pouces, à 100 dpi : 160 x 120 px)
+POSTER_DPI = 200          # Vignette en 320 x 240 px
+
+def preview_digest(paths_by_part: dict) -> str:
+    """Hash des empreintes des fichiers de poses d'une instance (une partie manquante lève FileNotFoundError)."""
+    fingerprints = [f"v{PREVIEW_VERSION}"]
+    for part in BODY_PARTS:
+        stat = os.stat(paths_by_part[part])
+        fingerprints.append(f"{part}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1("|".join(fingerprints).encode("utf-8")).hexdigest()
+
+def preview_path(digest: str, kind: str, cache_dir=None) -> Path:
+    return Path(cache_dir or PREVIEW_CACHE_DIR) / digest[:2] / f"{digest}.{kind}.png"
+
+def preview_exists(digest: str, cache_dir=None) -> bool:
+    return all(preview_path(digest, kind, cache_dir).is_file() for kind in PREVIEW_KINDS)
+
+def _save_png(path: Path, pixels: np.ndarray = None, fig: Figure = None, dpi: int = None):
+    """Écrit dans un fichier temporaire puis le renomme : un aperçu n'est jamais servi à moitié écrit."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    if fig is not None:
+        fig.savefig(tmp_path, format="png", dpi=dpi, facecolor=fig.get_facecolor())
+    else:
+        mpimg.imsave(tmp_path, pixels, format="png")
+    os.replace(tmp_path, path)
+
+def render_preview(paths_by_part: dict, cache_dir=None) -> str:
+    """Rend la planche d'images et la vignette d'une instance (sans affichage) et retourne leur hash."""
+    digest = preview_digest(paths_by_part)
+    poses = {part: np.load(paths_by_part[part], mmap_mode="r") for part in BODY_PARTS}
+
+    with style.context(STYLE):
+        fig = Figure(figsize=CELL_SIZE, dpi=100)
+        canvas = FigureCanvasAgg(fig)
+        fig.patch.set_facecolor(BACKGROUND)
+        fig.subplots_adjust(left=0, right=1, bottom=0, top=1)
+        ax = fig.add_subplot()
+        renderer = SkeletonRenderer(ax, poses)
+        # Aperçu sans légende, axes ni numéro de frame
+        ax.get_legend().remove()
+        ax.set_axis_off()
+        renderer.frame_text.set_visible(False)
+
+        # Planche : les frames échantillonnées sont dessinées une à une puis collées côte à côte
+        # (toujours SPRITE_FRAMES cases, une séquence courte répète certaines frames)
+        frames = np.linspace(0, renderer.num_frames - 1, SPRITE_FRAMES).astype(int)
+        cells = []
+        for frame in frames:
+            renderer.update(frame)
+            canvas.draw()
+            cells.append(np.asarray(canvas.buffer_rgba()).copy())
+        _save_png(preview_path(digest, "sprite", cache_dir), pixels=np.concatenate(cells, axis=1))
+
+        renderer.update(renderer.num_frames // 2)
+        _save_png(preview_path(digest, "poster", cache_dir), fig=fig, dpi=POSTER_DPI)
+    return digest
@@ -0,0 +1,63 @@
+// =======================
+//  LECTURE DU FLUX BINAIRE DES POSES (/cont_pose_data, /isol_pose_data)
+// =======================
+// Format décrit dans route/pose_stream.py : en-tête little-endian, table des parties,
+// puis n_frames x n_joints x n_dims valeurs float16 ou float32.
+
+const POSE_HEADER_SIZE = 20;
+const POSE_PART_ENTRY_SIZE = 24;
+
+/**
+ * Conversion d'un float16 (entier 16 bits) en nombre JavaScript
+ */
+function halfToFloat(h) {
+    const sign = h & 0x8000 ? -1 : 1;
+    const exponent = (h >> 10) & 0x1f;
+    const fraction = h & 0x03ff;
+    if (exponent === 0) return sign * Math.pow(2, -14) * (fraction / 1024);
+    if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+    return sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+}
+
+/**
+ * Décode un flux complet et retourne {parts, nFrames, nJoints, nDims, frames (Float32Array)}
+ */
+function decodePoseData(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== "LSFB") throw new Error("Flux de poses invalide");
+
+    const dtype = view.getUint8(5);          // 1 = float16, 2 = float32
+    const nParts = view.getUint16(6, true);
+    const nFrames = view.getUint32(8, true);
+    const nJoints = view.getUint32(12, true);
+    const nDims = view.getUint32(16, true);
+
+    const parts = {};
+    let offset = POSE_HEADER_SIZE;
+    for (let i = 0; i < nParts; i++) {
+        const name = String.fromCharCode(...new Uint8Array(buffer, offset, 16)).replace(/\0+$/, "");
+        parts[name] = { first: view.getUint32(offset + 16, true), count: view.getUint32(offset + 20, true) };
+        offset += POSE_PART_ENTRY_SIZE;
+    }
+
+    const nValues = nFrames * nJoints * nDims;
+    const frames = new Float32Array(nValues);
+    if (dtype === 2) {
+        for (let i = 0; i < nValues; i++) frames[i] = view.getFloat32(offset + 4 * i, true);
+    } else {
+        for (let i = 0; i < nValues; i++) frames[i] = halfToFloat(view.getUint16(offset + 2 * i, true));
+    }
+    return { parts, nFrames, nJoints, nDims, frames };
+}
+
+/**
+ * Récupère et décode les poses d'une instance en une seule requête
+ * ex. fetchPoseData("/isol_pose_data/CLSFBI0103A_S001_B_251203_251361", {parts: "pose,left_hand,right_hand"})
+ */
+async function fetchPoseData(url, params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const response = await fetch(query ? `${url}?${query}` : url);
+    if (!response.ok) throw new Error(`Erreur ${response.status} lors du chargement des poses`);
+    return decodePoseData(await response.arrayBuffer());
+}
@@ -0,0 +1,66 @@
+// =======================
+//  SQUELETTE 2D SYNCHRONISÉ AVEC LA VIDÉO
+// =======================
+// Les poses de l'instance sont chargées en une requête (flux binaire, static/js/pose_data.js)
+// puis dessinées sur un canvas : la frame affichée suit la position de lecture de la vidéo
+// (currentTime x fps). Quand la vidéo lit un extrait (data-offset-ms), le décalage est ajouté.
+
+const POSE_VIEWER_COLORS = { pose: "green", left_hand: "red", right_hand: "blue" };
+
+/**
+ * Bornes X / Y de toutes les frames (valeurs NaN ignorées)
+ */
+function poseBounds(data) {
+    let xMin = Infinity, yMin = Infinity, xMax = -Infinity, yMax = -Infinity;
+    for (let i = 0; i < data.frames.length; i += data.nDims) {
+        const x = data.frames[i], y = data.frames[i + 1];
+        if (Number.isNaN(x) || Number.isNaN(y)) continue;
+        xMin = Math.min(xMin, x); xMax = Math.max(xMax, x);
+        yMin = Math.min(yMin, y); yMax = Math.max(yMax, y);
+    }
+    return { xMin, yMin, xMax, yMax };
+}
+
+/**
+ * Affiche le squelette de l'instance dans `container`, synchronisé avec `video`
+ * ex. startPoseViewer({video, container, url: "/cont_pose_data/CLSFBI0103A_S001_B", fps: 50})
+ */
+async function startPoseViewer({ video, container, url, fps }) {
+    const data = await fetchPoseData(url, { parts: Object.keys(POSE_VIEWER_COLORS).join(",") });
+    if (!data.nFrames) return;
+
+    const canvas = document.createElement("canvas");
+    canvas.width = container.clientWidth;
+    canvas.height = container.clientHeight;
+    container.appendChild(canvas);
+    const context = canvas.getContext("2d");
+
+    // Repère orthonormé ajusté une fois à toute la séquence (axe Y vers le bas, comme l'image)
+    const { xMin, yMin, xMax, yMax } = poseBounds(data);
+    const margin = 10;
+    const scale = Math.min((canvas.width - 2 * margin) / (xMax - xMin || 1), (canvas.height - 2 * margin) / (yMax - yMin || 1));
+    const toCanvas = (x, y) => [margin + (x - xMin) * scale, margin + (y - yMin) * scale];
+
+    let drawnFrame = -1;
+    function draw() {
+        const offset = (Number(video.dataset.offsetMs) || 0) / 1000;
+        const frame = Math.min(Math.max(Math.floor((video.currentTime + offset) * fps), 0), data.nFrames - 1);
+        if (frame !== drawnFrame) {
+            drawnFrame = frame;
+            context.clearRect(0, 0, canvas.width, canvas.height);
+            for (const [part, color] of Object.entries(POSE_VIEWER_COLORS)) {
+                const entry = data.parts[part];
+                if (!entry) continue;
+                context.fillStyle = color;
+                for (let joint = entry.first; joint < entry.first + entry.count; joint++) {
+                    const index = (frame * data.nJoints + joint) * data.nDims;
+                    const [x, y] = toCanvas(data.frames[index], data.frames[index + 1]);
+                    if (Number.isNaN(x) || Number.isNaN(y)) continue;
+                    context.fillRect(x - 2, y - 2, 4, 4);
+                }
+            }
+        }
+        requestAnimationFrame(draw);
+    }
+    requestAnimationFrame(draw);
+}
@@ -0,0 +1,82 @@
+// =============================================================
+// DISTRIBUTION DES DURÉES D'UN SIGNE (ISOL)
+// Histogramme et percentiles rendus côté client à partir de /stats/isol/sign_distribution
+// =============================================================
+
+document.addEventListener('DOMContentLoaded', () => {
+  const container = document.getElementById('sign-distribution');
+  if (!container) return;
+
+  const canvas = document.getElementById('sign-distribution-chart');
+  const summary = document.getElementById('sign-distribution-summary');
+
+  /**
+   * Formate une durée en millisecondes (arrondie à l'unité)
+   * @param {number} value - Durée en millisecondes
+   * @returns {string}
+   */
+  function formatMs(value) {
+    return `${Math.round(value)} ms`;
+  }
+
+  /**
+   * Affiche les percentiles sous l'histogramme
+   * @param {Object} distribution - Réponse de l'API
+   */
+  function renderSummary(distribution) {
+    summary.innerHTML = ['p50', 'p90', 'p99']
+      .map(name => `<span><strong>${name} :</strong> ${formatMs(distribution[name])}</span>`)
+      .join('');
+  }
+
+  /**
+   * Dessine l'histogramme des durées (Chart.js)
+   * @param {Object} distribution - Réponse de l'API
+   */
+  function renderChart(distribution) {
+    const labels = distribution.bins.map(bin => `${Math.round(bin.start)}–${Math.round(bin.end)}`);
+    new Chart(canvas, {
+      type: 'bar',
+      data: {
+        labels,
+        datasets: [{
+          label: "Nombre d'occurrences",
+          data: distribution.bins.map(bin => bin.count),
+          backgroundColor: 'rgba(85, 171, 38, 0.7)',
+          borderColor: 'rgb(85, 171, 38)',
+          borderWidth: 1,
+          barPercentage: 1,
+          categoryPercentage: 1,
+        }],
+      },
+      options: {
+        responsive: true,
+        plugins: {
+          title: {
+            display: true,
+            text: `Distribution des durées pour le signe '${distribution.sign}' (moyenne : ${formatMs(distribution.mean)})`,
+          },
+          legend: { display: false },
+        },
+        scales: {
+          x: { title: { display: true, text: 'Durée (millisecondes)' } },
+          y: { beginAtZero: true, ticks: { precision: 0 }, title: { display: true, text: "Nombre d'occurrences" } },
+        },
+      },
+    });
+  }
+
+  fetch(container.dataset.url)
+    .then(response => {
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      return response.json();
+    })
+    .then(distribution => {
+      renderChart(distribution);
+      renderSummary(distribution);
+    })
+    .catch(error => {
+      console.error('Erreur lors du chargement de la distribution des durées :', error);
+      container.innerHTML = '<p class="text-red-500">Distribution des durées indisponible.</p>';
+    });
+});
@@ -63,6 +63,12 @@ document.addEventListener('DOMContentLoaded', () => {
       document.getElementById('avg_glosses_per_video_cont').textContent = data.avg_glosses_per_video_cont ?? 'N/A';
       document.getElementById('avg_glosses_per_video_isol').textContent = data.avg_glosses_per_video_isol ?? 'N/A';
       document.getElementById('avg_phrases_per_video_cont').textContent = data.avg_phrases_per_video_cont ?? 'N/A';
+
+      // Date du dernier calcul de chaque base (null : calculées à la volée)
+      const computedAt = data.computed_at ?? {};
+      const formatDate = value => value ? new Date(value).toLocaleString('fr-BE') : 'à la volée';
+      document.getElementById('stats_computed_at').textContent =
+        `Dernier calcul — CONT : ${formatDate(computedAt.cont)}, ISOL : ${formatDate(computedAt.isol)}`;
     })
     .catch(err => console.error('Erreur stats générales:', err));
 
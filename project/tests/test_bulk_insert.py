@@ -0,0 +1,75 @@
+import json
+import pytest
+from database.bulk_insert import batched, iter_instances_cont, iter_word_annotations_cont, iter_subtitles_cont, COLUMNS
+from database.insert_db import ANNOT_FILES
+
+# Test du découpage en lots
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
+
+# Test de la lecture du CSV des instances CONT par morceaux
+def test_iter_instances_cont(tmp_path):
+    csv_path = tmp_path / "instances.csv"
+    csv_path.write_text("id;signer_id;session_id;task_id;n_frames;n_signs\nCLSFBI0103A_S001_B;1;3;1;250;12\nCLSFBI0103A_S002_B;2;3;1;300;8\n")
+
+    records = list(iter_instances_cont(str(csv_path), chunksize=1))
+    assert records == [("CLSFBI0103A_S001_B", 1, 3, 1, 250, 12), ("CLSFBI0103A_S002_B", 2, 3, 1, 300, 8)]
+    assert all(type(value) in (str, int) for record in records for value in record)  # types natifs pour asyncpg
+    assert len(records[0]) == len(COLUMNS["instances_cont"])
+
+# Test des annotations : les instances inconnues sont ignorées et signalées
+def test_iter_annotations_skip_unknown_instances(tmp_path):
+    for annotation_file in ANNOT_FILES:
+        (tmp_path / annotation_file).write_text(json.dumps({}))
+    (tmp_path / "signs_left_hand.json").write_text(json.dumps({
+        "known": [{"value": "BONJOUR", "start": 10, "end": 500}],
+        "unknown": [{"value": "MERCI", "start": 0, "end": 200}],
+    }))
+    (tmp_path / "subtitles.json").write_text(json.dumps({
+        "known": [{"value": "Bonjour à tous", "start": 0, "end": 1500}],
+        "unknown": [{"value": "Merci", "start": 0, "end": 200}],
+    }))
+
+    skipped = set()
+    words = list(iter_word_annotations_cont(str(tmp_path), {"known"}, skipped))
+    assert words == [("known", "BONJOUR", "normal", "left_hand", 10, 500)]
+    assert skipped == {"unknown"}
+
+    skipped = set()
+    subtitles = list(iter_subtitles_cont(str(tmp_path / "subtitles.json"), {"known"}, skipped))
+    assert subtitles == [("known", "Bonjour à tous", 0, 1500)]
+    assert skipped == {"unknown"}
+
+# Test du résumé des instances ignorées : même message que les insertions ORM (database/insert_db.py)
+def test_bulk_load_reports_skipped_like_orm_insertion(capsys):
+    from database import bulk_insert, insert_db
+    assert bulk_insert.report_skipped is insert_db.report_skipped
+    bulk_insert.report_skipped("instance(s) de sous-titres", "instances_cont", {"b", "a"})
+    assert capsys.readouterr().out == "2 instance(s) de sous-titres ignoré(s) : instance absente de la table 'instances_cont' (a, b)\n"
+
+# Test de l'analyse dans un pool de processus : les lots arrivent filtrés, au fil des fichiers
+@pytest.mark.asyncio
+async def test_batches_as_completed_with_process_pool(tmp_path):
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+    from database.bulk_insert import batches_as_completed, parse_word_annotation_file
+
+    for i, instance_id in enumerate(["a", "b", "c"]):
+        (tmp_path / f"file_{i}.json").write_text(json.dumps({
+            instance_id: [{"value": f"SIGNE_{n}", "start": n, "end": n + 100} for n in range(3)]
+        }))
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        futures = [
+            loop.run_in_executor(pool, parse_word_annotation_file, str(tmp_path / f"file_{i}.json"), "left_hand", "normal")
+            for i in range(3)
+        ]
+        skipped = set()
+        batches = [batch async for batch in batches_as_completed(futures, {"a", "c"}, skipped, batch_size=2)]
+
+    records = [record for batch in batches for record in batch]
+    assert all(len(batch) <= 2 for batch in batches)
+    assert sorted(record[0] for record in records) == ["a"] * 3 + ["c"] * 3
+    assert skipped == {"b"}
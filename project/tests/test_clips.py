@@ -0,0 +1,91 @@
+import os
+import sys
+import asyncio
+import pytest
+from route import clips
+from route.clips import ClipCache, ClipError, clip_key, get_clip
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"source")
+    return path
+
+def fake_ffmpeg(content=b"clip", returncode=0):
+    """Remplace ffmpeg par un interpréteur Python qui écrit `content` dans le fichier de sortie."""
+    calls = []
+    def command(video_path, output_path, start_ms, end_ms, padding_ms):
+        calls.append((start_ms, end_ms, padding_ms))
+        script = (
+            "import sys, time; time.sleep(0.1); "
+            f"open(sys.argv[1], 'wb').write({content!r}); sys.exit({returncode})"
+        )
+        return [sys.executable, "-c", script, str(output_path)]
+    return command, calls
+
+def test_clip_key_changes_with_source(video):
+    key = clip_key(video, 1000, 2000, 250)
+    assert key == clip_key(video, 1000, 2000, 250)
+    assert key != clip_key(video, 1000, 2000, 0)
+    video.write_bytes(b"nouvelle source")
+    assert key != clip_key(video, 1000, 2000, 250)
+    with pytest.raises(FileNotFoundError):
+        clip_key(video.with_name("absente.mp4"), 1000, 2000, 250)
+
+def test_ffmpeg_clip_command_padding():
+    command = clips.ffmpeg_clip_command("in.mp4", "out.mp4", 100, 1500, 250)
+    # La marge ne fait pas commencer l'extrait avant le début de la vidéo
+    assert command[command.index("-ss") + 1] == "0.000"
+    assert command[command.index("-t") + 1] == "1.750"
+    assert "+faststart" in command
+
+def test_clip_cache_evicts_least_recently_served(tmp_path):
+    cache = ClipCache(directory=tmp_path, max_bytes=250)
+    for index, key in enumerate(["aa1", "bb2", "cc3"]):
+        path = cache.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, ns=(index * 10**9, index * 10**9))
+    assert cache.lookup("aa1") is not None  # Servi : devient le plus récent
+    assert cache.evict() == 1
+    assert cache.lookup("bb2") is None
+    assert cache.lookup("aa1") is not None
+    assert cache.lookup("cc3") is not None
+
+def test_clip_cache_keeps_recently_served_clips(tmp_path):
+    cache = ClipCache(directory=tmp_path, max_bytes=150, grace_s=60)
+    for key in ["aa1", "bb2"]:
+        path = cache.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100)
+    os.utime(cache.path("aa1"), ns=(0, 0))
+    # bb2 vient d'être servi (une autre requête peut l'envoyer) : conservé malgré le dépassement
+    assert cache.evict() == 1
+    assert cache.lookup("aa1") is None
+    assert cache.lookup("bb2") is not None
+
+@pytest.mark.asyncio
+async def test_get_clip_renders_once(tmp_path, video, monkeypatch):
+    command, calls = fake_ffmpeg()
+    monkeypatch.setattr(clips, "ffmpeg_clip_command", command)
+    cache = ClipCache(directory=tmp_path / "clips", max_bytes=10**6)
+
+    # Requêtes simultanées : un seul découpage
+    paths = await asyncio.gather(*(get_clip(video, 1000, 2000, 250, cache=cache) for _ in range(3)))
+    assert len(set(paths)) == 1
+    assert paths[0].read_bytes() == b"clip"
+    assert calls == [(1000, 2000, 250)]
+
+    # Ensuite servi depuis le cache
+    assert await get_clip(video, 1000, 2000, 250, cache=cache) == paths[0]
+    assert len(calls) == 1
+    assert not list((tmp_path / "clips").glob("*/*.part"))
+
+@pytest.mark.asyncio
+async def test_get_clip_failure(tmp_path, video, monkeypatch):
+    command, _ = fake_ffmpeg(returncode=1)
+    monkeypatch.setattr(clips, "ffmpeg_clip_command", command)
+    cache = ClipCache(directory=tmp_path / "clips", max_bytes=10**6)
+    with pytest.raises(ClipError):
+        await get_clip(video, 1000, 2000, 250, cache=cache)
+    assert not list((tmp_path / "clips").glob("*/*"))
@@ -0,0 +1,52 @@
+import numpy as np
+import dash_app
+from dash_app import app, charger_poses, figure_animee, update_graph, toggle_interval
+
+def save_parts(folder, n_frames):
+    paths = {}
+    for part, n_joints in {"left_hand": 21, "right_hand": 21, "pose": 33, "face": 478}.items():
+        (folder / part).mkdir()
+        path = folder / part / "CLSFB_TEST.npy"
+        np.save(path, np.random.rand(n_frames, n_joints, 3).astype(np.float32))
+        paths[part] = [str(path)]
+    return paths
+
+def test_figure_animee_sends_all_frames(tmp_path):
+    video_paths = save_parts(tmp_path, 12)
+    poses = charger_poses({part: paths[0] for part, paths in video_paths.items()})
+    figure = figure_animee(poses, 12)
+
+    assert len(figure["frames"]) == 12
+    assert len(figure["layout"]["sliders"][0]["steps"]) == 12
+    assert figure["data"] == figure["frames"][0]["data"]
+    # Les axes sont fixés pour toute la séquence
+    assert figure["layout"]["xaxis"]["range"][0] <= figure["layout"]["xaxis"]["range"][1]
+
+def test_update_graph_server_mode_single_frame(tmp_path):
+    video_paths = save_parts(tmp_path, 12)
+    figure = update_graph(13, 0, "server", video_paths)
+
+    assert "frames" not in figure
+    assert figure["layout"]["title"] == "Squelette 2D - Frame 1/11"
+
+def test_interval_triggers_a_single_render():
+    # Seul update_graph dépend de l'intervalle : le store des chemins n'est pas réécrit à chaque frame
+    triggered = [
+        output for output, callback in app.callback_map.items()
+        if any(i["id"] == "interval-component" and i["property"] == "n_intervals" for i in callback["inputs"])
+    ]
+    assert triggered == ["skeleton-graph.figure"]
+
+def test_long_sequence_falls_back_to_server_mode(tmp_path, monkeypatch):
+    monkeypatch.setattr(dash_app, "MAX_ANIMATION_FRAMES", 10)
+    video_paths = save_parts(tmp_path, 12)
+
+    # Aucune frame n'est coupée : la séquence entière est rendue par le serveur, avec un avertissement
+    disabled, notice = toggle_interval("client", video_paths)
+    assert disabled is False and "12 frames" in notice
+    figure = update_graph(13, 0, "client", video_paths)
+    assert "frames" not in figure
+    assert figure["layout"]["title"] == "Squelette 2D - Frame 1/11"
+
+    monkeypatch.setattr(dash_app, "MAX_ANIMATION_FRAMES", 12)
+    assert toggle_interval("client", video_paths) == (True, "")
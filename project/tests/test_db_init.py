@@ -0,0 +1,71 @@
+import pytest
+from database.db_init import ENGINE_PROFILES, load_engine_profile, create_engine_from_profile
+
+def test_profile_defaults_and_env_overrides(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+    monkeypatch.setenv("DB_SQL_LOG_LEVEL", "debug")
+    profile = load_engine_profile("prod")
+    assert profile["name"] == "prod"
+    assert profile["pool_size"] == 12
+    assert profile["pool_pre_ping"] is False
+    assert profile["sql_log_level"] == "DEBUG"
+    assert profile["statement_timeout_ms"] == ENGINE_PROFILES["prod"]["statement_timeout_ms"]
+
+def test_unknown_profile(monkeypatch):
+    monkeypatch.setenv("DB_PROFILE", "staging")
+    with pytest.raises(ValueError):
+        load_engine_profile()
+
+def test_engine_from_profile():
+    profile = load_engine_profile("prod")
+    engine = create_engine_from_profile("postgresql+asyncpg://u:p@localhost:5432/db", profile)
+    assert engine.pool.size() == profile["pool_size"]
+    assert engine.pool._max_overflow == profile["max_overflow"]
+    assert engine.url.query["prepared_statement_cache_size"] == str(profile["prepared_statement_cache_size"])
+    assert not engine.echo
+
+# --------------------------
+# Réplicas en lecture
+# --------------------------
+from types import SimpleNamespace
+from database.db_init import ReadRouter, replica_urls
+
+def fake_engine(checked_out=0):
+    """Moteur factice : seul le compteur de connexions prêtées est utilisé par le routage."""
+    return SimpleNamespace(pool=SimpleNamespace(checkedout=lambda: checked_out))
+
+def test_replica_urls(monkeypatch):
+    monkeypatch.setenv("DB_CONT_REPLICAS", "replica-1:5433, replica-2")
+    urls = replica_urls("cont")
+    assert len(urls) == 2
+    assert "@replica-1:5433/" in urls[0]
+    assert "@replica-2:" in urls[1]
+    monkeypatch.delenv("DB_CONT_REPLICAS")
+    assert replica_urls("cont") == []
+
+def test_router_without_replicas_reads_from_writer():
+    writer = fake_engine()
+    router = ReadRouter(writer)
+    assert router.reader() is writer
+
+def test_router_round_robin():
+    writer, replica_a, replica_b = fake_engine(), fake_engine(), fake_engine()
+    router = ReadRouter(writer, [replica_a, replica_b])
+    picks = [router.reader() for _ in range(4)]
+    assert picks == [replica_a, replica_b, replica_a, replica_b]
+    assert writer not in picks
+
+def test_router_least_connections():
+    busy, idle = fake_engine(checked_out=4), fake_engine(checked_out=1)
+    router = ReadRouter(fake_engine(), [busy, idle], routing="least_connections")
+    assert all(router.reader() is idle for _ in range(3))
+
+    # Égalité : les réplicas sont choisis à tour de rôle
+    replica_a, replica_b = fake_engine(), fake_engine()
+    router = ReadRouter(fake_engine(), [replica_a, replica_b], routing="least_connections")
+    assert [router.reader(), router.reader()] == [replica_a, replica_b]
+
+def test_router_unknown_routing():
+    with pytest.raises(ValueError):
+        ReadRouter(fake_engine(), routing="random")
@@ -0,0 +1,83 @@
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.sql.dml import Insert
+from schema.models_cont import SubtitleAnnotation, ContIngestFingerprint
+from database.bulk_insert import COLUMNS
+from database.incremental import (
+    file_fingerprint, group_fingerprints, diff_fingerprints, annotation_fingerprint, sync_annotation_file,
+)
+
+# Test de l'empreinte d'un fichier (taille et date de modification)
+def test_file_fingerprint_changes_with_content(tmp_path):
+    path = tmp_path / "subtitles.json"
+    path.write_text("{}")
+    before = file_fingerprint(path)
+    assert before == file_fingerprint(path)
+
+    path.write_text('{"CLSFBI0103A_S001_B": []}')
+    os.utime(path, ns=(0, 10**9))
+    assert file_fingerprint(path) != before
+
+# Test de l'empreinte par instance : indépendante de l'ordre des annotations
+def test_group_fingerprints():
+    records = [("a", "BONJOUR", 0, 100), ("b", "MERCI", 0, 50), ("a", "MAISON", 200, 300)]
+    grouped, fingerprints = group_fingerprints(records)
+    assert grouped["a"] == [("a", "BONJOUR", 0, 100), ("a", "MAISON", 200, 300)]
+
+    _, reordered = group_fingerprints(list(reversed(records)))
+    assert reordered == fingerprints
+
+    _, modified = group_fingerprints([("a", "BONJOUR", 0, 120), ("b", "MERCI", 0, 50), ("a", "MAISON", 200, 300)])
+    assert modified["a"] != fingerprints["a"]
+    assert modified["b"] == fingerprints["b"]
+
+# Test de la comparaison des empreintes
+def test_diff_fingerprints():
+    stored = {"a": "1", "b": "2", "c": "3"}
+    current = {"a": "1", "b": "20", "d": "4"}
+    changed, removed = diff_fingerprints(stored, current)
+    assert sorted(changed) == ["b", "d"]
+    assert removed == ["c"]
+
+# Test d'une instance ajoutée au CSV alors que le fichier d'annotations est inchangé
+@pytest.mark.asyncio
+async def test_annotation_file_reloaded_for_new_instance(tmp_path):
+    path = tmp_path / "subtitles.json"
+    path.write_text("{}")
+    records = [("a", "bonjour", 0, 100), ("b", "merci", 0, 50)]
+    assert annotation_fingerprint(path, {"a", "b"}) != annotation_fingerprint(path, {"a"})
+
+    # État enregistré par le chargement précédent, quand seule l'instance "a" était connue
+    _, stored = group_fingerprints([record for record in records if record[0] == "a"])
+    result = MagicMock()
+    result.scalar.return_value = annotation_fingerprint(path, {"a"})
+    result.all.return_value = list(stored.items())
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+
+    await sync_annotation_file(
+        session, ContIngestFingerprint, SubtitleAnnotation, COLUMNS["subtitles"], "annotations/subtitles.json",
+        path, lambda: iter(records), {"a", "b"},
+    )
+    inserted = [
+        call.args[1] for call in session.execute.await_args_list
+        if isinstance(call.args[0], Insert) and call.args[0].table.name == SubtitleAnnotation.__tablename__
+    ]
+    assert inserted == [[dict(zip(COLUMNS["subtitles"], records[1]))]]
+
+# Test des combinaisons d'options refusées par database/db.py (une option serait ignorée)
+@pytest.mark.parametrize("argv", [
+    ["--incremental", "--bulk"], ["--incremental", "--workers", "4"], ["--workers", "4"], ["--bulk", "--workers", "0"],
+])
+def test_db_rejects_conflicting_options(argv, capsys):
+    from database import db
+    with pytest.raises(SystemExit):
+        db.check_args(db.parser.parse_args(argv))
+    assert "--" in capsys.readouterr().err
+
+def test_db_accepts_compatible_options():
+    from database import db
+    for argv in ([], ["--incremental"], ["--bulk"], ["--bulk", "--workers", "4"]):
+        db.check_args(db.parser.parse_args(argv))
@@ -0,0 +1,25 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from database.insert_db import insert_subtitles_cont
+
+# Les instances connues sont chargées en une seule requête, quel que soit le nombre d'instances
+@pytest.mark.asyncio
+async def test_insert_subtitles_cont_single_lookup(tmp_path, capsys):
+    annotations = tmp_path / "annotations"
+    annotations.mkdir()
+    (annotations / "subtitles.json").write_text(json.dumps({
+        f"known_{i}": [{"value": "Bonjour", "start": 0, "end": 1000}] for i in range(5)
+    } | {"unknown": [{"value": "Merci", "start": 0, "end": 500}]}))
+
+    session = MagicMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = [f"known_{i}" for i in range(5)]
+    session.execute = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+
+    await insert_subtitles_cont(session, str(tmp_path))
+
+    assert session.execute.await_count == 1
+    assert session.add.call_count == 5
+    assert "1 instance(s) de sous-titres ignoré(s)" in capsys.readouterr().out
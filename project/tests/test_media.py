@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from route.media import MediaFiles, StreamLimiter, parse_range
+
+CONTENT = bytes(range(256)) * 40  # 10 240 octets
+
+@pytest.fixture
+def media_dir(tmp_path):
+    (tmp_path / "videos").mkdir()
+    (tmp_path / "videos" / "clip.mp4").write_bytes(CONTENT)
+    (tmp_path / "secret.txt").write_text("hors du dossier servi")
+    return tmp_path / "videos"
+
+def client_for(media_files):
+    app = FastAPI()
+    app.mount("/cont", media_files)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-2000", 1000) == (990, 999)
+    assert parse_range("bytes=0-1,5-9", 1000) is None  # Plusieurs plages : fichier entier
+    with pytest.raises(ValueError):
+        parse_range("bytes=1000-", 1000)
+
+@pytest.mark.asyncio
+async def test_full_and_range_requests(media_dir):
+    async with client_for(MediaFiles(directory=media_dir)) as ac:
+        response = await ac.get("/cont/clip.mp4")
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "max-age=" in response.headers["cache-control"]
+        etag = response.headers["etag"]
+        assert not etag.startswith("W/")
+
+        # Saut dans la vidéo : une seule plage
+        response = await ac.get("/cont/clip.mp4", headers={"Range": "bytes=1000-1999"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[1000:2000]
+        assert response.headers["content-range"] == f"bytes 1000-1999/{len(CONTENT)}"
+        assert response.headers["content-length"] == "1000"
+
+        response = await ac.get("/cont/clip.mp4", headers={"Range": "bytes=-10"})
+        assert response.content == CONTENT[-10:]
+
+        response = await ac.get("/cont/clip.mp4", headers={"Range": f"bytes={len(CONTENT)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+        # Revalidation et If-Range
+        response = await ac.get("/cont/clip.mp4", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        response = await ac.get("/cont/clip.mp4", headers={"Range": "bytes=0-9", "If-Range": '"autre"'})
+        assert response.status_code == 200 and response.content == CONTENT
+
+        response = await ac.head("/cont/clip.mp4")
+        assert response.status_code == 200 and response.content == b""
+        assert response.headers["content-length"] == str(len(CONTENT))
+
+@pytest.mark.asyncio
+async def test_missing_and_outside_paths(media_dir):
+    async with client_for(MediaFiles(directory=media_dir)) as ac:
+        assert (await ac.get("/cont/absent.mp4")).status_code == 404
+        assert (await ac.get("/cont/../secret.txt")).status_code == 404
+        assert (await ac.get("/cont/%2e%2e/secret.txt")).status_code == 404
+        assert (await ac.post("/cont/clip.mp4")).status_code == 405
+
+@pytest.mark.asyncio
+async def test_accel_redirect(media_dir):
+    async with client_for(MediaFiles(directory=media_dir, accel_redirect="/_media/cont/")) as ac:
+        response = await ac.get("/cont/clip.mp4")
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == "/_media/cont/clip.mp4"
+        assert response.content == b""
+
+@pytest.mark.asyncio
+async def test_stream_limiter(media_dir):
+    limiter = StreamLimiter(max_streams=1, wait_timeout=0.05)
+    async with client_for(MediaFiles(directory=media_dir, limiter=limiter)) as ac:
+        async with limiter.slot():
+            response = await ac.get("/cont/clip.mp4")
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "1"
+            # Les réponses sans corps ne prennent pas de place
+            assert (await ac.head("/cont/clip.mp4")).status_code == 200
+        assert (await ac.get("/cont/clip.mp4")).status_code == 200
+        assert limiter.active == 0
@@ -0,0 +1,93 @@
+import sys
+import json
+import subprocess
+from pathlib import Path
+import numpy as np
+from pose_archive import PoseArchive, plan_shards, read_entry, write_archive, new_archive_dir, remove_previous_archives
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+JOINTS = {"pose": 33, "left_hand": 21, "right_hand": 21, "face": 478}
+
+def save_instance(poses_dir, instance_id, n_frames):
+    paths, arrays = {}, {}
+    for part, n_joints in JOINTS.items():
+        (poses_dir / part).mkdir(parents=True, exist_ok=True)
+        path = poses_dir / part / f"{instance_id}.npy"
+        # Partie 'face' plus longue d'une frame : l'instance est coupée au nombre de frames commun
+        arrays[part] = np.random.rand(n_frames + (part == "face"), n_joints, 3).astype(np.float32)
+        np.save(path, arrays[part])
+        paths[part] = str(path)
+    return paths, arrays
+
+def test_plan_shards():
+    shards = plan_shards([("A", 40), ("B", 50), ("C", 30), ("D", 200)], shard_frames=100)
+    assert shards == [[("A", 0, 40), ("B", 40, 50)], [("C", 0, 30)], [("D", 0, 200)]]
+
+def test_write_and_read_archive(tmp_path):
+    paths_a, arrays_a = save_instance(tmp_path / "poses", "A", 30)
+    paths_b, arrays_b = save_instance(tmp_path / "poses", "B", 20)
+    paths_c, _ = save_instance(tmp_path / "poses", "C", 10)
+    del paths_c["face"]  # Instance incomplète : ignorée
+
+    index = write_archive({"A": paths_a, "B": paths_b, "C": paths_c}, tmp_path / "archive", dtype="float16", shard_frames=40)
+    assert index["shards"] == ["poses_000.npy", "poses_001.npy"]
+    assert index["instances"] == {"A": [0, 0, 30], "B": [1, 0, 20]}
+    assert index["parts"]["left_hand"] == [33, 21]
+
+    archive = PoseArchive(tmp_path / "archive")
+    assert "B" in archive and "C" not in archive
+    views = archive.read("B", 5, 15, parts=["left_hand", "face"])
+    assert set(views) == {"left_hand", "face"}
+    assert views["face"].dtype == np.float16
+    np.testing.assert_allclose(views["left_hand"], arrays_b["left_hand"][5:15], atol=1e-3)
+    np.testing.assert_allclose(archive.read("A")["pose"], arrays_a["pose"][:30], atol=1e-3)
+
+def test_read_entry_after_repack(tmp_path):
+    paths_a, arrays_a = save_instance(tmp_path / "poses", "A", 30)
+    paths_b, arrays_b = save_instance(tmp_path / "poses", "B", 20)
+    archive_dir = tmp_path / "archive"
+
+    index = write_archive({"A": paths_a, "B": paths_b}, archive_dir, shard_frames=100)
+    shard_number, frame_offset, n_frames = index["instances"]["B"]
+    views = read_entry(archive_dir / index["shards"][shard_number], frame_offset, n_frames)
+    np.testing.assert_allclose(views["pose"], arrays_b["pose"][:20])
+
+    # Réécriture par un autre processus (comme database/pack_poses.py) : B change de position,
+    # l'ancien index et l'ancien mmap ne doivent plus être servis
+    script = (
+        "import json, sys; from pose_archive import write_archive; "
+        "write_archive(json.loads(sys.argv[1]), sys.argv[2], shard_frames=100)"
+    )
+    subprocess.run([sys.executable, "-c", script, json.dumps({"B": paths_b, "A": paths_a}), str(archive_dir)],
+                   cwd=PROJECT_DIR, check=True, capture_output=True)
+    index = json.loads((archive_dir / "index.json").read_text(encoding="utf-8"))
+    shard_number, frame_offset, n_frames = index["instances"]["B"]
+    assert frame_offset == 0
+    views = read_entry(archive_dir / index["shards"][shard_number], frame_offset, n_frames)
+    np.testing.assert_allclose(views["pose"], arrays_b["pose"][:20])
+    shard_number, frame_offset, n_frames = index["instances"]["A"]
+    views = read_entry(archive_dir / index["shards"][shard_number], frame_offset, n_frames)
+    np.testing.assert_allclose(views["face"], arrays_a["face"][:30])
+
+def test_repack_writes_a_new_generation(tmp_path):
+    paths_a, arrays_a = save_instance(tmp_path / "poses", "A", 30)
+    paths_b, _ = save_instance(tmp_path / "poses", "B", 20)
+    split_dir = tmp_path / "archive" / "cont"
+    # Archive écrite directement dans le dossier du split (versions précédentes)
+    write_archive({"A": paths_a}, split_dir)
+
+    old_dir = new_archive_dir(split_dir)
+    old_index = write_archive({"A": paths_a}, old_dir)
+    new_dir = new_archive_dir(split_dir)
+    assert new_dir != old_dir
+    new_index = write_archive({"B": paths_b, "A": paths_a}, new_dir)
+
+    # Tant que la base désigne l'ancienne génération, ses positions restent valables
+    shard_number, frame_offset, n_frames = old_index["instances"]["A"]
+    views = read_entry(old_dir / old_index["shards"][shard_number], frame_offset, n_frames)
+    np.testing.assert_allclose(views["pose"], arrays_a["pose"][:30])
+    assert new_index["instances"]["A"][1] != frame_offset
+
+    # Après validation des nouvelles positions : seules les anciennes générations sont supprimées
+    remove_previous_archives(split_dir, new_dir)
+    assert [path.name for path in split_dir.iterdir()] == [new_dir.name]
@@ -0,0 +1,49 @@
+import numpy as np
+from pose_store import PoseStore
+
+def save_parts(folder, instance_id, n_frames):
+    paths = {}
+    for part, n_joints in {"pose": 33, "left_hand": 21}.items():
+        (folder / part).mkdir(exist_ok=True)
+        path = folder / part / f"{instance_id}.npy"
+        np.save(path, np.random.rand(n_frames, n_joints, 3).astype(np.float32))
+        paths[part] = str(path)
+    return paths
+
+def test_pose_store_hits_and_views(tmp_path):
+    store = PoseStore()
+    paths = save_parts(tmp_path, "A", 10)
+
+    arrays = store.get("A", paths)
+    assert isinstance(arrays["pose"], np.memmap)
+    assert store.get("A", paths) is arrays
+    assert store.n_frames("A", paths) == 10
+
+    frame = store.frame("A", paths, 3)
+    assert frame["left_hand"].shape == (21, 3)
+    assert np.shares_memory(frame["left_hand"], arrays["left_hand"])
+    np.testing.assert_array_equal(frame["pose"], np.load(paths["pose"])[3])
+
+    stats = store.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 3
+    assert stats["instances"] == 1
+
+def test_pose_store_evicts_least_recently_used(tmp_path):
+    paths_a = save_parts(tmp_path, "A", 10)
+    paths_b = save_parts(tmp_path, "B", 10)
+    paths_c = save_parts(tmp_path, "C", 10)
+    size = 10 * (33 + 21) * 3 * 4
+    store = PoseStore(max_bytes=2 * size)
+
+    store.get("A", paths_a)
+    store.get("B", paths_b)
+    store.get("A", paths_a)  # A redevient la plus récente
+    store.get("C", paths_c)  # B est évincée
+
+    stats = store.stats()
+    assert stats["evictions"] == 1
+    assert stats["instances"] == 2
+    assert stats["mapped_bytes"] == 2 * size
+    store.get("B", paths_b)
+    assert store.stats()["misses"] == 4
@@ -0,0 +1,26 @@
+import numpy as np
+from route.pose_stream import encode_pose_stream, decode_pose_stream, frame_range, payload_size
+
+def test_encode_decode_roundtrip_float16():
+    arrays = {
+        "pose": np.random.rand(700, 33, 3).astype(np.float32),
+        "face": np.random.rand(700, 478, 3).astype(np.float32),
+    }
+    start, end = frame_range(arrays, 100, 650)
+    chunks = list(encode_pose_stream(arrays, start, end, "float16", frames_per_chunk=256))
+    data = b"".join(chunks)
+
+    # En-tête + 3 morceaux (256 + 256 + 38 frames)
+    assert len(chunks) == 4
+    assert len(data) == payload_size(arrays, start, end, "float16")
+
+    parts, frames = decode_pose_stream(data)
+    assert parts == {"pose": (0, 33), "face": (33, 478)}
+    assert frames.dtype == np.dtype("<f2")
+    np.testing.assert_allclose(frames[:, 33:], arrays["face"][100:650], atol=1e-3)
+
+def test_frame_range_clamped():
+    arrays = {"pose": np.zeros((5, 33, 3)), "left_hand": np.zeros((4, 21, 3))}
+    assert frame_range(arrays) == (0, 4)
+    assert frame_range(arrays, 10, None) == (4, 4)
+    assert frame_range(arrays, 1, 3) == (1, 3)
@@ -0,0 +1,127 @@
+import json
+import struct
+import subprocess
+from Utilitaires import remux_videos
+from Utilitaires.remux_videos import moov_position, keyframe_interval, plan_action, ffmpeg_command, load_journal, already_done, file_state
+
+def box(box_type: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+def test_moov_position(tmp_path):
+    ftyp = box(b"ftyp", b"isom")
+    cases = {
+        "start.mp4": (ftyp + box(b"moov", b"x" * 16) + box(b"mdat", b"y" * 64), "start"),
+        "end.mp4": (ftyp + box(b"mdat", b"y" * 64) + box(b"moov", b"x" * 16), "end"),
+        # mdat en taille 64 bits
+        "large.mp4": (ftyp + struct.pack(">I4sQ", 1, b"mdat", 16 + 4) + b"yyyy" + box(b"moov"), "end"),
+        "none.mp4": (b"pas une video", None),
+    }
+    for name, (content, expected) in cases.items():
+        (tmp_path / name).write_bytes(content)
+        assert moov_position(tmp_path / name) == expected, name
+
+def test_keyframe_interval():
+    packets = "0.000000,K__\n0.040000,___\n2.000000,K__\nN/A,___\n7.500000,K__\n9.960000,___\n"
+    assert keyframe_interval(packets) == 5.5
+    # Une seule image clé : l'intervalle va jusqu'à la fin de la vidéo
+    assert keyframe_interval("0.0,K_\n1.0,__\n12.0,__\n") == 12.0
+    assert keyframe_interval("") is None
+
+def test_plan_action():
+    assert plan_action({"moov": "end", "max_gop_s": 1.0}, reencode=False, max_gop=2) == "faststart"
+    assert plan_action({"moov": "start", "max_gop_s": 10.0}, reencode=False, max_gop=2) is None
+    assert plan_action({"moov": "start", "max_gop_s": 10.0}, reencode=True, max_gop=2) == "reencode"
+    assert plan_action({"moov": "start", "max_gop_s": 1.5}, reencode=True, max_gop=2) is None
+    command = ffmpeg_command("in.mp4", "out.part", "faststart", 2, 1)
+    assert command[command.index("-c") + 1] == "copy" and "libx264" not in command
+    assert "expr:gte(t,n_forced*2)" in ffmpeg_command("in.mp4", "out.part", "reencode", 2, 1)
+
+def test_journal_resume(tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"faststart")
+    journal = tmp_path / "journal.jsonl"
+    entries = [
+        {"path": str(video), "status": "ok", "reencode": False, "max_gop": 2.0, "after": file_state(video)},
+        {"path": str(tmp_path / "b.mp4"), "status": "error", "after": None},
+        {"path": str(tmp_path / "c.mp4"), "status": "ok", "dry_run": True, "after": None},
+    ]
+    journal.write_text("".join(json.dumps(entry) + "\n" for entry in entries) + '{"path": "tronqu', encoding="utf-8")
+
+    done = load_journal(journal)
+    assert list(done) == [str(video)]
+    assert already_done(str(video), done, reencode=False, max_gop=2.0)
+    # Passage faststart seul : ne dispense pas d'un ré-encodage demandé ensuite
+    assert not already_done(str(video), done, reencode=True, max_gop=2.0)
+    done[str(video)].update(reencode=True, max_gop=2.0)
+    assert already_done(str(video), done, reencode=True, max_gop=4.0)
+    assert not already_done(str(video), done, reencode=True, max_gop=1.0)
+    # Modifiée depuis le traitement : de nouveau auditée
+    video.write_bytes(b"nouveau contenu")
+    assert not already_done(str(video), done, reencode=False, max_gop=2.0)
+
+def test_process_video_dry_run(tmp_path, monkeypatch):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(box(b"ftyp") + box(b"mdat", b"y" * 8) + box(b"moov"))
+    monkeypatch.setattr(remux_videos, "audit_video", lambda path: {"moov": moov_position(path), "max_gop_s": 1.0})
+    entry = remux_videos.process_video(str(video), reencode=False, max_gop=2, dry_run=True, threads=1)
+    assert entry["status"] == "ok"
+    assert entry["action"] == "faststart"
+    assert entry["before"] == entry["after"]  # Rien n'est modifié
+
+def test_process_video_records_errors(tmp_path, monkeypatch):
+    # Fichier tronqué au milieu d'une taille de boîte sur 64 bits
+    truncated = tmp_path / "tronquee.mp4"
+    truncated.write_bytes(box(b"ftyp") + struct.pack(">I4s", 1, b"mdat") + b"\x00\x00")
+    monkeypatch.setattr(remux_videos.subprocess, "run", lambda *args, **kwargs: subprocess.CompletedProcess(args, 0, stdout=""))
+    entry = remux_videos.process_video(str(truncated), reencode=False, max_gop=2, dry_run=False, threads=1)
+    assert entry["status"] == "error" and "error" in entry["error"]
+
+    # Remplacement impossible : l'erreur est enregistrée, la vidéo d'origine reste en place
+    video = tmp_path / "a.mp4"
+    video.write_bytes(box(b"ftyp") + box(b"mdat", b"y" * 8) + box(b"moov"))
+    def refuse(src, dst):
+        raise PermissionError(13, "Permission refusée", dst)
+    monkeypatch.setattr(remux_videos.os, "replace", refuse)
+    entry = remux_videos.process_video(str(video), reencode=False, max_gop=2, dry_run=False, threads=1)
+    assert entry["status"] == "error"
+    assert entry["action"] == "faststart"
+    assert entry["reencode"] is False and entry["max_gop"] == 2
+    assert entry["before"] == entry["after"]
+    assert not list(tmp_path.glob("*.part"))
+
+def test_process_video_probes_replaced_file(tmp_path, monkeypatch):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(box(b"ftyp") + box(b"mdat", b"y" * 8) + box(b"moov"))
+    def fake_ffmpeg(command, **kwargs):
+        with open(command[-1], "wb") as output:  # Dernier argument : fichier produit
+            output.write(box(b"ftyp") + box(b"moov") + box(b"mdat", b"y" * 8))
+        return subprocess.CompletedProcess(command, 0, stdout="")
+    monkeypatch.setattr(remux_videos, "audit_video", lambda path: {"moov": moov_position(path), "max_gop_s": 5.0})
+    monkeypatch.setattr(remux_videos.subprocess, "run", fake_ffmpeg)
+    monkeypatch.setattr(remux_videos, "probe_video", lambda path: {"duration_s": 4.0, "fps": 50.0, "width": 720, "height": 576, "codec": "AVC"})
+    entry = remux_videos.process_video(str(video), reencode=True, max_gop=2, dry_run=False, threads=1)
+    assert entry["status"] == "ok" and entry["action"] == "reencode"
+    assert entry["metadata"]["codec"] == "AVC"
+
+    # Vidéo déjà conforme : pas de nouveau sondage
+    monkeypatch.setattr(remux_videos, "audit_video", lambda path: {"moov": "start", "max_gop_s": 1.0})
+    assert "metadata" not in remux_videos.process_video(str(video), reencode=True, max_gop=2, dry_run=False, threads=1)
+
+def test_update_video_metadata_by_path(monkeypatch):
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+    from sqlalchemy.dialects import postgresql
+    session = MagicMock(execute=AsyncMock(), commit=AsyncMock())
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    monkeypatch.setitem(remux_videos.DATASETS, "isol", (session_factory, remux_videos.IsolVideo))
+
+    metadata = {"duration_s": 4.0, "fps": 50.0, "width": 720, "height": 576, "codec": "AVC"}
+    asyncio.run(remux_videos.update_video_metadata({"cont": {}, "isol": {"E:/isol/a.mp4": metadata}}))
+    statement, params = session.execute.await_args.args
+    assert params == [{"video_path": "E:/isol/a.mp4", **metadata}]
+    sql = str(statement.compile(dialect=postgresql.dialect(), column_keys=list(params[0])))
+    assert sql.startswith("UPDATE videos_iso SET duration_s=") and "codec=" in sql
+    assert "WHERE videos_iso.path = %(video_path)s" in sql
+    session.commit.assert_awaited_once()
@@ -36,6 +36,12 @@ def mock_db_session():
 
     return mock
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    from route.response_cache import response_cache, dataset_versions
+    response_cache.clear()
+    dataset_versions.clear()
+
 @pytest.fixture(autouse=True)
 def override_dependencies(mock_db_session):
     from database import db_init
@@ -55,6 +61,18 @@ def test_static_pages(url):
     response = client.get(url)
     assert response.status_code == 200
 
+def test_health_db():
+    client = TestClient(app)
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["profile"] in ("dev", "prod")
+    for db_key in ("cont", "isol"):
+        writer = data[db_key]["writer"]
+        assert {"host", "size", "checked_out", "overflow", "checked_in"} <= writer.keys()
+        assert writer["checked_out"] == 0
+        assert data[db_key]["readers"] == []  # Aucun réplica configuré
+
 # --------------------------
 # ROUTES DYNAMIQUES : CONT
 # --------------------------
@@ -70,6 +88,23 @@ async def test_results_cont(params):
         await response.aread()
         assert response.status_code in [200, 422]
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [
+    {"term": "bonjour", "submitType": "filter", "hand_type": "foo"},
+    {"term": "bonjour", "submitType": "filter", "sign_type": "bizarre"},
+])
+async def test_results_cont_invalid_enum_filter(mock_db_session, params):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/results_cont", params=params)
+        assert response.status_code == 200
+    # La valeur hors ENUM n'est jamais envoyée à PostgreSQL (qui rejetterait la conversion)
+    calls = mock_db_session.execute.await_args_list + mock_db_session.scalar.await_args_list
+    assert calls
+    for call in calls:
+        compiled = call.args[0].compile()
+        assert "foo" not in compiled.params.values() and "bizarre" not in compiled.params.values()
+
 @pytest.mark.asyncio
 async def test_get_segments():
     transport = ASGITransport(app=app)
@@ -80,6 +115,47 @@ async def test_get_segments():
         assert "segments_list" in data
         assert isinstance(data["segments_list"], list)
 
+@pytest.mark.asyncio
+async def test_get_clip_cont(mock_db_session, tmp_path, monkeypatch):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        # Bornes invalides ou segment trop long : refusés avant toute requête
+        assert (await ac.get("/clip/cont/1", params={"start": 2000, "end": 1000})).status_code == 422
+        assert (await ac.get("/clip/cont/1", params={"start": 0, "end": 3_600_000})).status_code == 422
+        assert (await ac.get("/clip/cont/1", params={"start": 0, "end": 1000, "padding": 60_000})).status_code == 422
+        mock_db_session.execute.assert_not_awaited()
+
+        # Segment non annoté (ou vidéo inconnue) : 404
+        response = await ac.get("/clip/cont/1", params={"start": 1000, "end": 2000})
+        assert response.status_code == 404
+
+        # Segment existant : l'extrait est servi avec Range
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"0123456789")
+        mock_db_session.execute.return_value.scalar_one_or_none.return_value = "E:/cont/videos/1.mp4"
+        get_clip = AsyncMock(return_value=clip)
+        monkeypatch.setattr("route.route.get_clip", get_clip)
+        response = await ac.get("/clip/cont/1", params={"start": 1000, "end": 2000}, headers={"Range": "bytes=0-3"})
+        assert response.status_code == 206
+        assert response.content == b"0123"
+        assert response.headers["content-type"] == "video/mp4"
+        get_clip.assert_awaited_once_with("E:/cont/videos/1.mp4", 1000, 2000, 250)
+
+@pytest.mark.asyncio
+async def test_get_clip_cont_rerenders_evicted_clip(mock_db_session, tmp_path, monkeypatch):
+    # Le premier chemin a été évincé par un autre découpage avant l'envoi : l'extrait est redécoupé
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"0123456789")
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = "E:/cont/videos/1.mp4"
+    get_clip = AsyncMock(side_effect=[tmp_path / "evince.mp4", clip])
+    monkeypatch.setattr("route.route.get_clip", get_clip)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/clip/cont/1", params={"start": 1000, "end": 2000})
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert get_clip.await_count == 2
+
 @pytest.mark.asyncio
 async def test_get_cont_poses(mock_db_session):
     # Préparer le mock pour simuler les données
@@ -145,6 +221,16 @@ async def test_get_video_isol_ok_or_fail():
         await response.aread()
         assert response.status_code in [200, 404]
 
+@pytest.mark.asyncio
+async def test_get_video_isol_loads_pose_viewer(mock_db_session):
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = MagicMock(path="E:/isol/videos/1.mp4", fps=25.0)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/video/isol/CLSFB_1", params={"previous_term": "bonjour"})
+    assert response.status_code == 200
+    assert "js/pose_data.js" in response.text and "js/pose_viewer.js" in response.text
+    assert '"/isol_pose_data/CLSFB_1"' in response.text and "fps: 25.0" in response.text
+
 @pytest.mark.asyncio
 async def test_get_isol_poses(mock_db_session):
     # Préparer le mock pour simuler les données
@@ -166,6 +252,96 @@ async def test_get_isol_poses(mock_db_session):
         assert len(data["pose_paths"]["left_hand"]) == 1  # Vérifie qu'il y a une pose pour la main gauche
         assert len(data["pose_paths"]["right_hand"]) == 1  # Vérifie qu'il y a une pose pour la main droite
 
+@pytest.mark.asyncio
+async def test_get_isol_pose_data(mock_db_session, tmp_path):
+    import numpy as np
+    from route.pose_stream import decode_pose_stream
+
+    # Fichiers de poses de longueurs différentes : le flux s'arrête à la plus courte
+    pose = np.random.rand(10, 33, 3).astype(np.float32)
+    left_hand = np.random.rand(12, 21, 3).astype(np.float32)
+    np.save(tmp_path / "pose.npy", pose)
+    np.save(tmp_path / "left_hand.npy", left_hand)
+    mock_db_session.execute.return_value.all.return_value = [
+        ("pose", str(tmp_path / "pose.npy")),
+        ("left_hand", str(tmp_path / "left_hand.npy")),
+    ]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/isol_pose_data/valid_video_id", params={"parts": "pose,left_hand", "start": 2, "dtype": "float32"})
+
+    assert response.status_code == 200
+    assert int(response.headers["content-length"]) == len(response.content)
+    parts, frames = decode_pose_stream(response.content)
+    assert parts == {"pose": (0, 33), "left_hand": (33, 21)}
+    assert frames.shape == (8, 54, 3)
+    np.testing.assert_array_equal(frames[:, :33], pose[2:10])
+    np.testing.assert_array_equal(frames[:, 33:], left_hand[2:10])
+
+@pytest.mark.asyncio
+async def test_get_cont_pose_data_from_archive(mock_db_session, tmp_path):
+    import numpy as np
+    from pose_archive import write_archive
+    from route.pose_stream import decode_pose_stream
+
+    paths = {}
+    for part, n_joints in {"pose": 33, "left_hand": 21, "right_hand": 21, "face": 478}.items():
+        paths[part] = str(tmp_path / f"{part}.npy")
+        np.save(paths[part], np.random.rand(6, n_joints, 3).astype(np.float32))
+    index = write_archive({"other": paths, "valid_video_id": paths}, tmp_path / "archive")
+    shard_number, frame_offset, n_frames = index["instances"]["valid_video_id"]
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = MagicMock(
+        shard_path=str(tmp_path / "archive" / index["shards"][shard_number]), frame_offset=frame_offset, n_frames=n_frames
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/cont_pose_data/valid_video_id", params={"parts": "right_hand", "end": 4, "dtype": "float32"})
+
+    assert response.status_code == 200
+    parts, frames = decode_pose_stream(response.content)
+    assert parts == {"right_hand": (0, 21)}
+    np.testing.assert_array_equal(frames, np.load(paths["right_hand"])[:4])
+
+@pytest.mark.asyncio
+async def test_get_cont_pose_data_missing_part(mock_db_session):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/cont_pose_data/valid_video_id", params={"parts": "pose"})
+        assert response.status_code == 404
+        response = await ac.get("/cont_pose_data/valid_video_id", params={"parts": "tail"})
+        assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_isol_preview(mock_db_session, tmp_path, monkeypatch):
+    import numpy as np
+    import skeleton_previews
+
+    monkeypatch.setattr(skeleton_previews, "PREVIEW_CACHE_DIR", tmp_path / "cache")
+    paths = {}
+    for part, n_joints in {"left_hand": 21, "right_hand": 21, "pose": 33, "face": 478}.items():
+        paths[part] = str(tmp_path / f"{part}.npy")
+        np.save(paths[part], np.random.rand(4, n_joints, 3).astype(np.float32))
+    mock_db_session.execute.return_value.all.return_value = list(paths.items())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        # Aperçu pas encore rendu
+        response = await ac.get("/isol_preview/valid_video_id/poster")
+        assert response.status_code == 404
+
+        skeleton_previews.render_preview(paths)
+        response = await ac.get("/isol_preview/valid_video_id/poster")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+
+        response = await ac.get("/isol_preview/valid_video_id/poster", headers={"If-None-Match": response.headers["etag"]})
+        assert response.status_code == 304
+
+        response = await ac.get("/isol_preview/valid_video_id/video")
+        assert response.status_code == 404
+
 
 # --------------------------
 # STATISTIQUES
@@ -178,6 +354,104 @@ async def test_stats_general():
         await response.aread()
         assert response.status_code in [200, 422]
 
+@pytest.mark.asyncio
+async def test_stats_general_reads_precomputed(mock_db_session):
+    from datetime import datetime, timezone
+    computed_at = datetime(2025, 5, 1, 12, 0, tzinfo=timezone.utc)
+    rows = []
+    for name, value in [("total_clips_cont", 120.0), ("avg_clip_duration_cont", 512.7), ("avg_clips_per_gloss_cont", None)]:
+        row = MagicMock(value=value, computed_at=computed_at)
+        row.name = name  # `name` est réservé par le constructeur de MagicMock
+        rows.append(row)
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = rows
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/stats/general")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_clips_cont"] == 120 and data["avg_clip_duration_cont"] == 512
+        assert data["avg_clips_per_gloss_cont"] is None
+        assert data["computed_at"]["cont"] == computed_at.isoformat()
+        # Version des données puis une lecture par base, aucun calcul
+        assert mock_db_session.execute.await_count == 4
+
+@pytest.mark.asyncio
+async def test_stats_general_queries_databases_concurrently():
+    import asyncio, time
+    from database import db_init
+
+    def slow_session():
+        session = MagicMock()
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = []
+        result.scalar_one_or_none.return_value = None
+        result.one.return_value._mapping = {"total_clips": 1}
+
+        async def execute(*args, **kwargs):
+            await asyncio.sleep(0.2)
+            return result
+        session.execute = execute
+        return session
+
+    session_cont, session_isol = slow_session(), slow_session()
+    app.dependency_overrides[db_init.get_db_cont] = lambda: session_cont
+    app.dependency_overrides[db_init.get_db_isol] = lambda: session_isol
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        started = time.perf_counter()
+        response = await ac.get("/stats/general")
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    # Version, lecture puis calcul (0,6 s) par base : en parallèle, bien moins que la somme (1,2 s)
+    assert elapsed < 1.0
+    timing = response.headers["Server-Timing"]
+    for name in ("cont-read", "cont-compute", "isol-read", "isol-compute", "total"):
+        assert f"{name};dur=" in timing
+
+@pytest.mark.asyncio
+async def test_stats_response_cache_and_revalidation(mock_db_session):
+    from datetime import datetime, timezone
+    mock_db_session.execute.return_value.all.return_value = [("pose", 10), ("face", 8)]
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = MagicMock(
+        version=3, updated_at=datetime(2025, 5, 1, 12, 0, tzinfo=timezone.utc),
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/stats/poses/distribution")
+        assert response.status_code == 200
+        assert response.json() == {"pose": 10, "face": 8}
+        etag = response.headers["etag"]
+        assert response.headers["last-modified"] == "Thu, 01 May 2025 12:00:00 GMT"
+
+        # Réponse en cache : ni calcul ni relecture de la version (lue il y a moins de VERSION_CHECK_INTERVAL)
+        calls = mock_db_session.execute.await_count
+        response = await ac.get("/stats/poses/distribution")
+        assert response.headers["etag"] == etag
+        assert mock_db_session.execute.await_count == calls
+
+        # Revalidation du navigateur
+        response = await ac.get("/stats/poses/distribution", headers={"If-None-Match": etag})
+        assert response.status_code == 304 and response.content == b""
+        response = await ac.get("/stats/poses/distribution", headers={"If-Modified-Since": "Thu, 01 May 2025 12:00:00 GMT"})
+        assert response.status_code == 304
+
+        # Nouvelle ingestion : la version change, la réponse est recalculée
+        from route.response_cache import dataset_versions
+        dataset_versions.clear()
+        mock_db_session.execute.return_value.scalar_one_or_none.return_value.version = 4
+        mock_db_session.execute.return_value.all.return_value = [("pose", 12)]
+        response = await ac.get("/stats/poses/distribution", headers={"If-None-Match": etag})
+        assert response.status_code == 200 and response.json() == {"pose": 12}
+
+        # Les paramètres font partie de la clé
+        mock_db_session.execute.return_value.all.return_value = [("bonjour", 5)]
+        assert (await ac.get("/stats/visualizations/histogram", params={"top": 5})).json() == {"bonjour": 5}
+        mock_db_session.execute.return_value.all.return_value = [("merci", 7)]
+        assert (await ac.get("/stats/visualizations/histogram", params={"top": 6})).json() == {"merci": 7}
+
 @pytest.mark.asyncio
 async def test_stats_videos_info():
     transport = ASGITransport(app=app)
@@ -213,6 +487,106 @@ async def test_stats_gloss_histogram():
         await response.aread()
         assert response.status_code in [200, 422]
 
+@pytest.mark.asyncio
+async def test_isol_sign_histogram_cached(mock_db_session):
+    from route.charts import chart_cache
+    from route.response_cache import dataset_versions
+    chart_cache.clear()
+    summary = dict(count=3, min=400.0, max=800.0, mean=600.0, p50=600.0, p90=760.0, p99=796.0)
+    mock_db_session.execute.return_value.all.return_value = [
+        MagicMock(bucket=1, n=1, **summary), MagicMock(bucket=5, n=2, **summary),
+    ]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/stats/isol/sign_histogram.png", params={"sign": "Manger", "bins": 5})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.content[:8] == b"\x89PNG\r\n\x1a\n"
+        assert response.headers["cache-control"] == "no-cache"
+
+        # Deuxième appel servi par le cache, sans requête d'agrégat ; revalidation : 304
+        calls = mock_db_session.execute.await_count
+        response_cached = await ac.get("/stats/isol/sign_histogram.png", params={"sign": "manger", "bins": 5})
+        assert response_cached.content == response.content
+        assert mock_db_session.execute.await_count == calls
+        response_304 = await ac.get("/stats/isol/sign_histogram.png", params={"sign": "manger", "bins": 5},
+                                    headers={"If-None-Match": response.headers["etag"]})
+        assert response_304.status_code == 304
+
+        # Nouvelle ingestion (version des données incrémentée) : le PNG est recalculé
+        dataset_versions.clear()
+        mock_db_session.execute.return_value.scalar_one_or_none.return_value = MagicMock(version=2, updated_at=None)
+        await ac.get("/stats/isol/sign_histogram.png", params={"sign": "manger", "bins": 5})
+        assert mock_db_session.execute.await_count == calls + 2  # Version puis agrégat
+
+        mock_db_session.execute.return_value.all.return_value = [
+            MagicMock(bucket=None, n=None, count=0, min=None, max=None, mean=None, p50=None, p90=None, p99=None),
+        ]
+        response = await ac.get("/stats/isol/sign_histogram.png", params={"sign": "inconnu"})
+        assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_isol_sign_statistics_single_query(mock_db_session):
+    from route.route import get_isol_sign_statistics
+    mock_db_session.execute.return_value.one.return_value = MagicMock(
+        occurrences=3, average_duration=600, min_duration=400, max_duration=800, distinct_signers=2,
+    )
+    stats = await get_isol_sign_statistics("Manger", mock_db_session)
+    assert mock_db_session.execute.await_count == 1
+    assert (stats["occurrences"], stats["min_duration"], stats["max_duration"], stats["distinct_signers"]) == (3, 400, 800, 2)
+    assert stats["distribution"].startswith("/stats/isol/sign_distribution?")
+
+    mock_db_session.execute.return_value.one.return_value = MagicMock(occurrences=0)
+    stats = await get_isol_sign_statistics("inconnu", mock_db_session)
+    assert stats["occurrences"] == 0 and stats["distribution"] == ""
+
+def test_word_stats_query_counts_occurrences_in_sql():
+    from sqlalchemy.dialects import postgresql
+    from route.route import build_word_stats_query
+    sql = str(build_word_stats_query("bon").compile(dialect=postgresql.dialect()))
+    # Un seul SELECT externe : comptage des occurrences et des annotations dans la même requête
+    assert sql.count("FROM subtitles") == 1 and "FROM words" in sql
+    assert "replace(lower(subtitles.text)" in sql
+
+@pytest.mark.asyncio
+async def test_isol_sign_distribution(mock_db_session):
+    summary = dict(count=3, min=400.0, max=800.0, mean=600.0, p50=600.0, p90=760.0, p99=796.0)
+    mock_db_session.execute.return_value.all.return_value = [
+        MagicMock(bucket=1, n=1, **summary), MagicMock(bucket=2, n=2, **summary),
+    ]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/stats/isol/sign_distribution", params={"sign": "Manger", "bins": 4})
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["count"], data["min"], data["max"], data["p90"]) == (3, 400.0, 800.0, 760.0)
+        assert [b["count"] for b in data["bins"]] == [1, 2, 0, 0]
+        assert (data["bins"][0]["start"], data["bins"][-1]["end"]) == (400.0, 800.0)
+        # Une lecture de la version des données et une seule requête d'agrégat
+        assert mock_db_session.execute.await_count == 2
+        assert response.headers["cache-control"] == "no-cache"
+
+        # Réponse en cache (clé : version des données) et revalidée par ETag
+        response_304 = await ac.get("/stats/isol/sign_distribution", params={"sign": "Manger", "bins": 4},
+                                    headers={"If-None-Match": response.headers["etag"]})
+        assert response_304.status_code == 304
+        assert mock_db_session.execute.await_count == 2
+
+        mock_db_session.execute.return_value.all.return_value = [
+            MagicMock(bucket=None, n=None, count=0, min=None, max=None, mean=None, p50=None, p90=None, p99=None),
+        ]
+        response = await ac.get("/stats/isol/sign_distribution", params={"sign": "inconnu"})
+        assert response.status_code == 404
+
+def test_duration_distribution_query_uses_sql_aggregates():
+    from sqlalchemy.dialects import postgresql
+    from route.route import build_duration_distribution_query
+    sql = str(build_duration_distribution_query("manger", 10).compile(dialect=postgresql.dialect()))
+    assert "percentile_cont" in sql and "WITHIN GROUP" in sql
+    assert "width_bucket" in sql
+
 @pytest.mark.asyncio
 async def test_stats_top_subtitles():
     transport = ASGITransport(app=app)
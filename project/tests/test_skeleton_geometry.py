@@ -0,0 +1,22 @@
+import numpy as np
+from skeleton_geometry import HAND_CONNECTIONS, POSE_CONNECTIONS, line_segments
+
+def test_line_segments_nan_separated():
+    points = np.arange(21 * 3, dtype=np.float32).reshape(21, 3)
+    x, y = line_segments(points, HAND_CONNECTIONS)
+
+    assert x.shape == y.shape == (3 * len(HAND_CONNECTIONS),)
+    i, j = HAND_CONNECTIONS[5]
+    np.testing.assert_array_equal(x[15:17], [points[i, 0], points[j, 0]])
+    np.testing.assert_array_equal(y[15:17], [points[i, 1], points[j, 1]])
+    assert np.isnan(x[2::3]).all() and np.isnan(y[2::3]).all()
+
+def test_line_segments_sequence_and_missing_joints():
+    frames = np.random.rand(4, 33, 3)
+    x, y = line_segments(frames, POSE_CONNECTIONS)
+    assert x.shape == (4, 3 * len(POSE_CONNECTIONS))
+    np.testing.assert_allclose(x[2], line_segments(frames[2], POSE_CONNECTIONS)[0])
+
+    # Liaisons vers des articulations absentes ignorées (ex. pose limitée aux 23 premiers points)
+    x, _ = line_segments(frames[0, :23], POSE_CONNECTIONS)
+    assert x.shape == (3 * 5,)
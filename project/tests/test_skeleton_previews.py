@@ -0,0 +1,29 @@
+import numpy as np
+from matplotlib import image as mpimg
+from skeleton_previews import SPRITE_FRAMES, preview_digest, preview_exists, preview_path, render_preview
+
+def save_instance(poses_dir, instance_id, n_frames):
+    paths = {}
+    for part, n_joints in {"left_hand": 21, "right_hand": 21, "pose": 33, "face": 478}.items():
+        (poses_dir / part).mkdir(parents=True, exist_ok=True)
+        path = poses_dir / part / f"{instance_id}.npy"
+        np.save(path, np.random.rand(n_frames, n_joints, 3).astype(np.float32))
+        paths[part] = str(path)
+    return paths
+
+def test_render_preview_content_addressed(tmp_path):
+    paths = save_instance(tmp_path / "poses", "A", 10)
+    cache_dir = tmp_path / "cache"
+
+    digest = render_preview(paths, cache_dir)
+    assert digest == preview_digest(paths)
+    assert preview_exists(digest, cache_dir)
+
+    sprite = mpimg.imread(preview_path(digest, "sprite", cache_dir))
+    assert sprite.shape[:2] == (120, 160 * SPRITE_FRAMES)
+    poster = mpimg.imread(preview_path(digest, "poster", cache_dir))
+    assert poster.shape[:2] == (240, 320)
+
+    # Des poses modifiées changent le hash : l'ancien aperçu n'est plus utilisé
+    np.save(paths["pose"], np.random.rand(11, 33, 3).astype(np.float32))
+    assert not preview_exists(preview_digest(paths), cache_dir)
@@ -0,0 +1,29 @@
+import numpy as np
+from matplotlib.figure import Figure
+from Utilitaires.skeleton_viewer import SkeletonRenderer, charger_instance, exporter_animation
+
+def save_instance(poses_dir, instance_id, n_frames):
+    for part, n_joints in {"left_hand": 21, "right_hand": 21, "pose": 33, "face": 478}.items():
+        (poses_dir / part).mkdir(parents=True, exist_ok=True)
+        np.save(poses_dir / part / f"{instance_id}.npy", np.random.rand(n_frames, n_joints, 3).astype(np.float32))
+
+def test_renderer_updates_artists_in_place(tmp_path):
+    save_instance(tmp_path, "A", 5)
+    poses = charger_instance(tmp_path, "A")
+    renderer = SkeletonRenderer(Figure().add_subplot(), poses)
+    # Limites fixes [-1, 1] et axe Y inversé (coordonnées image)
+    assert renderer.ax.get_xlim() == (-1, 1) and renderer.ax.get_ylim() == (1, -1)
+
+    artists = renderer.update(3)
+    assert artists is renderer.artists
+    np.testing.assert_array_equal(renderer.face.get_offsets(), poses["face"][3, :, :2])
+    assert renderer.frame_text.get_text() == "Frame 3/4"
+    # Aucun artiste n'est ajouté d'une frame à l'autre
+    n_children = len(renderer.ax.get_children())
+    renderer.update(4)
+    assert len(renderer.ax.get_children()) == n_children
+
+def test_exporter_animation_gif(tmp_path):
+    save_instance(tmp_path / "poses", "A", 3)
+    output_path = exporter_animation(charger_instance(tmp_path / "poses", "A"), tmp_path / "out" / "A.gif", dpi=20)
+    assert output_path.read_bytes()[:3] == b"GIF"
@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
-from route.route import get_real_video_duration_s, format_time
+from route.route import format_time
+from database.video_probe import probe_video
 from unittest import mock
 import os
 
@@ -15,18 +16,57 @@ import os
 def test_format_time(input_value, expected):
     assert format_time(input_value) == expected
 
-# Test de get_real_video_duration_s avec un mock
-def test_get_real_video_duration_s_file_not_found():
-    assert get_real_video_duration_s("fichier_inexistant.mp4") == 0.0
+# Test de probe_video avec un mock
+def test_probe_video_file_not_found():
+    assert probe_video("fichier_inexistant.mp4") == {
+        "duration_s": None, "fps": None, "width": None, "height": None, "codec": None
+    }
 
-@mock.patch("route.route.MediaInfo")
-@mock.patch("os.path.exists", return_value=True)
-def test_get_real_video_duration_s_mocked(mock_exists, mock_media_info):
+@mock.patch("database.video_probe.MediaInfo")
+@mock.patch("os.path.isfile", return_value=True)
+def test_probe_video_mocked(mock_isfile, mock_media_info):
     fake_track = mock.Mock()
     fake_track.track_type = "Video"
     fake_track.duration = 123456
+    fake_track.frame_rate = "50.000"
+    fake_track.width = 720
+    fake_track.height = 576
+    fake_track.format = "AVC"
     mock_media_info.parse.return_value.tracks = [fake_track]
 
-    result = get_real_video_duration_s("test.mp4")
+    result = probe_video("test.mp4")
     # Vérification du résultat
-    assert result == pytest.approx(123.456, rel=1e-4)  # La durée attendue est 123.456 secondes (123456 ms)
+    assert result["duration_s"] == pytest.approx(123.456, rel=1e-4)  # La durée attendue est 123.456 secondes (123456 ms)
+    assert result["fps"] == pytest.approx(50.0)
+    assert (result["width"], result["height"], result["codec"]) == (720, 576, "AVC")
+
+# Test de la construction SQL de la recherche CONT
+def test_build_cont_search_query_pushes_filters_to_sql():
+    from sqlalchemy.dialects import postgresql
+    from route.route import build_cont_search_filters, build_cont_search_query
+
+    annotation, annotation_filters, instance_filters = build_cont_search_filters(
+        "word", "bonjour", signer="12", min_duration=100, hand_type="left", sign_type="normal"
+    )
+    query = build_cont_search_query(annotation, annotation_filters, instance_filters)
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert "EXISTS" in sql
+    assert "words.word ILIKE '%%bonjour%%'" in sql
+    assert "words.end_time - words.start_time >= 100" in sql
+    assert "words.hand_type = 'left_hand'" in sql
+    assert "instances_cont.signer_id = 12" in sql
+    assert "LIMIT" not in sql  # la pagination est ajoutée par la route
+
+    # Un identifiant non numérique ne peut correspondre à aucune instance
+    _, _, instance_filters = build_cont_search_filters("word", "bonjour", task_id="abc")
+    assert str(instance_filters[0].compile(dialect=postgresql.dialect())) == "false"
+
+# Test du prédicat de recherche (jokers échappés)
+def test_contains_term_escapes_wildcards():
+    from route.route import contains_term
+    from schema.models_cont import WordAnnotation
+
+    clause = contains_term(WordAnnotation.word, "a_b%")
+    assert clause.right.value == "%a\\_b\\%%"
+    assert clause.modifiers["escape"] == "\\"
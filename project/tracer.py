@@ -4,27 +4,18 @@ from dash import dcc, html
 import plotly.graph_objs as go
 from dash.dependencies import Input, Output
 import json
-
-# Fonction pour charger un fichier .npy via un chemin d'accès
-def charger_fichier(chemin):
-    """Charge un fichier .npy donné par son chemin d'accès."""
-    if not chemin:
-        raise FileNotFoundError("Aucun fichier trouvé pour le chemin spécifié.")
-    return np.load(chemin)
-
-# Connexions (exemple MediaPipe)
-pose_connections = [
-    (11, 12), (11, 13), (13, 15),
-    (12, 14), (14, 16), (11, 23),
-    (12, 24), (23, 24)
-]
-hand_connections = [
-    (0, 1), (1, 2), (2, 3), (3, 4),    
-    (0, 5), (5, 6), (6, 7), (7, 8),    
-    (0, 9), (9, 10), (10, 11), (11, 12),  
-    (0, 13), (13, 14), (14, 15), (15, 16), 
-    (0, 17), (17, 18), (18, 19), (19, 20)
-]
+from pathlib import Path
+from pose_store import pose_store
+from skeleton_geometry import POSE_CONNECTIONS, HAND_CONNECTIONS, line_segments
+
+# Fonction pour ouvrir les fichiers .npy des parties du corps d'une instance
+def charger_poses(chemins):
+    """Ouvre les fichiers .npy ({partie: chemin}) une seule fois par instance via le cache partagé (mmap)."""
+    for chemin in chemins.values():
+        if not chemin:
+            raise FileNotFoundError("Aucun fichier trouvé pour le chemin spécifié.")
+    instance_id = Path(next(iter(chemins.values()))).stem  # Les fichiers portent le nom de l'instance
+    return pose_store.get(instance_id, chemins)
 
 # Paramètres d'animation
 current_frame = 0  # La frame actuelle
@@ -62,11 +53,17 @@ def update_graph(n_intervals, n_clicks, video_paths):
     global current_frame
     poses_paths = json.loads(video_paths)  # Charger les chemins des fichiers .npy
 
-    # Chargement des fichiers .npy pour chaque partie du corps (utilisation des chemins transmis)
-    left_hand_all = charger_fichier(poses_paths[0])  # Assumer le premier fichier est pour la main gauche
-    right_hand_all = charger_fichier(poses_paths[1])  # Main droite
-    pose_all = charger_fichier(poses_paths[2])  # Pose générale
-    face_all = charger_fichier(poses_paths[3])  # Visage
+    # Ouverture des fichiers .npy pour chaque partie du corps (utilisation des chemins transmis)
+    poses = charger_poses({
+        'left_hand': poses_paths[0],  # Assumer le premier fichier est pour la main gauche
+        'right_hand': poses_paths[1],  # Main droite
+        'pose': poses_paths[2],  # Pose générale
+        'face': poses_paths[3],  # Visage
+    })
+    left_hand_all = poses['left_hand']
+    right_hand_all = poses['right_hand']
+    pose_all = poses['pose']
+    face_all = poses['face']
 
     # Paramètres d'animation
     num_frames = min(left_hand_all.shape[0],
@@ -93,20 +90,14 @@ def update_graph(n_intervals, n_clicks, video_paths):
     y_rh = -y_rh
     y_face = -y_face
 
-    # Tracé des éléments (pose, mains, visage)
-    pose_lines = [
-        go.Scatter(x=[x_pose[i], x_pose[j]], y=[y_pose[i], y_pose[j]], mode='lines', line=dict(color='green', width=2))
-        for (i, j) in pose_connections if i < pose.shape[0] and j < pose.shape[0]
-    ]
-
-    hand_lines_left = [
-        go.Scatter(x=[x_lh[i], x_lh[j]], y=[y_lh[i], y_lh[j]], mode='lines', line=dict(color='red', width=2))
-        for (i, j) in hand_connections
-    ]
-
-    hand_lines_right = [
-        go.Scatter(x=[x_rh[i], x_rh[j]], y=[y_rh[i], y_rh[j]], mode='lines', line=dict(color='blue', width=2))
-        for (i, j) in hand_connections
+    # Tracé des lignes du squelette : une seule trace par partie du corps (liaisons séparées par NaN, ordonnées inversées)
+    x_pose_lines, y_pose_lines = line_segments(pose, POSE_CONNECTIONS)
+    x_lh_lines, y_lh_lines = line_segments(left_hand, HAND_CONNECTIONS)
+    x_rh_lines, y_rh_lines = line_segments(right_hand, HAND_CONNECTIONS)
+    skeleton_lines = [
+        go.Scatter(x=x_pose_lines, y=-y_pose_lines, mode='lines', line=dict(color='green', width=2), showlegend=False),
+        go.Scatter(x=x_lh_lines, y=-y_lh_lines, mode='lines', line=dict(color='red', width=2), showlegend=False),
+        go.Scatter(x=x_rh_lines, y=-y_rh_lines, mode='lines', line=dict(color='blue', width=2), showlegend=False),
     ]
 
     # Réduction de la taille des cercles des articulations des mains
@@ -119,7 +110,7 @@ def update_graph(n_intervals, n_clicks, video_paths):
             go.Scatter(x=x_lh, y=y_lh, mode='markers', marker=dict(color='red', size=hand_marker_size), name='Main Gauche'),
             go.Scatter(x=x_rh, y=y_rh, mode='markers', marker=dict(color='blue', size=hand_marker_size), name='Main Droite'),
             go.Scatter(x=x_face, y=y_face, mode='markers', marker=dict(color='orange', size=3, opacity=0.6), name='Visage')
-        ] + pose_lines + hand_lines_left + hand_lines_right,
+        ] + skeleton_lines,
         'layout': go.Layout(
             title=f"Squelette 2D - Frame {current_frame}/{num_frames-1}",
             xaxis=dict(title="X"),